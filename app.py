@@ -9,12 +9,27 @@ from config.composite_attributes import COMPOSITE_ATTRIBUTES
 from config.defender_presets import DEFENDER_PRESETS
 from config.forward_presets import FORWARD_PRESETS
 from config.position_groups import POSITION_GROUPS, get_position_group_options
-from utils.data_loader import prepare_data_global, get_player_info, get_player_stats, get_all_stat_columns, calculate_composite_attributes, get_distinct_values, filter_players
-from utils.player_comparison import display_player_comparison, create_stats_table, display_composite_attributes, display_position_based_rankings
-from utils.player_finder import show_player_finder
-from utils.player_similarity import SimilarityScorer
+from config.cohorts import COHORTS, get_cohort_options
+from config.position_rankings import POSITION_RANKINGS
+from utils.data_loader import get_player_profile, get_hypothetical_player_profile, get_all_stat_columns, get_distinct_values, filter_players
+from utils.constraint_search import parse_constraints, apply_constraints
+from utils.artifact_bundle import find_bundle, open_bundle
+from utils.progressive_loader import ProgressiveLoader
+from utils.season_store import PartitionedStore, discover_seasons, read_store_manifest
+from utils.instrumentation import (
+    annotate_rerun, display_debug_panel, finish_rerun, get_instrumentation_flags, instrument, start_rerun
+)
 import pandas as pd
 
+# Maximum number of players on the Comparison page (charts are shown for up to len(PLAYER_COLORS))
+MAX_COMPARISON_PLAYERS = 30
+
+# Team shown for ad-hoc players on the Comparison page (their league is kept in info['league'])
+ADHOC_PLAYER_TEAM = "Hypothetical"
+
+# Seconds between loading-status refreshes while leagues are still loading
+LOADER_POLL_SECONDS = 0.5
+
 # Page configuration
 st.set_page_config(
     page_title="Player Scouting Hub",
@@ -43,19 +58,116 @@ st.set_page_config(
 # """, unsafe_allow_html=True)
 
 
-@st.cache_data
-def load_global_data():
+@st.cache_resource
+def get_league_loader(data_folder):
+    """
+    Start loading ALL player data from all leagues in the background (once per server)
+    Each league is served as soon as it is parsed; global percentiles are final once all are in
+    """
+    return ProgressiveLoader(data_folder, STAT_CATEGORIES).start()
+
+
+@st.cache_data(ttl=60)
+def get_season_folders():
+    """
+    Find the season folders under data/ (data/2025, data/2024, ...), oldest first
+    """
+    return discover_seasons(os.path.join(os.getcwd(), "data"))
+
+
+@st.cache_resource
+def get_season_store(store_root):
+    """
+    Open the season store (python -m utils.season_store) once per server
+    Reads of the same season are cached inside the store and shared by every session
+    """
+    return PartitionedStore(store_root)
+
+
+@st.cache_resource
+def load_season_trajectories(store_root):
     """
-    Load and cache ALL player data from all leagues
-    Percentiles calculated globally across all players
+    Align every player across all seasons of the store once per server (utils/trajectories.py)
+    Returns None when the store holds a single season
     """
-    data_folder = os.path.join(os.getcwd(), "data", "2025")
+    from utils.trajectories import get_trajectory_index
+
+    store = get_season_store(store_root)
+    if len(store.seasons) < 2:
+        return None
+    return get_trajectory_index(store.read())
+
+
+@st.cache_resource
+def load_global_bundle(bundle_dir):
+    """
+    Open a precomputed bundle (python -m utils.artifact_bundle) once per server
+    The memory-mapped frame is shared by every session instead of copied per rerun
+    """
+    return open_bundle(bundle_dir)
+
+
+def get_global_data(season, data_folder):
+    """
+    Get the global player data of one season: its partitions in the season store,
+    else the bundle matching the season folder if one was built, otherwise the
+    leagues loaded so far
+    Returns (DataFrame, loader status) where the status is None once everything is loaded
+    """
+    store_root = os.path.join(os.getcwd(), "data", "store")
+    manifest = read_store_manifest(store_root)
+    if manifest is not None and season in manifest['seasons']:
+        # Percentiles in the store are per season, so one season reads like a season folder
+        return get_season_store(store_root).read(seasons=[season]), None
+
+    bundle_dir = find_bundle(os.path.join(os.getcwd(), "data", "bundle"), data_folder)
+    if bundle_dir:
+        return load_global_bundle(bundle_dir), None
 
     if not os.path.exists(data_folder):
         st.error(f"Data folder not found: {data_folder}")
         st.stop()
 
-    return prepare_data_global(data_folder, STAT_CATEGORIES)
+    # Only the first league is waited for
+    loader = get_league_loader(data_folder)
+    loader.wait(0)
+    status = loader.status()
+    df = loader.snapshot()
+    if df is None:
+        # Start over on the next rerun instead of keeping the failed loader
+        get_league_loader.clear()
+        st.error(f"Failed to load player data: {status['error']}")
+        st.stop()
+
+    return df, None if status['complete'] else status
+
+
+def show_loading_status(placeholder, status):
+    """
+    Show which leagues are still loading
+    """
+    if status['error']:
+        placeholder.error(f"❌ Loading stopped: {status['error']}")
+        return
+
+    pending = status['pending']
+    placeholder.info(
+        f"⏳ Loading leagues ({len(status['loaded'])} ready, {len(pending)} league files to go, "
+        f"{status['seconds']:.0f}s): "
+        f"{', '.join(pending[:5])}{f' and {len(pending) - 5} more' if len(pending) > 5 else ''}. "
+        "Percentiles are provisional until every league is loaded."
+    )
+
+
+def wait_for_next_league(placeholder, generation, data_folder):
+    """
+    Keep the page live while leagues are loading and rerun once the next one is ready
+    """
+    loader = get_league_loader(data_folder)
+    while not loader.wait(generation, timeout=LOADER_POLL_SECONDS):
+        # Redrawing the status lets Streamlit stop this run as soon as the user interacts
+        show_loading_status(placeholder, loader.status())
+    st.rerun()
 
 
 def build_custom_preset_ui():
@@ -167,13 +279,129 @@ def build_custom_preset_ui():
     }
 
 
-def render_player_comparison_page(df_filtered):
+def build_constraint_ui(key: str):
+    """
+    Build threshold constraint input (e.g. "Aerial duels won, % >= 65 and Age <= 24")
+
+    Args:
+        key: Widget key for the text area
+
+    Returns:
+        List of (column, operator, value) tuples (empty if none entered or invalid)
+    """
+    with st.expander("🎚️ Threshold Constraints", expanded=False):
+        constraint_text = st.text_area(
+            "Constraints (one per line or joined with 'and'):",
+            value="",
+            placeholder="Aerial duels won, % >= 65\nProgressive passes per 90 >= 6\nAge <= 24",
+            height=100,
+            help="Supported operators: >=, >, <=, <, ==",
+            key=key
+        )
+
+        try:
+            constraints = parse_constraints(constraint_text)
+        except ValueError as e:
+            st.error(f"❌ {str(e)}")
+            return []
+
+        if constraints:
+            st.caption(f"{len(constraints)} constraint(s) active")
+
+    return constraints
+
+
+def build_adhoc_player_ui(df_filtered, stat_columns, cohort='global'):
+    """
+    Build input for an ad-hoc player (trial player, opponent) ranked against the dataset
+
+    Args:
+        df_filtered: Filtered player dataframe
+        stat_columns: List of all stat column names
+        cohort: Percentile cohort key from config/cohorts.py
+
+    Returns:
+        Player data dict (info, stats, composite_attributes) or None if not entered
+    """
+    with st.expander("➕ Add Ad-hoc Player", expanded=False):
+        st.caption("Enter a stat line that is not in the dataset; it is ranked against the current pool without reloading.")
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            name = st.text_input("Name:", value="", key="adhoc_player_name")
+        with col2:
+            age = st.number_input("Age:", min_value=15, max_value=45, value=24, step=1, key="adhoc_player_age")
+        with col3:
+            leagues = sorted(df_filtered['League'].dropna().unique().tolist())
+            league = st.selectbox("League:", options=leagues, key="adhoc_player_league")
+        with col4:
+            position = st.text_input("Position:", value="", placeholder="LCB", key="adhoc_player_position")
+
+        stat_text = st.text_area(
+            "Stats (one 'column: value' per line):",
+            value="",
+            placeholder="Aerial duels won, %: 68\nProgressive passes per 90: 5.2",
+            height=120,
+            help="Stats left out count as missing",
+            key="adhoc_player_stats"
+        )
+
+        if not name.strip() or not stat_text.strip():
+            return None
+
+        raw_stats = {}
+        for line in stat_text.splitlines():
+            if not line.strip():
+                continue
+            column, sep, value = line.rpartition(':')
+            try:
+                raw_stats[column.strip()] = float(value)
+            except ValueError:
+                sep = ''
+            if not sep:
+                st.error(f"❌ Invalid stat line '{line.strip()}' (expected 'column: value')")
+                return None
+
+        try:
+            profile = get_hypothetical_player_profile(
+                df_filtered, raw_stats, stat_columns, COMPOSITE_ATTRIBUTES, cohort=cohort, league=league,
+                position=position
+            )
+        except ValueError as e:
+            st.error(f"❌ {str(e)}")
+            return None
+
+        st.caption(f"{len(profile['stats'])} stat(s) ranked")
+
+    return {
+        'info': {
+            'name': name.strip(),
+            'age': int(age),
+            'team': ADHOC_PLAYER_TEAM,
+            'league': league,
+            'country': '',
+            'position': position
+        },
+        'stats': profile['stats'],
+        'composite_attributes': profile['composite_attributes']
+    }
+
+
+def render_player_comparison_page(df_filtered, cohort='global', trajectories=None):
     """
     Render Player Comparison page content
 
     Args:
         df_filtered: Filtered player dataframe
+        cohort: Percentile cohort key from config/cohorts.py
+        trajectories: TrajectoryIndex over all seasons (None if there is a single season)
     """
+    # Chart libraries load only when this page renders
+    from utils.player_comparison import display_player_comparison, create_stats_table, display_composite_attributes, display_position_based_rankings
+    from utils.column_store import get_dataset_version
+    from utils.chart_cache import get_chart_cache
+    from utils.comparison_ranks import compute_attribute_ranks
+
     st.header("⚽ Player Comparison")
 
     if len(df_filtered) == 0:
@@ -188,10 +416,10 @@ def render_player_comparison_page(df_filtered):
         if len(df_filtered) > 0:
             player_names = sorted(df_filtered['Player'].tolist())
             selected_players = st.multiselect(
-                "Choose players (2-3):",
+                f"Choose players (2-{MAX_COMPARISON_PLAYERS}):",
                 options=player_names,
-                max_selections=3,
-                help="Select 2-3 players to compare",
+                max_selections=MAX_COMPARISON_PLAYERS,
+                help=f"Select 2-3 players for detailed charts, or up to {MAX_COMPARISON_PLAYERS} for a rankings heatmap",
                 key="selected_players"
             )
         else:
@@ -201,10 +429,14 @@ def render_player_comparison_page(df_filtered):
     with col2:
         st.info(f"📊 {len(df_filtered)} players available")
 
+    stat_columns = get_all_stat_columns(STAT_CATEGORIES)
+    adhoc_player = build_adhoc_player_ui(df_filtered, stat_columns, cohort)
+    num_players = len(selected_players) + (1 if adhoc_player else 0)
+
     st.markdown("---")
 
     # Show instructions if no players selected
-    if len(selected_players) == 0:
+    if num_players == 0:
         st.info("☝️ Please select at least 2 players from above to begin comparison.")
 
         # Show stats about the FILTERED dataset
@@ -231,31 +463,42 @@ def render_player_comparison_page(df_filtered):
             use_container_width=True,
             hide_index=True
         )
-    elif len(selected_players) < 2:
+    elif num_players < 2:
         st.warning("⚠️ Please select at least 2 players to compare.")
     else:
         # Prepare player data
         players_data = []
-        stat_columns = get_all_stat_columns(STAT_CATEGORIES)
-
-        for player_name in selected_players:
-            player_info = get_player_info(df_filtered, player_name, PLAYER_INFO_COLUMNS)
-            player_stats = get_player_stats(df_filtered, player_name, stat_columns)
-
-            # Calculate composite attributes
-            composite_attrs = calculate_composite_attributes(player_stats, COMPOSITE_ATTRIBUTES)
 
-            players_data.append({
-                'info': player_info,
-                'stats': player_stats,
-                'composite_attributes': composite_attrs
-            })
-
-        # Display comparison
-        display_player_comparison(players_data, STAT_CATEGORIES, PLAYER_COLORS[:len(selected_players)])
-
-        # Display composite attributes
-        display_composite_attributes(players_data, PLAYER_COLORS[:len(selected_players)])
+        # The ad-hoc player takes one of the MAX_COMPARISON_PLAYERS slots
+        max_selected = MAX_COMPARISON_PLAYERS - (1 if adhoc_player else 0)
+        if len(selected_players) > max_selected:
+            left_out = selected_players[max_selected:]
+            st.warning(f"⚠️ Up to {MAX_COMPARISON_PLAYERS} players can be compared: {', '.join(left_out)} "
+                       f"left out to make room for {adhoc_player['info']['name']}.")
+
+        for player_name in selected_players[:max_selected]:
+            # Info, percentiles and precomputed composite scores in one lookup
+            players_data.append(get_player_profile(
+                df_filtered, player_name, stat_columns, PLAYER_INFO_COLUMNS, COMPOSITE_ATTRIBUTES, cohort=cohort
+            ))
+
+        if adhoc_player:
+            players_data.append(adhoc_player)
+
+        # Detailed charts for up to one player per color, rankings heatmap for any size
+        if len(players_data) <= len(PLAYER_COLORS):
+            dataset_version = get_dataset_version(df_filtered)
+            display_player_comparison(players_data, STAT_CATEGORIES, PLAYER_COLORS[:len(players_data)],
+                                      dataset_version=dataset_version, cohort=cohort)
+
+            # Display composite attributes
+            display_composite_attributes(players_data, PLAYER_COLORS[:len(players_data)],
+                                         dataset_version=dataset_version, cohort=cohort)
+        else:
+            st.info(
+                f"📊 Comparing {len(players_data)} players — detailed charts are shown for up to "
+                f"{len(PLAYER_COLORS)} players; see the rankings heatmap below."
+            )
 
         # Infer position type from selected players for position-based rankings
         first_player_position = players_data[0]['info']['position']
@@ -269,13 +512,117 @@ def render_player_comparison_page(df_filtered):
             # Default to DM/CM for other positions
             inferred_position_type = 'DM/CM'
 
+        ranking_profiles = list(POSITION_RANKINGS.keys())
+        position_type = st.selectbox(
+            "Ranking profile:",
+            options=ranking_profiles,
+            index=ranking_profiles.index(inferred_position_type),
+            help="Key attributes used for the position-based rankings",
+            key="comparison_ranking_profile"
+        )
+
+        # Ranks within the selection and within the filtered pool (from the sorted indexes)
+        attribute_ranks = compute_attribute_ranks(
+            df_filtered, players_data, POSITION_RANKINGS[position_type]['key_attributes'],
+            stat_columns, COMPOSITE_ATTRIBUTES, cohort=cohort
+        )
+
         # Display position-based rankings
-        display_position_based_rankings(players_data, inferred_position_type, PLAYER_COLORS[:len(selected_players)])
+        display_position_based_rankings(players_data, position_type, attribute_ranks)
 
         # Optional: Show detailed statistics table
         with st.expander("📊 View Detailed Statistics Table"):
             create_stats_table(players_data, STAT_CATEGORIES)
 
+        cache_stats = get_chart_cache().stats()
+        st.caption(
+            f"🖼️ Chart cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+            f"({cache_stats['hit_rate']:.0%} hit rate, {cache_stats['entries']} charts)"
+        )
+
+    if trajectories is not None:
+        render_trajectory_section(trajectories, df_filtered, selected_players)
+
+
+def render_trajectory_section(trajectories, df_filtered, selected_players):
+    """
+    Show season-over-season trajectories of the selected players and the biggest movers
+
+    Args:
+        trajectories: TrajectoryIndex over all seasons
+        df_filtered: Filtered player dataframe (movers are limited to its players)
+        selected_players: Player names selected on the Comparison page
+    """
+    st.markdown("---")
+    st.markdown("### 📈 Season Trajectories")
+
+    # Composites first, then stat percentiles (percentiles are ranked within each season)
+    composite_options = [f"COMP_{attr}" for attr in COMPOSITE_ATTRIBUTES if f"COMP_{attr}" in trajectories.columns]
+    percentile_options = [f"{stat}_percentile" for stat in get_all_stat_columns(STAT_CATEGORIES)
+                          if f"{stat}_percentile" in trajectories.columns]
+
+    def metric_label(column):
+        if column.startswith('COMP_'):
+            attr = COMPOSITE_ATTRIBUTES[column.replace('COMP_', '')]
+            return f"{attr.get('icon', '')} {attr.get('display_name', column)}".strip()
+        return f"{column.replace('_percentile', '')} (percentile)"
+
+    metric_options = composite_options + percentile_options
+    metric_labels = [metric_label(column) for column in metric_options]
+
+    seasons = trajectories.seasons
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        selected_label = st.selectbox("Metric:", options=metric_labels, key="trajectory_metric")
+        metric = metric_options[metric_labels.index(selected_label)]
+    with col2:
+        from_season = st.selectbox("From season:", options=seasons[:-1], index=len(seasons) - 2,
+                                   key="trajectory_from_season")
+    with col3:
+        later_seasons = [season for season in seasons if season > from_season]
+        to_season = st.selectbox("To season:", options=later_seasons, index=len(later_seasons) - 1,
+                                 key="trajectory_to_season")
+
+    # Selected players' lines (birth country from the current season tells namesakes apart)
+    if selected_players:
+        countries = df_filtered.drop_duplicates('Player').set_index('Player')['Birth country'] \
+            if 'Birth country' in df_filtered.columns else {}
+        lines = {}
+        for player_name in selected_players:
+            try:
+                lines[player_name] = trajectories.trajectory(
+                    player_name, [metric], country=countries.get(player_name)
+                )[metric]
+            except ValueError:
+                continue
+        if lines:
+            st.line_chart(pd.DataFrame(lines).reindex(seasons), height=300)
+
+    # Biggest risers and fallers among the filtered players
+    direction = st.radio("Movers:", options=["📈 Risers", "📉 Fallers"], horizontal=True,
+                         key="trajectory_direction")
+    try:
+        movers = trajectories.top_movers(metric, from_season, to_season, top_n=20,
+                                         fallers=direction == "📉 Fallers",
+                                         slots=trajectories.slots_for(df_filtered))
+    except ValueError as e:
+        st.error(f"❌ {str(e)}")
+        return
+
+    if len(movers) == 0:
+        st.info(f"No filtered players have {metric_label(metric)} in both {from_season} and {to_season}.")
+        return
+    st.dataframe(
+        movers[['Rank', 'Player', 'Team', 'League', 'Position', 'Age', from_season, to_season, 'Delta']],
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            from_season: st.column_config.NumberColumn(format="%.1f"),
+            to_season: st.column_config.NumberColumn(format="%.1f"),
+            'Delta': st.column_config.NumberColumn(format="%+.1f")
+        }
+    )
+
 
 def get_relevant_presets(df_filtered):
     """
@@ -317,6 +664,8 @@ def render_player_finder_page(df_filtered):
     Args:
         df_filtered: Filtered player dataframe
     """
+    from utils.player_finder import show_player_finder
+
     st.header("🎯 Player Finder")
 
     if len(df_filtered) == 0:
@@ -410,6 +759,9 @@ def render_player_finder_page(df_filtered):
 
     st.info(f"**Total Weight**: {total_weight:.2f} (will be normalized)")
 
+    # Threshold constraints narrow the scored pool
+    constraints = build_constraint_ui("finder_constraints")
+
     st.markdown("---")
 
     # ========== CALCULATE BUTTON ==========
@@ -430,8 +782,14 @@ def render_player_finder_page(df_filtered):
                 'icon': preset_info['icon']
             }
 
+            try:
+                df_to_score = apply_constraints(df_filtered, constraints)
+            except ValueError as e:
+                st.error(f"❌ Invalid constraint: {str(e)}")
+                return
+
             # Display results
-            show_player_finder(df_filtered, {selected_preset: temp_preset_config}, selected_preset)
+            show_player_finder(df_to_score, {selected_preset: temp_preset_config}, selected_preset)
 
 
 def suggest_weights_from_profile(ref_composite_attrs: dict, top_n: int = 4) -> dict:
@@ -480,15 +838,17 @@ def suggest_weights_from_profile(ref_composite_attrs: dict, top_n: int = 4) -> d
     return suggested_weights
 
 
-def render_player_similarity_page(df_filtered):
+def render_player_similarity_page(df_filtered, cohort='global'):
     """
     Render Player Similarity page content
 
     Args:
         df_filtered: Filtered player dataframe from global filters
+        cohort: Percentile cohort key the composite attributes are computed against
     """
     import plotly.graph_objects as go
     import plotly.express as px
+    from utils.player_similarity import SimilarityScorer
 
     st.header("🔍 Player Similarity")
 
@@ -528,8 +888,8 @@ def render_player_similarity_page(df_filtered):
 
     # Track player selection changes and clear old composite attrs
     if 'similarity_selected_player' not in st.session_state or \
-       st.session_state.similarity_selected_player != selected_player:
-        st.session_state.similarity_selected_player = selected_player
+       st.session_state.similarity_selected_player != (selected_player, cohort):
+        st.session_state.similarity_selected_player = (selected_player, cohort)
         # Clear old composite attrs to force fresh calculation
         if 'ref_composite_attrs' in st.session_state:
             del st.session_state['ref_composite_attrs']
@@ -552,7 +912,6 @@ def render_player_similarity_page(df_filtered):
     #st.markdown("#### 🎯 Reference Player - Attributes")
     with st.expander("⚙️ Reference Player Attributes", expanded=False):
         # Import and get stat columns - MOVED OUTSIDE if block to fix UnboundLocalError
-        from utils.data_loader import calculate_composite_attributes
         from config.composite_attributes import COMPOSITE_ATTRIBUTES
         stat_columns = get_all_stat_columns(STAT_CATEGORIES)
 
@@ -565,19 +924,10 @@ def render_player_similarity_page(df_filtered):
 
         # Calculate on button click OR first time (when not in session state)
         if recalc_button or 'ref_composite_attrs' not in st.session_state:
-            # Calculate composite attributes for reference player
-            ref_player_stats = {}
-            for col in stat_columns:
-                percentile_col = f"{col}_percentile"
-                if percentile_col in df_filtered.columns:
-                    ref_player_row = df_filtered[df_filtered['Player'] == selected_player]
-                    if len(ref_player_row) > 0:
-                        ref_player_stats[percentile_col] = ref_player_row.iloc[0][percentile_col]
-
-            # Store in session state instead of local variable
-            st.session_state.ref_composite_attrs = calculate_composite_attributes(
-                ref_player_stats, COMPOSITE_ATTRIBUTES
-            )
+            # Read the reference player's precomputed composite scores
+            st.session_state.ref_composite_attrs = get_player_profile(
+                df_filtered, selected_player, stat_columns, PLAYER_INFO_COLUMNS, COMPOSITE_ATTRIBUTES, cohort=cohort
+            )['composite_attributes']
 
         # Display from session state
         if 'ref_composite_attrs' in st.session_state:
@@ -793,6 +1143,9 @@ def render_player_similarity_page(df_filtered):
             total_weight = sum(abs(w) for w in adjusted_weights.values())
             st.info(f"**Total Weight**: {total_weight:.2f} (will be normalized to 1.0)")
 
+    # Threshold constraints restrict the candidate pool (reference player is always kept)
+    constraints = build_constraint_ui("similarity_constraints")
+
     st.markdown("---")
     min_minutes = 0
 
@@ -840,7 +1193,7 @@ def render_player_similarity_page(df_filtered):
         else:
             with st.spinner("Calculating player similarity..."):
                 # Initialize scorer with composite columns
-                scorer = SimilarityScorer(df_filtered, stat_columns, composite_columns)
+                scorer = SimilarityScorer(df_filtered, stat_columns, composite_columns, cohort=cohort)
 
                 try:
                     # Calculate similarity
@@ -850,7 +1203,8 @@ def render_player_similarity_page(df_filtered):
                         min_minutes=min_minutes,
                         age_range=age_range,
                         same_position_only=False,  # HARDCODED: Cross-position comparisons enabled by design
-                        top_n=30
+                        top_n=30,
+                        candidate_constraints=constraints
                     )
 
                     if len(results_df) == 0:
@@ -864,7 +1218,7 @@ def render_player_similarity_page(df_filtered):
                             'reference_player': selected_player,
                             'weights': adjusted_weights,
                             'composite_display_names': composite_display_names,
-                            'df_filtered': df_filtered,
+                            'df_filtered': scorer.df,
                             'stat_columns': stat_columns,
                             'composite_columns': composite_columns
                         }
@@ -1002,67 +1356,55 @@ def display_similarity_results_table(results_df, reference_player, weights, comp
     st.dataframe(weights_df, use_container_width=True, hide_index=True)
 
 
-def display_similarity_scatter_plot(results_df, full_df, reference_player, stat_columns, weights):
-    """Display scatter plot of similar players"""
-    import plotly.graph_objects as go
+def add_similarity_scatter_traces(fig, results_df, full_df, reference_player,
+                                  x_metric, y_metric, x_label, y_label):
+    """
+    Add background, similar-player and reference-player traces to a similarity scatter plot
 
-    st.markdown("#### Scatter Plot Analysis")
+    All traces are WebGL (Scattergl) with hover text built from customdata, and
+    the background layer is downsampled above MAX_BACKGROUND_POINTS so the
+    payload stays bounded for large pools.
 
-    # Metric selection for X/Y axes
-    col1, col2 = st.columns(2)
-    with col1:
-        x_metric = st.selectbox(
-            "X-Axis Metric:",
-            options=stat_columns,
-            index=0 if len(stat_columns) > 0 else None,
-            key="scatter_x_metric"
-        )
-    with col2:
-        y_metric = st.selectbox(
-            "Y-Axis Metric:",
-            options=stat_columns,
-            index=1 if len(stat_columns) > 1 else 0,
-            key="scatter_y_metric"
-        )
+    Args:
+        fig: plotly figure to add traces to
+        results_df: Similarity results (with Similarity_Score)
+        full_df: Player pool the results were drawn from
+        reference_player: Name of the reference player
+        x_metric: X-axis column
+        y_metric: Y-axis column
+        x_label: X-axis display name
+        y_label: Y-axis display name
+    """
+    import plotly.graph_objects as go
+    from utils.quantized_block import decode_frame
+    from utils.scatter_sampling import get_background_points
 
-    if not x_metric or not y_metric:
-        st.warning("Please select both X and Y metrics")
+    if x_metric not in full_df.columns or y_metric not in full_df.columns:
         return
 
-    # Create scatter plot
-    fig = go.Figure()
-
     # Background players (not in results, not reference)
     similar_names = set(results_df['Player'].tolist())
     similar_names.add(reference_player)
     background_df = full_df[~full_df['Player'].isin(similar_names)]
 
-    if len(background_df) > 0 and x_metric in background_df.columns and y_metric in background_df.columns:
-        fig.add_trace(go.Scatter(
-            x=background_df[x_metric],
-            y=background_df[y_metric],
+    if len(background_df) > 0:
+        sampled, total = get_background_points(background_df, x_metric, y_metric)
+        name = 'Other Players' if len(sampled) == total else f'Other Players ({len(sampled)} of {total} shown)'
+        fig.add_trace(go.Scattergl(
+            x=sampled['x'],
+            y=sampled['y'],
             mode='markers',
             marker=dict(color='#9E9E9E', size=10, opacity=0.3),
-            name='Other Players',
-            text=background_df['Player'],
+            name=name,
+            text=sampled['Player'],
             hovertemplate='<b>%{text}</b><br>' +
-                         f'{x_metric}: %{{x:.1f}}<br>' +
-                         f'{y_metric}: %{{y:.1f}}<extra></extra>'
+                         f'{x_label}: %{{x:.1f}}<br>' +
+                         f'{y_label}: %{{y:.1f}}<extra></extra>'
         ))
 
     # Similar players
     if x_metric in results_df.columns and y_metric in results_df.columns:
-        # Create hover text with similarity scores
-        hover_texts = []
-        for idx, row in results_df.iterrows():
-            hover_texts.append(
-                f"<b>{row['Player']}</b><br>" +
-                f"{x_metric}: {row[x_metric]:.1f}<br>" +
-                f"{y_metric}: {row[y_metric]:.1f}<br>" +
-                f"Similarity: {row['Similarity_Score']:.3f}"
-            )
-
-        fig.add_trace(go.Scatter(
+        fig.add_trace(go.Scattergl(
             x=results_df[x_metric],
             y=results_df[y_metric],
             mode='markers+text',
@@ -1071,14 +1413,18 @@ def display_similarity_scatter_plot(results_df, full_df, reference_player, stat_
             text=results_df['Player'],
             textposition='top center',
             textfont=dict(size=9),
-            hovertemplate='%{hovertext}<extra></extra>',
-            hovertext=hover_texts
+            customdata=results_df['Similarity_Score'],
+            hovertemplate='<b>%{text}</b><br>' +
+                         f'{x_label}: %{{x:.1f}}<br>' +
+                         f'{y_label}: %{{y:.1f}}<br>' +
+                         'Similarity: %{customdata:.3f}<extra></extra>'
         ))
 
     # Reference player
-    ref_player_row = full_df[full_df['Player'] == reference_player].iloc[0]
-    if x_metric in ref_player_row and y_metric in ref_player_row:
-        fig.add_trace(go.Scatter(
+    ref_player_row = full_df[full_df['Player'] == reference_player]
+    if len(ref_player_row) > 0:
+        ref_player_row = decode_frame(ref_player_row.iloc[:1]).iloc[0]
+        fig.add_trace(go.Scattergl(
             x=[ref_player_row[x_metric]],
             y=[ref_player_row[y_metric]],
             mode='markers+text',
@@ -1089,10 +1435,44 @@ def display_similarity_scatter_plot(results_df, full_df, reference_player, stat_
             textposition='top center',
             textfont=dict(size=11, color='#e74c3c'),
             hovertemplate=f'<b>{reference_player}</b><br>' +
-                         f'{x_metric}: {ref_player_row[x_metric]:.1f}<br>' +
-                         f'{y_metric}: {ref_player_row[y_metric]:.1f}<extra></extra>'
+                         f'{x_label}: %{{x:.1f}}<br>' +
+                         f'{y_label}: %{{y:.1f}}<extra></extra>'
         ))
 
+
+@instrument('chart_render')
+def display_similarity_scatter_plot(results_df, full_df, reference_player, stat_columns, weights):
+    """Display scatter plot of similar players"""
+    import plotly.graph_objects as go
+
+    st.markdown("#### Scatter Plot Analysis")
+
+    # Metric selection for X/Y axes
+    col1, col2 = st.columns(2)
+    with col1:
+        x_metric = st.selectbox(
+            "X-Axis Metric:",
+            options=stat_columns,
+            index=0 if len(stat_columns) > 0 else None,
+            key="scatter_x_metric"
+        )
+    with col2:
+        y_metric = st.selectbox(
+            "Y-Axis Metric:",
+            options=stat_columns,
+            index=1 if len(stat_columns) > 1 else 0,
+            key="scatter_y_metric"
+        )
+
+    if not x_metric or not y_metric:
+        st.warning("Please select both X and Y metrics")
+        return
+
+    # Create scatter plot
+    fig = go.Figure()
+    add_similarity_scatter_traces(fig, results_df, full_df, reference_player,
+                                  x_metric, y_metric, x_metric, y_metric)
+
     # Update layout
     fig.update_layout(
         title=f"{x_metric} vs {y_metric} - Similarity Analysis",
@@ -1107,6 +1487,7 @@ def display_similarity_scatter_plot(results_df, full_df, reference_player, stat_
     st.plotly_chart(fig, use_container_width=True)
 
 
+@instrument('chart_render')
 def display_similarity_scatter_plot_composite(results_df, full_df, reference_player,
                                             composite_columns, composite_display_names, weights):
     """Display scatter plot with composite attributes on axes"""
@@ -1149,67 +1530,8 @@ def display_similarity_scatter_plot_composite(results_df, full_df, reference_pla
 
     # Create scatter plot
     fig = go.Figure()
-
-    # Background players (not in results, not reference)
-    similar_names = set(results_df['Player'].tolist())
-    similar_names.add(reference_player)
-    background_df = full_df[~full_df['Player'].isin(similar_names)]
-
-    if len(background_df) > 0 and x_metric in background_df.columns and y_metric in background_df.columns:
-        fig.add_trace(go.Scatter(
-            x=background_df[x_metric],
-            y=background_df[y_metric],
-            mode='markers',
-            marker=dict(color='#9E9E9E', size=10, opacity=0.3),
-            name='Other Players',
-            text=background_df['Player'],
-            hovertemplate='<b>%{text}</b><br>' +
-                         f'{x_metric_display}: %{{x:.1f}}<br>' +
-                         f'{y_metric_display}: %{{y:.1f}}<extra></extra>'
-        ))
-
-    # Similar players
-    if x_metric in results_df.columns and y_metric in results_df.columns:
-        hover_texts = []
-        for idx, row in results_df.iterrows():
-            hover_texts.append(
-                f"<b>{row['Player']}</b><br>" +
-                f"{x_metric_display}: {row[x_metric]:.1f}<br>" +
-                f"{y_metric_display}: {row[y_metric]:.1f}<br>" +
-                f"Similarity: {row['Similarity_Score']:.3f}"
-            )
-
-        fig.add_trace(go.Scatter(
-            x=results_df[x_metric],
-            y=results_df[y_metric],
-            mode='markers+text',
-            marker=dict(color='#2ecc71', size=12, opacity=0.8),
-            name='Similar Players',
-            text=results_df['Player'],
-            textposition='top center',
-            textfont=dict(size=9),
-            hovertemplate='%{hovertext}<extra></extra>',
-            hovertext=hover_texts
-        ))
-
-    # Reference player
-    ref_player_row = full_df[full_df['Player'] == reference_player]
-    if len(ref_player_row) > 0:
-        ref_player_row = ref_player_row.iloc[0]
-        fig.add_trace(go.Scatter(
-            x=[ref_player_row[x_metric]],
-            y=[ref_player_row[y_metric]],
-            mode='markers+text',
-            marker=dict(color='#e74c3c', size=15, symbol='star',
-                       line=dict(width=2, color='white')),
-            name='Reference Player',
-            text=[reference_player],
-            textposition='top center',
-            textfont=dict(size=11, color='#e74c3c'),
-            hovertemplate=f'<b>{reference_player}</b><br>' +
-                         f'{x_metric_display}: {ref_player_row[x_metric]:.1f}<br>' +
-                         f'{y_metric_display}: {ref_player_row[y_metric]:.1f}<extra></extra>'
-        ))
+    add_similarity_scatter_traces(fig, results_df, full_df, reference_player,
+                                  x_metric, y_metric, x_metric_display, y_metric_display)
 
     # Update layout
     fig.update_layout(
@@ -1384,28 +1706,62 @@ def display_similarity_player_detail(results_df, scorer, reference_player, weigh
         st.warning("⚠️ No metrics selected for comparison. Please select at least one metric or composite attribute.")
 
 
-def main():
+def render_app():
     # Title and description
     st.title("Scouting Hub.")
 #    st.markdown("### Player Comparison & Defender Finder (darfat)")
 #    st.markdown("Compare players side-by-side and find top defenders using weighted scoring profiles.")
 
+    # ========== SIDEBAR: GLOBAL FILTERS (TOP) ==========
+    st.sidebar.markdown("### 🔍 Global Filters")
+    st.sidebar.markdown("*Apply to all pages*")
+
+    # Season filter (only one season is loaded at a time, latest by default)
+    season_folders = get_season_folders()
+    if not season_folders:
+        # No season folders: keep the original location so the error names it
+        season_folders = {"2025": os.path.join(os.getcwd(), "data", "2025")}
+    season_options = sorted(season_folders, reverse=True)
+    if len(season_options) > 1:
+        selected_season = st.sidebar.selectbox(
+            "Season:",
+            options=season_options,
+            index=0,
+            help="Percentiles and composites are ranked within the selected season",
+            key="global_season_filter"
+        )
+    else:
+        selected_season = season_options[0]
+    data_folder = season_folders[selected_season]
+
     # Load global data (cached)
     with st.spinner("Loading player data from all leagues..."):
-        df_global = load_global_data()
+        df_global, loading = get_global_data(selected_season, data_folder)
+
+    # Player x season trajectories need every season, so they come from the season store
+    store_root = os.path.join(os.getcwd(), "data", "store")
+    trajectories = load_season_trajectories(store_root) if read_store_manifest(store_root) is not None else None
 
     # Extract distinct values for filters
     distinct_values = get_distinct_values(df_global)
-
-    # ========== SIDEBAR: GLOBAL FILTERS (TOP) ==========
-    st.sidebar.markdown("### 🔍 Global Filters")
-    st.sidebar.markdown("*Apply to all pages*")
-
-    # League filter
+    league_options = distinct_values['leagues']
+
+    # Files still loading are only listed in the status box: their League values are known once parsed
+    loading_placeholder = st.sidebar.empty()
+    if loading is not None:
+        show_loading_status(loading_placeholder, loading)
+
+    # League filter (the options grow as leagues finish loading, which makes a new
+    # widget, so the selection is carried over through session state)
+    league_options = ["All Leagues"] + league_options
+    if "global_league_filter" in st.session_state:
+        st.session_state["global_league_filter"] = [
+            league for league in st.session_state["global_league_filter"] if league in league_options
+        ]
     selected_leagues = st.sidebar.multiselect(
         "Select Leagues:",
-        options=["All Leagues"] + distinct_values['leagues'],
-        default=["All Leagues"],
+        options=league_options,
+        default=None if "global_league_filter" in st.session_state else ["All Leagues"],
         help="Filter by leagues across all pages",
         key="global_league_filter"
     )
@@ -1423,8 +1779,35 @@ def main():
     # Convert selected group to position list for filter_players()
     position_filter = POSITION_GROUPS.get(selected_position_group, None)
 
+    # Advanced filter expression (compiled once, evaluated as a single numpy mask)
+    filter_expression = st.sidebar.text_input(
+        "Advanced Filter:",
+        value="",
+        placeholder='League in ("Liga 1","J1") and Age < 25',
+        help='Combine conditions with and/or/not. Quote column names with spaces, '
+             'e.g. "PAdj Interceptions_percentile" > 70',
+        key="global_filter_expression"
+    )
+
     # Apply global filters
-    df_filtered = filter_players(df_global, positions=position_filter, leagues=league_filter)
+    try:
+        df_filtered = filter_players(df_global, positions=position_filter, leagues=league_filter,
+                                     expression=filter_expression)
+    except ValueError as e:
+        st.sidebar.error(f"❌ Invalid filter: {str(e)}")
+        df_filtered = filter_players(df_global, positions=position_filter, leagues=league_filter)
+
+    # Percentile cohort (precomputed at load time for every cohort)
+    cohort_options = get_cohort_options()
+    cohort_display_names = [COHORTS[key]['display_name'] for key in cohort_options]
+    selected_cohort_display = st.sidebar.selectbox(
+        "Percentile Cohort:",
+        options=cohort_display_names,
+        index=0,  # Default to global
+        help="Rank players globally or only against their league / position group",
+        key="global_percentile_cohort"
+    )
+    selected_cohort = cohort_options[cohort_display_names.index(selected_cohort_display)]
 
     # Filter summary
     st.sidebar.info(f"📊 Showing **{len(df_filtered)}** players (from {len(df_global)} total)")
@@ -1446,25 +1829,54 @@ def main():
 
     st.sidebar.markdown("---")
 
+    annotate_rerun(page=page, players=len(df_filtered), cohort=selected_cohort, season=selected_season)
+
     # ========== MAIN CONTENT ==========
     st.markdown("---")
 
     if page == "⚽ Player Comparison":
-        render_player_comparison_page(df_filtered)
+        render_player_comparison_page(df_filtered, cohort=selected_cohort, trajectories=trajectories)
     elif page == "🎯 Player Finder":
         render_player_finder_page(df_filtered)
     elif page == "🔍 Player Similarity":
-        render_player_similarity_page(df_filtered)
+        render_player_similarity_page(df_filtered, cohort=selected_cohort)
 
     # Footer
     st.markdown("---")
     st.markdown(f"""
     <div style="text-align: center; color: #7f8c8d; font-size: 12px;">
-        Data source: Wyscout | Multiple Leagues 2025-2026<br>
-        All statistics are shown as percentile ranks (0-100) calculated globally across {len(df_global)} players from all leagues
+        Data source: Wyscout | Multiple Leagues | Season {selected_season}<br>
+        All statistics are shown as percentile ranks (0-100) across {len(df_global)} players from all leagues (cohort: {COHORTS[selected_cohort]['display_name']})
     </div>
     """, unsafe_allow_html=True)
 
+    # Leagues still loading: main() keeps the status live and reruns when the next one is ready
+    if loading is not None and not loading['error']:
+        return loading_placeholder, loading['generation'], data_folder
+    return None
+
+
+def main():
+    from utils.column_store import enable_copy_on_write
+
+    # Filtered pools share the global frame's columns instead of copying them
+    enable_copy_on_write()
+
+    # Record hot-path timings of this rerun (?debug=1 shows them, ?profile=1 captures a cProfile)
+    flags = get_instrumentation_flags()
+    start_rerun(trace_allocations=flags['debug'], profile=flags['profile'])
+    try:
+        loading = render_app()
+    finally:
+        record = finish_rerun()
+
+    if flags['debug']:
+        display_debug_panel(record)
+
+    # Pick up leagues that finish loading while this page is shown
+    if loading is not None:
+        wait_for_next_league(*loading)
+
 
 if __name__ == "__main__":
     main()
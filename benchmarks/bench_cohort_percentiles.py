@@ -0,0 +1,39 @@
+"""
+Benchmark the grouped cohort percentile pass
+
+Usage:
+    python -m benchmarks.bench_cohort_percentiles --rows 5000 50000 200000
+"""
+import argparse
+
+from benchmarks.common import make_player_frame, time_call
+from config.cohorts import COHORTS
+from config.stat_categories import STAT_CATEGORIES
+from utils.cohort_percentiles import calculate_cohort_percentiles
+from utils.data_loader import calculate_percentiles, get_all_stat_columns
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cohort percentile computation")
+    parser.add_argument('--rows', type=int, nargs='+', default=[5000, 50000, 200000])
+    parser.add_argument('--leagues', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    stat_columns = get_all_stat_columns(STAT_CATEGORIES)
+
+    print(f"{'rows':>10} {'global (s)':>12} {'all cohorts (s)':>16} {'block MB':>10}")
+    for n_rows in args.rows:
+        df = calculate_percentiles(make_player_frame(n_rows, args.leagues), stat_columns)
+
+        global_timing = time_call(lambda: calculate_percentiles(df, stat_columns), args.repeat)
+        cohort_timing = time_call(lambda: calculate_cohort_percentiles(df, stat_columns), args.repeat)
+
+        result = calculate_cohort_percentiles(df, stat_columns)
+        block_mb = sum(result.block(cohort).nbytes for cohort in COHORTS) / 1e6
+
+        print(f"{n_rows:>10} {global_timing['best']:>12.3f} {cohort_timing['best']:>16.3f} {block_mb:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark module import times (python -X importtime) in fresh interpreters
+
+Each target is imported in a new process so nothing is cached between runs.
+The "app" target runs the top-level imports of app.py, which is what every
+Streamlit cold start pays before any page renders.
+
+Usage:
+    python -m benchmarks.bench_import_time --repeat 5 --json import_times.json
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules timed besides the app's startup imports
+MODULES = [
+    'utils.data_loader',
+    'utils.constraint_search',
+    'utils.filter_dsl',
+    'utils.player_similarity',
+    'utils.player_finder',
+    'utils.player_comparison',
+    'utils.card_renderer',
+    'utils.scouting_api',
+]
+
+# Heavy libraries reported when a target pulls them in
+HEAVY_LIBRARIES = ['streamlit', 'pandas', 'matplotlib', 'plotly', 'sklearn', 'scipy']
+
+
+def get_app_startup_code() -> str:
+    """Top-level import statements of app.py as runnable code"""
+    with open(os.path.join(REPO_ROOT, 'app.py'), encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return '\n'.join(ast.unparse(node) for node in imports)
+
+
+def measure_import(code: str) -> Dict:
+    """
+    Run code under -X importtime in a fresh interpreter
+
+    Args:
+        code: Python source performing the imports
+
+    Returns:
+        Dictionary with total_ms (sum of self times), top-level module count and
+        the heavy libraries that were imported
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+
+    total_us = 0
+    loaded = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        total_us += int(self_us)
+        loaded.add(name.strip().split('.')[0])
+
+    return {
+        'total_ms': total_us / 1000,
+        'modules': len(loaded),
+        'heavy': [lib for lib in HEAVY_LIBRARIES if lib in loaded]
+    }
+
+
+def run(targets: Dict[str, str], repeat: int) -> List[Dict]:
+    """Best of ``repeat`` runs for every target"""
+    results = []
+    for name, code in targets.items():
+        runs = [measure_import(code) for _ in range(repeat)]
+        best = min(runs, key=lambda r: r['total_ms'])
+        results.append({'target': name, **best})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark module import times")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--modules', nargs='*', default=MODULES, help="Modules to time besides the app")
+    parser.add_argument('--json', help="Write results to this JSON file for tracking")
+    args = parser.parse_args()
+
+    targets = {'app (startup imports)': get_app_startup_code()}
+    targets.update({module: f"import {module}" for module in args.modules})
+
+    results = run(targets, args.repeat)
+
+    print(f"{'target':<28} {'import ms':>10} {'modules':>8}  heavy libraries")
+    for r in results:
+        print(f"{r['target']:<28} {r['total_ms']:>10.1f} {r['modules']:>8}  {', '.join(r['heavy'])}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version.split()[0], 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark appending small batches of players against a full rebuild
+
+For every batch size the table compares prepare_loaded_data over the combined
+rows (the full rebuild) with append_players, and with the rank update alone
+(IncrementalPercentiles.append). Every appended frame is checked to match the
+rebuild exactly. The incremental structure is built once per dataset (first
+append); its build time is shown in the header.
+
+Usage:
+    python -m benchmarks.bench_incremental_percentiles --rows 50000 200000 --batch 1 10 100 1000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import make_player_frame, time_call
+from config.stat_categories import STAT_CATEGORIES
+from utils.column_store import DATASET_VERSION_ATTR, get_column_store
+from utils.data_loader import append_players, get_all_stat_columns, prepare_loaded_data
+
+
+def check_exact(appended: pd.DataFrame, rebuilt: pd.DataFrame):
+    """Raise if the appended frame's percentiles or composites differ from the rebuild"""
+    derived_cols = [col for col in rebuilt.columns if col.endswith('_percentile') or col.startswith('COMP_')]
+    if list(appended.columns) != list(rebuilt.columns):
+        raise AssertionError("Appended frame has different columns than the rebuild")
+    if not np.array_equal(appended[derived_cols].to_numpy(), rebuilt[derived_cols].to_numpy(), equal_nan=True):
+        raise AssertionError("Appended percentiles differ from the rebuild")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental percentile appends")
+    parser.add_argument('--rows', type=int, nargs='+', default=[50000, 200000])
+    parser.add_argument('--batch', type=int, nargs='+', default=[1, 10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    stat_columns = get_all_stat_columns(STAT_CATEGORIES)
+    present = list(dict.fromkeys(stat_columns))
+
+    for n_rows in args.rows:
+        raw = make_player_frame(n_rows, seed=0)
+        # Versioned like loaded data, so cache lookups do not hash the frame
+        raw.attrs[DATASET_VERSION_ATTR] = f"bench-{n_rows}"
+        df = prepare_loaded_data(raw, STAT_CATEGORIES, rank_cohorts=False)
+
+        # Build the incremental structure once (the first append of a dataset pays for it)
+        start = time.perf_counter()
+        append_players(df, make_player_frame(1, seed=1), STAT_CATEGORIES)
+        first_seconds = time.perf_counter() - start
+        incremental = get_column_store(df).artifact('incremental_percentiles', None)
+
+        print(f"\n{n_rows} rows (first append incl. structure build: {first_seconds:.3f}s)")
+        print(f"{'batch':>7} {'rebuild (s)':>12} {'append (s)':>11} {'ranks only (s)':>15} {'speedup':>8}")
+        for batch in args.batch:
+            new_players = make_player_frame(batch, seed=batch + 1)
+            combined_raw = pd.concat([raw, new_players], ignore_index=True)
+            new_values = new_players[present].to_numpy(dtype=np.float64)
+
+            rebuild = time_call(lambda: prepare_loaded_data(combined_raw, STAT_CATEGORIES, rank_cohorts=False),
+                                args.repeat)
+            append = time_call(lambda: append_players(df, new_players, STAT_CATEGORIES), args.repeat)
+            ranks = time_call(lambda: incremental.append(new_values), args.repeat)
+
+            check_exact(append_players(df, new_players, STAT_CATEGORIES),
+                        prepare_loaded_data(combined_raw, STAT_CATEGORIES, rank_cohorts=False))
+            print(f"{batch:>7} {rebuild['best']:>12.3f} {append['best']:>11.3f} {ranks['best']:>15.4f} "
+                  f"{rebuild['best'] / append['best']:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
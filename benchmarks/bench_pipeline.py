@@ -0,0 +1,284 @@
+"""
+End-to-end benchmark of the data pipeline and scoring engines
+
+Runs outside Streamlit over synthetic datasets (benchmarks/synthetic_data.py)
+of several sizes and times every stage: CSV loading, percentiles, composite
+attributes, filtering, preset scoring, similarity and the contribution
+breakdowns. Each step also gets a tracemalloc peak (memory allocated on top of
+what was live before the step), and every size records the process peak RSS.
+
+Results are written as JSON; --compare flags steps that got slower or hungrier
+than a stored baseline (exit code 1 when something regressed).
+
+Usage:
+    python -m benchmarks.bench_pipeline --rows 5000 50000 200000 --json results.json
+    python -m benchmarks.bench_pipeline --rows 5000 50000 --compare baseline.json
+    python -m benchmarks.bench_pipeline --current results.json --compare baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import time_call
+from benchmarks.synthetic_data import write_dataset
+from config.composite_attributes import COMPOSITE_ATTRIBUTES
+from config.defender_presets import DEFENDER_PRESETS
+from config.stat_categories import STAT_CATEGORIES
+from utils.data_loader import (
+    calculate_composite_attributes_batch, calculate_percentiles, filter_players,
+    get_all_stat_columns, load_all_league_data, prepare_data_global
+)
+from utils.player_similarity import SimilarityScorer
+from utils.preset_scoring import DefenderScorer
+
+# Relative slowdown / memory growth reported as a regression
+TIME_TOLERANCE = 0.25
+MEMORY_TOLERANCE = 0.10
+
+# Steps faster than this are too noisy to flag
+MIN_COMPARABLE_SECONDS = 0.005
+
+
+def get_dataset_folder(cache_dir: str, n_rows: int, n_leagues: int, seed: int) -> str:
+    """
+    Get (and generate on first use) a synthetic dataset folder
+
+    Args:
+        cache_dir: Folder holding generated datasets
+        n_rows: Number of players
+        n_leagues: Number of leagues
+        seed: Random seed
+
+    Returns:
+        Data folder for load_all_league_data
+    """
+    folder = os.path.join(cache_dir, f"rows{n_rows}_leagues{n_leagues}_seed{seed}")
+    marker = os.path.join(folder, '.complete')
+    if not os.path.exists(marker):
+        write_dataset(folder, n_rows, n_leagues, seed, verbose=False)
+        open(marker, 'w').close()
+    return folder
+
+
+def measure_peak_memory(fn: Callable) -> float:
+    """Peak MB allocated by one call on top of the memory live before it"""
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return (peak - baseline) / 1e6
+
+
+def get_peak_rss_mb() -> float:
+    """Peak resident set size of this process so far"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3
+
+
+def build_steps(data_folder: str) -> Dict[str, Callable]:
+    """
+    Build the benchmarked steps over one dataset
+
+    The inputs of every step are prepared up front, so each step times only its
+    own function.
+
+    Args:
+        data_folder: Synthetic data folder
+
+    Returns:
+        Ordered dictionary of {step name: function without arguments}
+    """
+    stat_columns = get_all_stat_columns(STAT_CATEGORIES)
+    composite_columns = [f"COMP_{attr}" for attr in COMPOSITE_ATTRIBUTES]
+
+    raw = load_all_league_data(data_folder)
+    with_percentiles = calculate_percentiles(raw, stat_columns)
+    df = prepare_data_global(data_folder, STAT_CATEGORIES)
+
+    leagues = sorted(df['League'].unique())[:3]
+    preset_name = next(iter(DEFENDER_PRESETS))
+    preset_scorer = DefenderScorer(DEFENDER_PRESETS)
+    similarity_scorer = SimilarityScorer(df, stat_columns, composite_columns)
+
+    # Reference players with plenty of minutes, so they survive every filter
+    minutes = df['Minutes played'] if 'Minutes played' in df.columns else pd.Series(0, index=df.index)
+    reference, other = df.loc[minutes.sort_values(ascending=False).index[:2], 'Player']
+    similarity_weights = {f"COMP_{attr}": 0.2 for attr in COMPOSITE_ATTRIBUTES}
+    metric_weights = {col: 1.0 for col in stat_columns[:8]}
+
+    return {
+        'load_all_league_data': lambda: load_all_league_data(data_folder),
+        'calculate_percentiles': lambda: calculate_percentiles(raw, stat_columns),
+        'calculate_composite_attributes_batch':
+            lambda: calculate_composite_attributes_batch(with_percentiles, stat_columns, COMPOSITE_ATTRIBUTES),
+        'prepare_data_global': lambda: prepare_data_global(data_folder, STAT_CATEGORIES),
+        'filter_players': lambda: filter_players(df, positions=['CB', 'LB', 'RB'], leagues=leagues,
+                                                 expression='Age < 28'),
+        'calculate_preset_score': lambda: preset_scorer.calculate_preset_score(df, preset_name),
+        'similarity_setup': lambda: SimilarityScorer(df, stat_columns, composite_columns),
+        'calculate_similarity': lambda: similarity_scorer.calculate_similarity(reference, similarity_weights),
+        'preset_contributions': lambda: preset_scorer.get_metric_contributions(df, df.index[0], preset_name),
+        'similarity_metric_contributions':
+            lambda: similarity_scorer.get_metric_contributions(reference, other, metric_weights),
+        'similarity_composite_contributions':
+            lambda: similarity_scorer.get_composite_contributions(reference, other, similarity_weights,
+                                                                  COMPOSITE_ATTRIBUTES),
+    }
+
+
+def run_suite(sizes: List[int], n_leagues: int, seed: int, repeat: int, cache_dir: str,
+              steps: List[str] = None) -> Dict:
+    """
+    Run the benchmark over every dataset size
+
+    Args:
+        sizes: Player counts
+        n_leagues: Number of leagues of the synthetic datasets
+        seed: Random seed of the synthetic datasets
+        repeat: Timed calls per step
+        cache_dir: Folder holding generated datasets
+        steps: Step names to run (default: all)
+
+    Returns:
+        Dictionary with environment info and one result per (rows, step)
+    """
+    results = []
+    for n_rows in sizes:
+        folder = get_dataset_folder(cache_dir, n_rows, n_leagues, seed)
+        for name, fn in build_steps(folder).items():
+            if steps and name not in steps:
+                continue
+            timing = time_call(fn, repeat)
+            peak_mb = measure_peak_memory(fn)
+            results.append({
+                'rows': n_rows,
+                'step': name,
+                'first_s': timing['first'],
+                'best_s': timing['best'],
+                'mean_s': timing['mean'],
+                'peak_mb': peak_mb
+            })
+            print(f"{n_rows:>10} {name:<36} {timing['best']:>10.4f} {timing['first']:>10.4f} {peak_mb:>10.1f}",
+                  flush=True)
+        results.append({'rows': n_rows, 'step': 'process_peak_rss', 'peak_mb': get_peak_rss_mb()})
+
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'leagues': n_leagues,
+        'seed': seed,
+        'repeat': repeat,
+        'results': results
+    }
+
+
+def compare_results(current: Dict, baseline: Dict, time_tolerance: float = TIME_TOLERANCE,
+                    memory_tolerance: float = MEMORY_TOLERANCE) -> List[Dict]:
+    """
+    Compare two suite results step by step
+
+    Args:
+        current: Result of run_suite
+        baseline: Stored result of run_suite
+        time_tolerance: Allowed relative slowdown of best_s
+        memory_tolerance: Allowed relative growth of peak_mb
+
+    Returns:
+        One row per (rows, step) present in both, with time and memory ratios and
+        a 'regression' flag
+    """
+    baseline_index = {(r['rows'], r['step']): r for r in baseline['results']}
+    rows = []
+    for result in current['results']:
+        base = baseline_index.get((result['rows'], result['step']))
+        if base is None:
+            continue
+
+        time_ratio = None
+        if 'best_s' in result and 'best_s' in base and base['best_s'] > 0:
+            time_ratio = result['best_s'] / base['best_s']
+        memory_ratio = result['peak_mb'] / base['peak_mb'] if base['peak_mb'] > 0 else None
+
+        slower = (time_ratio is not None and time_ratio > 1 + time_tolerance
+                  and result['best_s'] >= MIN_COMPARABLE_SECONDS)
+        hungrier = (memory_ratio is not None and memory_ratio > 1 + memory_tolerance
+                    and result['peak_mb'] - base['peak_mb'] >= 1.0)
+        rows.append({
+            'rows': result['rows'],
+            'step': result['step'],
+            'time_ratio': time_ratio,
+            'memory_ratio': memory_ratio,
+            'regression': slower or hungrier
+        })
+    return rows
+
+
+def _format_ratio(ratio) -> str:
+    return f"{ratio:.2f}x" if ratio is not None else '-'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark on synthetic data")
+    parser.add_argument('--rows', type=int, nargs='+', default=[5000, 50000, 200000])
+    parser.add_argument('--leagues', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--steps', nargs='*', help="Only run these steps")
+    parser.add_argument('--cache-dir', default=os.path.join(tempfile.gettempdir(), 'scouting-bench-data'),
+                        help="Folder for generated datasets (reused between runs)")
+    parser.add_argument('--json', help="Write results to this JSON file")
+    parser.add_argument('--compare', help="Baseline JSON to flag regressions against")
+    parser.add_argument('--current', help="Compare this stored result instead of running the suite")
+    parser.add_argument('--time-tolerance', type=float, default=TIME_TOLERANCE)
+    parser.add_argument('--memory-tolerance', type=float, default=MEMORY_TOLERANCE)
+    args = parser.parse_args()
+
+    if args.current:
+        with open(args.current, encoding='utf-8') as f:
+            current = json.load(f)
+    else:
+        print(f"{'rows':>10} {'step':<36} {'best s':>10} {'first s':>10} {'peak MB':>10}")
+        current = run_suite(args.rows, args.leagues, args.seed, args.repeat, args.cache_dir, args.steps)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        comparison = compare_results(current, baseline, args.time_tolerance, args.memory_tolerance)
+
+        print(f"\n{'rows':>10} {'step':<36} {'time':>8} {'memory':>8}")
+        for row in comparison:
+            flag = '  REGRESSION' if row['regression'] else ''
+            print(f"{row['rows']:>10} {row['step']:<36} {_format_ratio(row['time_ratio']):>8} "
+                  f"{_format_ratio(row['memory_ratio']):>8}{flag}")
+
+        regressions = [row for row in comparison if row['regression']]
+        print(f"\n{len(regressions)} regression(s) in {len(comparison)} compared steps")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
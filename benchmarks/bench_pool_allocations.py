@@ -0,0 +1,109 @@
+"""
+Measure the memory allocated by one similarity click and one preset scoring
+
+Every step is run once untraced (so per-dataset caches such as the column
+store arrays and key indexes are built), then again under tracemalloc. The
+table shows each step's peak allocation in MB and as a multiple of the
+dataset's size, i.e. how many copies of the dataset the step holds at once.
+
+Steps:
+    filter all       filter_players without filters (the app's default pool)
+    filter           filter_players by position
+    scorer           SimilarityScorer over the filtered pool
+    similarity       calculate_similarity for one reference player (top 30)
+    click            filter + scorer + similarity, as one app rerun does
+    click all        the same click over the unfiltered pool
+    preset           DefenderScorer.calculate_preset_score over the filtered pool
+
+Copy-on-write is turned on as in the app; --no-cow measures without it.
+
+Usage:
+    python -m benchmarks.bench_pool_allocations --rows 50000 200000
+"""
+import argparse
+import tracemalloc
+from typing import Callable, Tuple
+
+from benchmarks.common import make_player_frame
+from config.composite_attributes import COMPOSITE_ATTRIBUTES
+from config.defender_presets import DEFENDER_PRESETS
+from config.stat_categories import STAT_CATEGORIES
+from utils.column_store import DATASET_VERSION_ATTR, enable_copy_on_write
+from utils.data_loader import filter_players, get_all_stat_columns, prepare_loaded_data
+from utils.player_similarity import SimilarityScorer
+from utils.preset_scoring import DefenderScorer
+
+# Positions of the filtered pool (centre-backs and full-backs, as on the Player Finder page)
+POOL_POSITIONS = ['CB', 'LCB', 'RCB', 'LB', 'RB']
+
+
+def traced_peak(fn: Callable) -> Tuple[float, object]:
+    """
+    Run a function under tracemalloc
+
+    Args:
+        fn: Function called without arguments
+
+    Returns:
+        (peak allocation in MB during the call, the function's result)
+    """
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        result = fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peak / 1e6, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure allocations of similarity and preset scoring")
+    parser.add_argument('--rows', type=int, nargs='+', default=[50000, 200000])
+    parser.add_argument('--no-cow', action='store_true',
+                        help="Leave pandas copy-on-write off (the app and CLIs turn it on)")
+    args = parser.parse_args()
+    if not args.no_cow:
+        enable_copy_on_write()
+
+    stat_columns = get_all_stat_columns(STAT_CATEGORIES)
+    composite_columns = [f"COMP_{attr}" for attr in COMPOSITE_ATTRIBUTES]
+    weights = {col: 0.2 for col in composite_columns[:5]}
+    preset_name = next(iter(DEFENDER_PRESETS))
+
+    print(f"{'rows':>8} {'dataset (MB)':>13} {'step':>11} {'peak (MB)':>10} {'x dataset':>10}")
+    for n_rows in args.rows:
+        raw = make_player_frame(n_rows, seed=0)
+        raw.attrs[DATASET_VERSION_ATTR] = f"bench-{n_rows}"
+        df = prepare_loaded_data(raw, STAT_CATEGORIES, rank_cohorts=False)
+        del raw
+        dataset_mb = df.memory_usage(index=True, deep=False).sum() / 1e6
+
+        pool = filter_players(df, positions=POOL_POSITIONS)
+        reference = pool['Player'].iloc[0]
+        scorer = SimilarityScorer(pool, stat_columns, composite_columns)
+
+        def click(positions=None):
+            click_pool = filter_players(df, positions=positions)
+            click_scorer = SimilarityScorer(click_pool, stat_columns, composite_columns)
+            return click_scorer.calculate_similarity(reference, weights, same_position_only=False, top_n=30)
+
+        steps = [
+            ('filter all', lambda: filter_players(df)),
+            ('filter', lambda: filter_players(df, positions=POOL_POSITIONS)),
+            ('scorer', lambda: SimilarityScorer(pool, stat_columns, composite_columns)),
+            ('similarity', lambda: scorer.calculate_similarity(reference, weights, same_position_only=False,
+                                                               top_n=30)),
+            ('click', lambda: click(POOL_POSITIONS)),
+            ('click all', click),
+            ('preset', lambda: DefenderScorer(DEFENDER_PRESETS).calculate_preset_score(pool, preset_name,
+                                                                                       top_n_limit=30)),
+        ]
+        for name, fn in steps:
+            fn()
+            peak_mb, _ = traced_peak(fn)
+            print(f"{n_rows:>8} {dataset_mb:>13.1f} {name:>11} {peak_mb:>10.1f} {peak_mb / dataset_mb:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
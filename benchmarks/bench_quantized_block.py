@@ -0,0 +1,59 @@
+"""
+Benchmark compact (uint16 fixed-point) percentile storage against float64
+
+For every row count the table compares the float64 and the compact storage
+mode: memory of the percentile + composite block, the composite matrix product
+over the percentile block (calculate_composite_attributes_batch), decoding one
+column for a scorer, and the largest difference from the float64 values.
+
+Usage:
+    python -m benchmarks.bench_quantized_block --rows 50000 200000
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.common import make_player_frame, time_call
+from config.composite_attributes import COMPOSITE_ATTRIBUTES
+from config.stat_categories import STAT_CATEGORIES
+from utils.column_store import DATASET_VERSION_ATTR
+from utils.data_loader import calculate_composite_attributes_batch, get_all_stat_columns, prepare_loaded_data
+from utils.quantized_block import column_values, decode_frame, is_block_column
+
+
+def block_megabytes(df) -> float:
+    """Memory of the percentile and composite columns in MB"""
+    block_cols = [col for col in df.columns if is_block_column(col)]
+    return df[block_cols].memory_usage(index=False).sum() / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compact percentile storage")
+    parser.add_argument('--rows', type=int, nargs='+', default=[50000, 200000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    stat_columns = get_all_stat_columns(STAT_CATEGORIES)
+    print(f"{'rows':>8} {'mode':>8} {'block (MB)':>11} {'composites (s)':>15} {'decode col (s)':>15} {'max err':>8}")
+
+    for n_rows in args.rows:
+        raw = make_player_frame(n_rows, seed=0)
+        frames = {}
+        for mode, compact in [('float64', False), ('compact', True)]:
+            mode_raw = raw.copy()
+            mode_raw.attrs[DATASET_VERSION_ATTR] = f"bench-{n_rows}-{mode}"
+            frames[mode] = prepare_loaded_data(mode_raw, STAT_CATEGORIES, rank_cohorts=False, compact=compact)
+
+        block_cols = [col for col in frames['float64'].columns if is_block_column(col)]
+        reference = frames['float64'][block_cols].to_numpy()
+        for mode, df in frames.items():
+            composites = time_call(lambda: calculate_composite_attributes_batch(df, stat_columns, COMPOSITE_ATTRIBUTES),
+                                   args.repeat)
+            decode = time_call(lambda: column_values(df, 'COMP_Security'), args.repeat)
+            error = np.nanmax(np.abs(decode_frame(df)[block_cols].to_numpy() - reference))
+            print(f"{n_rows:>8} {mode:>8} {block_megabytes(df):>11.1f} {composites['best']:>15.4f} "
+                  f"{decode['best']:>15.5f} {error:>8.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Load test the local HTTP query service
+
+Starts the service in-process on a free localhost port, drives it with
+concurrent clients for a fixed duration and prints throughput plus the
+service's own per-endpoint latency histograms.
+
+Usage:
+    python -m benchmarks.bench_query_service --data data/2025 --clients 8 --workers 4 --seconds 20
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List
+
+from utils.query_service import create_server
+from utils.scouting_api import ScoutingSession
+
+
+def build_requests(session: ScoutingSession, n: int, batch_size: int, seed: int = 0) -> List[Dict]:
+    """
+    Build a random mix of service requests
+
+    Args:
+        session: ScoutingSession the service runs on
+        n: Number of requests
+        batch_size: Queries per /similar batch request (1 = no batching)
+        seed: Random seed
+
+    Returns:
+        List of {'path', 'body'} dictionaries
+    """
+    rng = random.Random(seed)
+    players = session.df['Player'].dropna().unique().tolist()
+    ids = session.df.index.tolist()
+    leagues = session.df['League'].dropna().unique().tolist()
+    presets = list(session.presets)
+    percentile_stats = session.stat_columns[:5]
+
+    requests = []
+    for i in range(n):
+        kind = i % 4
+        if kind == 0:
+            if batch_size > 1:
+                body = [{'player': rng.choice(players), 'top_n': 10} for _ in range(batch_size)]
+            else:
+                body = {'player': rng.choice(players), 'top_n': 10}
+            requests.append({'path': '/similar', 'body': body})
+        elif kind == 1:
+            requests.append({'path': '/finder', 'body': {'preset': rng.choice(presets), 'top_n': 30,
+                                                          'leagues': [rng.choice(leagues)]}})
+        elif kind == 2:
+            requests.append({'path': f"/player/{rng.choice(ids)}", 'body': None})
+        else:
+            stats = {col: rng.uniform(0, 10) for col in percentile_stats}
+            requests.append({'path': '/percentile', 'body': {'stats': stats}})
+    return requests
+
+
+def _send(base_url: str, request: Dict) -> int:
+    """Send one request and return the HTTP status"""
+    data = json.dumps(request['body']).encode('utf-8') if request['body'] is not None else None
+    req = urllib.request.Request(base_url + request['path'], data=data,
+                                 headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def run_load(base_url: str, requests: List[Dict], clients: int, seconds: float) -> Dict:
+    """
+    Replay requests from concurrent clients until the time is up
+
+    Returns:
+        Dictionary with requests, errors, seconds and requests_per_second
+    """
+    deadline = time.perf_counter() + seconds
+    counters = {'requests': 0, 'errors': 0}
+    lock = threading.Lock()
+
+    def client(offset: int):
+        i = offset
+        while time.perf_counter() < deadline:
+            status = _send(base_url, requests[i % len(requests)])
+            i += clients
+            with lock:
+                counters['requests'] += 1
+                counters['errors'] += int(status >= 400)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(offset,)) for offset in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return dict(counters, seconds=elapsed, requests_per_second=counters['requests'] / elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the local query service")
+    parser.add_argument('--data', default='data/2025', help="Folder with league CSV files")
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--batch-size', type=int, default=1, help="Queries per /similar request")
+    parser.add_argument('--json', help="Write results to this JSON file for tracking")
+    args = parser.parse_args()
+
+    session = ScoutingSession(args.data)
+    session.get_similarity_scorer()
+    server = create_server(session, port=0, workers=args.workers)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    try:
+        load = run_load(base_url, build_requests(session, 1000, args.batch_size), args.clients, args.seconds)
+        stats = server.latency.snapshot()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print(f"{load['requests']} requests ({load['errors']} errors) in {load['seconds']:.1f}s "
+          f"= {load['requests_per_second']:.1f} req/sec with {args.clients} clients, {args.workers} workers")
+    print(f"{'endpoint':<12} {'requests':>9} {'items':>7} {'mean ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>9}")
+    for endpoint, s in sorted(stats.items()):
+        print(f"{endpoint:<12} {s['requests']:>9} {s['items']:>7} {s['mean_ms']:>9.1f} {s['p50_ms']:>8.0f} "
+              f"{s['p95_ms']:>8.0f} {s['p99_ms']:>8.0f} {s['max_ms']:>9.1f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'load': load, 'latency': stats, 'clients': args.clients,
+                       'workers': args.workers, 'batch_size': args.batch_size}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
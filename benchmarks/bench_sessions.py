@@ -0,0 +1,450 @@
+"""
+Concurrent-session load test of the Streamlit app
+
+Starts the app with ``streamlit run`` on a local port and connects N simulated
+browser sessions to it over the app's websocket, so every session gets its own
+script thread and session state inside one server process while sharing the
+cached global frame, exactly as in production. Each session replays a realistic
+flow: change the league and position filters, run a similarity search, open a
+similar player's detail, score a Player Finder preset, open a player's detail
+and compare two players.
+
+The driver speaks the frontend's protocol: it sends a rerun request with the
+widget values the flow changed, collects the forward messages until the script
+finishes and rebuilds the element tree (streamlit.testing.v1) to find the next
+widget to change. Every rerun is timed from request to finished script; the
+report gives p50/p95/p99 rerun latency, throughput and the server's RSS
+(sampled in the background) for each session count.
+
+Usage:
+    python -m benchmarks.bench_sessions --data data/2025 --sessions 1 2 4 8 --iterations 2
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from typing import Dict, List
+
+import numpy as np
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+
+# Seconds a single rerun may take before the session gives up
+RERUN_TIMEOUT = 300
+
+# Seconds to wait for the server to answer its health check
+STARTUP_TIMEOUT = 120
+
+# RSS sampling interval in seconds
+RSS_SAMPLE_INTERVAL = 0.2
+
+
+def get_rss_mb(pid: int) -> float:
+    """Current resident set size of a process (None where /proc is unavailable)"""
+    try:
+        with open(f'/proc/{pid}/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class RssSampler:
+    """Background thread sampling the RSS of a process"""
+
+    def __init__(self, pid: int, interval: float = RSS_SAMPLE_INTERVAL):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self):
+        rss = get_rss_mb(self.pid)
+        if rss is not None:
+            self.samples.append(rss)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+def prepare_app_dir(data_folder: str) -> str:
+    """
+    Make a working directory where the app finds ``data/2025``
+
+    The app reads its data relative to the working directory, so a temporary
+    directory with a link to the requested data folder is used.
+
+    Args:
+        data_folder: Folder with the def/mid/fwd league CSVs
+
+    Returns:
+        Working directory to run the app from
+    """
+    app_dir = tempfile.mkdtemp(prefix='scouting-sessions-')
+    os.makedirs(os.path.join(app_dir, 'data'))
+    os.symlink(os.path.abspath(data_folder), os.path.join(app_dir, 'data', '2025'))
+    return app_dir
+
+
+def start_server(app_dir: str, port: int = 0) -> subprocess.Popen:
+    """
+    Start the app with ``streamlit run`` and wait until it is healthy
+
+    Args:
+        app_dir: Working directory of the app (see prepare_app_dir)
+        port: Port to listen on (0 picks a free one)
+
+    Returns:
+        The server process, with the chosen port in its ``port`` attribute
+
+    Raises:
+        ValueError: If the server exits or does not come up in time
+    """
+    if port == 0:
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', APP_PATH,
+         '--server.headless', 'true', '--server.address', '127.0.0.1', '--server.port', str(port),
+         '--server.fileWatcherType', 'none', '--browser.gatherUsageStats', 'false'],
+        cwd=app_dir, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    process.port = port
+
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise ValueError(f"Streamlit server exited: {process.stderr.read().decode(errors='replace')[-2000:]}")
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/_stcore/health', timeout=2) as response:
+                if response.status == 200:
+                    return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise ValueError(f"Streamlit server did not answer on port {port} within {STARTUP_TIMEOUT} s")
+
+
+class SessionDriver:
+    """
+    One simulated browser session on a running server
+    """
+
+    def __init__(self, port: int, session_id: int, seed: int = 0):
+        self.port = port
+        self.session_id = session_id
+        self.rng = random.Random(seed * 1000 + session_id)
+        self.tree = None
+        self.latencies = []
+        self.errors = []
+        self._connection = None
+        self._page_script_hash = ''
+        self._widget_states = {}
+        self._message_cache = {}
+
+    async def connect(self):
+        from tornado.websocket import websocket_connect
+
+        self._connection = await websocket_connect(
+            f'ws://127.0.0.1:{self.port}/_stcore/stream', subprotocols=['streamlit'],
+            max_message_size=1 << 30
+        )
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    async def _send_rerun(self, trigger=None):
+        """Ask for a rerun with the widget values set so far (and a one-off button trigger)"""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+
+        msg = BackMsg()
+        client_state = msg.rerun_script
+        client_state.query_string = ''
+        client_state.page_script_hash = self._page_script_hash
+        states = list(self._widget_states.values()) + ([trigger] if trigger is not None else [])
+        client_state.widget_states.widgets.extend(states)
+        await self._connection.write_message(msg.SerializeToString(), binary=True)
+
+    def _resolve(self, msg):
+        """Swap a cached-message reference for the message it points to"""
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        if msg.WhichOneof('type') == 'ref_hash':
+            cached = self._message_cache.get(msg.ref_hash)
+            if cached is None:
+                url = f'http://127.0.0.1:{self.port}/_stcore/message?hash={msg.ref_hash}'
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    cached = ForwardMsg.FromString(response.read())
+                self._message_cache[msg.ref_hash] = cached
+            resolved = ForwardMsg()
+            resolved.CopyFrom(cached)
+            resolved.metadata.CopyFrom(msg.metadata)
+            return resolved
+        if msg.metadata.cacheable and msg.hash:
+            self._message_cache[msg.hash] = msg
+        return msg
+
+    async def _collect_run(self) -> List:
+        """Read forward messages until the script run finishes"""
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        messages = []
+        while True:
+            raw = await asyncio.wait_for(self._connection.read_message(), RERUN_TIMEOUT)
+            if raw is None:
+                raise ValueError("websocket closed by the server")
+            msg = self._resolve(ForwardMsg.FromString(raw))
+            kind = msg.WhichOneof('type')
+            if kind == 'new_session':
+                self._page_script_hash = msg.new_session.page_script_hash
+                messages = []
+            elif kind == 'script_finished':
+                # st.rerun() restarts the script: keep reading the new run
+                if msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    return messages
+                messages = []
+            else:
+                messages.append(msg)
+
+    async def _rerun(self, action: str, widget=None):
+        """Send one widget change (or a plain rerun) and time the script run"""
+        from streamlit.testing.v1.element_tree import Button, Widget, parse_tree_from_messages
+
+        trigger = None
+        if widget is not None:
+            state = widget._widget_state
+            if isinstance(widget, Button):
+                trigger = state
+            else:
+                self._widget_states[state.id] = state
+
+        start = time.perf_counter()
+        await self._send_rerun(trigger)
+        messages = await self._collect_run()
+        elapsed = time.perf_counter() - start
+        self.latencies.append({'action': action, 'seconds': elapsed})
+
+        self.tree = parse_tree_from_messages(messages)
+        # Like the browser, only report widgets that are still on the page
+        live_ids = {node.id for node in self.tree if isinstance(node, Widget)}
+        self._widget_states = {wid: s for wid, s in self._widget_states.items() if wid in live_ids}
+        if self.tree.exception:
+            self.errors.append(f"{action}: {self.tree.exception[0].value}")
+
+    def _pick(self, options: List, k: int = 1) -> List:
+        options = list(options)
+        return self.rng.sample(options, min(k, len(options)))
+
+    def _find(self, widgets, key: str = None, label_prefix: str = None):
+        for widget in widgets:
+            if (key is not None and widget.key == key) or \
+               (label_prefix is not None and widget.label.startswith(label_prefix)):
+                return widget
+        return None
+
+    async def run_flow(self):
+        """One pass of the analyst flow"""
+        if self.tree is None:
+            await self._rerun('open')
+
+        sidebar = self.tree.sidebar
+        league_filter = self._find(sidebar.multiselect, key='global_league_filter')
+        leagues = [opt for opt in league_filter.options if opt != 'All Leagues']
+        await self._rerun('filter_leagues', league_filter.set_value(self._pick(leagues, 2)))
+        position_filter = self._find(self.tree.sidebar.radio, key='global_position_group_filter')
+        await self._rerun('filter_position',
+                          position_filter.set_value(self.rng.choice(['All', 'CB', 'Defender', 'Forward'])))
+
+        # Similarity search and a similar player's detail
+        await self._navigate('page_similarity', '🔍 Player Similarity')
+        reference = self._find(self.tree.selectbox, key='similarity_reference_player')
+        if reference is not None and reference.options:
+            await self._rerun('pick_reference', reference.set_value(self._pick(reference.options)[0]))
+            button = self._find(self.tree.button, key='calculate_similarity')
+            if button is not None:
+                await self._rerun('run_similarity', button.click())
+            detail = self._find(self.tree.selectbox, key='detail_similar_player')
+            if detail is not None and detail.options:
+                await self._rerun('similarity_detail', detail.set_value(self._pick(detail.options)[0]))
+
+        # Player Finder preset and a player's detail
+        await self._navigate('page_finder', '🎯 Player Finder')
+        button = self._find(self.tree.button, label_prefix='🔄 Calculate')
+        if button is not None:
+            await self._rerun('run_finder', button.click())
+            detail = self._find(self.tree.selectbox, key='player_detail_select')
+            if detail is not None and detail.options:
+                await self._rerun('finder_detail', detail.set_value(self._pick(detail.options)[0]))
+
+        # Compare two players
+        await self._navigate('page_comparison', '⚽ Player Comparison')
+        players = self._find(self.tree.multiselect, key='selected_players')
+        if players is not None and players.options:
+            await self._rerun('compare_players', players.set_value(self._pick(players.options, 2)))
+
+        # Back to the unfiltered pool
+        league_filter = self._find(self.tree.sidebar.multiselect, key='global_league_filter')
+        await self._rerun('reset_filters', league_filter.set_value(['All Leagues']))
+        position_filter = self._find(self.tree.sidebar.radio, key='global_position_group_filter')
+        await self._rerun('reset_position', position_filter.set_value('All'))
+
+    async def _navigate(self, action: str, page: str):
+        navigation = self._find(self.tree.sidebar.radio, key='page_navigation')
+        await self._rerun(action, navigation.set_value(page))
+
+
+def _percentiles(values) -> Dict:
+    values = np.asarray(values)
+    if len(values) == 0:
+        return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None, 'max_ms': None}
+    return {
+        'p50_ms': float(np.percentile(values, 50) * 1000),
+        'p95_ms': float(np.percentile(values, 95) * 1000),
+        'p99_ms': float(np.percentile(values, 99) * 1000),
+        'max_ms': float(values.max() * 1000)
+    }
+
+
+async def _run_drivers(drivers: List[SessionDriver], iterations: int):
+    async def worker(driver: SessionDriver):
+        try:
+            await driver.connect()
+            for _ in range(iterations):
+                await driver.run_flow()
+        except Exception as e:
+            driver.errors.append(f"flow: {type(e).__name__}: {str(e)}")
+        finally:
+            driver.close()
+
+    await asyncio.gather(*(worker(driver) for driver in drivers))
+
+
+def run_sessions(server: subprocess.Popen, n_sessions: int, iterations: int, seed: int = 0) -> Dict:
+    """
+    Run concurrent sessions against a server and summarize their rerun latencies
+
+    Args:
+        server: Process returned by start_server
+        n_sessions: Number of concurrent sessions
+        iterations: Flows per session
+        seed: Random seed of the flows
+
+    Returns:
+        Dictionary with latency percentiles, throughput, errors and server RSS figures
+    """
+    drivers = [SessionDriver(server.port, i, seed) for i in range(n_sessions)]
+
+    rss_before = get_rss_mb(server.pid)
+    start = time.perf_counter()
+    with RssSampler(server.pid) as sampler:
+        asyncio.run(_run_drivers(drivers, iterations))
+    elapsed = time.perf_counter() - start
+
+    latencies = [entry['seconds'] for d in drivers for entry in d.latencies]
+    by_action = {}
+    for d in drivers:
+        for entry in d.latencies:
+            by_action.setdefault(entry['action'], []).append(entry['seconds'])
+
+    errors = [error for d in drivers for error in d.errors]
+    return {
+        'sessions': n_sessions,
+        'reruns': len(latencies),
+        'errors': len(errors),
+        'error_samples': errors[:5],
+        'seconds': elapsed,
+        'reruns_per_second': len(latencies) / elapsed if elapsed > 0 else 0.0,
+        **_percentiles(latencies),
+        'actions': {action: _percentiles(values) for action, values in sorted(by_action.items())},
+        'rss_before_mb': rss_before,
+        'rss_peak_mb': max(sampler.samples) if sampler.samples else None,
+        'rss_after_mb': sampler.samples[-1] if sampler.samples else None
+    }
+
+
+async def _warm_up(driver: SessionDriver):
+    try:
+        await driver.connect()
+        await driver._rerun('warmup')
+    except Exception as e:
+        driver.errors.append(f"{type(e).__name__}: {str(e)}")
+    finally:
+        driver.close()
+
+
+def _format_ms(value) -> str:
+    return f"{value:.0f}" if value is not None else '-'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test of the Streamlit app")
+    parser.add_argument('--data', default=os.path.join('data', '2025'), help="Folder with league CSV files")
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--iterations', type=int, default=2, help="Flows per session")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--port', type=int, default=0, help="Server port (default: a free one)")
+    parser.add_argument('--actions', action='store_true', help="Also print per-action latencies")
+    parser.add_argument('--json', help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    server = start_server(prepare_app_dir(args.data), args.port)
+    try:
+        # Warm the shared data cache once, like a server that is already up
+        warmup = SessionDriver(server.port, -1, args.seed)
+        asyncio.run(_warm_up(warmup))
+        if warmup.errors:
+            raise SystemExit(f"App failed to start: {warmup.errors[0]}")
+
+        results = []
+        print(f"{'sessions':>8} {'reruns':>7} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+              f"{'reruns/s':>9} {'RSS peak MB':>12}")
+        for n_sessions in args.sessions:
+            result = run_sessions(server, n_sessions, args.iterations, args.seed)
+            results.append(result)
+            print(f"{result['sessions']:>8} {result['reruns']:>7} {result['errors']:>6} "
+                  f"{_format_ms(result['p50_ms']):>8} {_format_ms(result['p95_ms']):>8} "
+                  f"{_format_ms(result['p99_ms']):>8} {result['reruns_per_second']:>9.1f} "
+                  f"{_format_ms(result['rss_peak_mb']):>12}", flush=True)
+            if args.actions:
+                for action, stats in result['actions'].items():
+                    print(f"{'':>8} {action:<20} p50 {_format_ms(stats['p50_ms']):>7} ms  "
+                          f"p95 {_format_ms(stats['p95_ms']):>7} ms")
+            for error in result['error_samples']:
+                print(f"{'':>8} error: {error}")
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'iterations': args.iterations, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark sharded percentiles with mergeable quantile sketches
+
+Every shard (one worker process each) builds its own slice of the dataset,
+sketches every stat column (utils/quantile_sketch.py), the sketches are merged
+in the parent, and every shard ranks its rows against the merged sketches.
+Shard data never leaves its worker; only sketches travel.
+
+Per shard count the table shows the exact single-process calculate_percentiles
+time, the slowest shard's sketch and apply times (CPU time of the worker, so
+shards sharing a core do not inflate each other), the merge time, the critical
+path (slowest sketch + merge + slowest apply: the wall time with one core per
+shard), the measured wall time of the process pool on this machine (including
+process start-up and building the shards), and the largest error against exact
+global ranks next to the sketches' error bound.
+
+Usage:
+    python -m benchmarks.bench_sharded_percentiles --rows 200000 --shards 1 2 4 8
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import make_player_frame
+from config.stat_categories import STAT_CATEGORIES
+from utils.data_loader import calculate_percentiles, get_all_stat_columns
+from utils.quantile_sketch import SKETCH_POINTS, build_sketches, merge_sketches
+
+
+def _shard_frame(n_rows: int, n_shards: int, shard: int) -> pd.DataFrame:
+    """Rows of one shard (seeded, so every process builds the same slice)"""
+    sizes = np.diff(np.linspace(0, n_rows, n_shards + 1).astype(int))
+    return make_player_frame(int(sizes[shard]), seed=shard)
+
+
+def _sketch_shard(task: Tuple[int, int, int, int]) -> Tuple[Dict, float]:
+    """Worker: build the shard and sketch it (only the sketching is timed)"""
+    n_rows, n_shards, shard, max_points = task
+    df = _shard_frame(n_rows, n_shards, shard)
+    stat_columns = get_all_stat_columns(STAT_CATEGORIES)
+    start = time.process_time()
+    sketches = build_sketches(df, stat_columns, max_points)
+    return sketches, time.process_time() - start
+
+
+def _apply_shard(task: Tuple[int, int, int, Dict]) -> float:
+    """Worker: build the shard and rank it against the merged sketches (only ranking is timed)"""
+    n_rows, n_shards, shard, merged = task
+    df = _shard_frame(n_rows, n_shards, shard)
+    stat_columns = get_all_stat_columns(STAT_CATEGORIES)
+    start = time.process_time()
+    calculate_percentiles(df, stat_columns, sketches=merged)
+    return time.process_time() - start
+
+
+def run_sharded(n_rows: int, n_shards: int, max_points: int) -> Dict:
+    """
+    Run the sketch, merge and apply phases over a process pool
+
+    Args:
+        n_rows: Rows over all shards
+        n_shards: Number of shards (and worker processes)
+        max_points: Sketch size per stat and shard
+
+    Returns:
+        Dictionary of timings in seconds and the merged sketches
+    """
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=n_shards) as pool:
+        results = list(pool.map(_sketch_shard, [(n_rows, n_shards, s, max_points) for s in range(n_shards)]))
+
+        merge_start = time.perf_counter()
+        merged = merge_sketches([sketches for sketches, _ in results])
+        merge_seconds = time.perf_counter() - merge_start
+
+        apply_seconds = list(pool.map(_apply_shard, [(n_rows, n_shards, s, merged) for s in range(n_shards)]))
+    wall = time.perf_counter() - start
+
+    sketch_seconds = max(seconds for _, seconds in results)
+    return {
+        'sketch': sketch_seconds,
+        'merge': merge_seconds,
+        'apply': max(apply_seconds),
+        'critical_path': sketch_seconds + merge_seconds + max(apply_seconds),
+        'wall': wall,
+        'merged': merged
+    }
+
+
+def max_error(n_rows: int, n_shards: int, merged: Dict, stat_columns: List[str]) -> float:
+    """Largest difference (percentile points) between sketched and exact global percentiles"""
+    shards = [_shard_frame(n_rows, n_shards, s) for s in range(n_shards)]
+    exact = calculate_percentiles(pd.concat(shards, ignore_index=True), stat_columns)
+    estimated = pd.concat([calculate_percentiles(df, stat_columns, sketches=merged) for df in shards],
+                          ignore_index=True)
+    percentile_cols = [f"{col}_percentile" for col in dict.fromkeys(stat_columns)]
+    return float(np.nanmax(np.abs(estimated[percentile_cols].to_numpy() - exact[percentile_cols].to_numpy())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sharded percentiles with quantile sketches")
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--points', type=int, default=SKETCH_POINTS, help="Sketch size per stat and shard")
+    parser.add_argument('--skip-error', action='store_true', help="Skip the comparison with exact ranks")
+    args = parser.parse_args()
+
+    stat_columns = get_all_stat_columns(STAT_CATEGORIES)
+    print(f"{args.rows} rows, {len(dict.fromkeys(stat_columns))} stats, {args.points} sketch points, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'shards':>7} {'exact (s)':>10} {'sketch (s)':>11} {'merge (s)':>10} {'apply (s)':>10} "
+          f"{'critical (s)':>13} {'wall (s)':>9} {'max err':>8} {'bound':>7}")
+
+    for n_shards in args.shards:
+        full = pd.concat([_shard_frame(args.rows, n_shards, s) for s in range(n_shards)], ignore_index=True)
+        start = time.perf_counter()
+        calculate_percentiles(full, stat_columns)
+        exact_seconds = time.perf_counter() - start
+        del full
+
+        result = run_sharded(args.rows, n_shards, args.points)
+        bound = max(sketch.error_bound() for sketch in result['merged'].values())
+        error = float('nan') if args.skip_error else max_error(args.rows, n_shards, result['merged'], stat_columns)
+
+        print(f"{n_shards:>7} {exact_seconds:>10.3f} {result['sketch']:>11.3f} {result['merge']:>10.3f} "
+              f"{result['apply']:>10.3f} {result['critical_path']:>13.3f} {result['wall']:>9.2f} "
+              f"{error:>8.4f} {bound:>7.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Shared helpers for benchmark scripts
+Run benchmarks from the repository root, e.g. python -m benchmarks.bench_cohort_percentiles
+"""
+import time
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+from config.stat_categories import STAT_CATEGORIES
+from utils.data_loader import get_all_stat_columns
+
+# Sample positions covering every position group
+SAMPLE_POSITIONS = [
+    'CB', 'LCB, CB', 'RCB', 'LB', 'RB', 'RWB', 'DMF', 'LDMF, DMF', 'RCMF', 'LCMF',
+    'AMF', 'CF', 'CF, AMF', 'LW', 'RWF', 'LAMF'
+]
+
+
+def make_player_frame(n_rows: int, n_leagues: int = 10, seed: int = 0) -> pd.DataFrame:
+    """
+    Build a random player DataFrame with every STAT_CATEGORIES column
+
+    Args:
+        n_rows: Number of players
+        n_leagues: Number of distinct leagues
+        seed: Random seed
+
+    Returns:
+        DataFrame shaped like the output of load_all_league_data
+    """
+    rng = np.random.default_rng(seed)
+    data = {
+        'Player': [f"Player {i}" for i in range(n_rows)],
+        'Team': rng.integers(0, n_leagues * 18, n_rows).astype(str),
+        'League': np.array([f"League {i}" for i in range(n_leagues)])[rng.integers(0, n_leagues, n_rows)],
+        'Position': np.array(SAMPLE_POSITIONS)[rng.integers(0, len(SAMPLE_POSITIONS), n_rows)],
+        'Age': rng.integers(16, 38, n_rows),
+        'Birth country': 'Country',
+    }
+    for col in dict.fromkeys(get_all_stat_columns(STAT_CATEGORIES)):
+        values = rng.gamma(2.0, 2.0, n_rows).round(2)
+        values[rng.random(n_rows) < 0.05] = np.nan
+        data[col] = values
+
+    return pd.DataFrame(data)
+
+
+def time_call(fn: Callable, repeat: int = 3) -> Dict[str, float]:
+    """
+    Time a function call
+
+    Args:
+        fn: Function to call without arguments
+        repeat: Number of timed calls
+
+    Returns:
+        Dictionary with first (cold caches), best and mean wall time in seconds
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    return {'first': timings[0], 'best': min(timings), 'mean': sum(timings) / len(timings)}
@@ -0,0 +1,358 @@
+"""
+Synthetic Wyscout-shaped dataset generator for scale testing
+
+Writes league CSVs in the layout load_all_league_data expects
+(``<out>/def|mid|fwd/<league>.csv``, UTF-8 with BOM) with the required info
+columns and every stat referenced by STAT_CATEGORIES, COMPOSITE_ATTRIBUTES and
+the presets.
+
+Stats are driven by a few correlated latent traits per player (defending,
+aerial, passing, progression, attacking, creativity, indiscipline) on top of
+position-group baselines, so related metrics move together. Rare events
+(goals, assists, cards, blocks) are Poisson counts over the minutes played,
+percentages get noisier and more often missing for low-minute players, and
+ratio stats are derived from their parts (goal conversion, npxG per shot, ...).
+
+Every file has its own random stream derived from (seed, league, group), so
+the same arguments always produce the same files.
+
+Usage:
+    python -m benchmarks.synthetic_data --out data/synthetic --rows 1000000 --leagues 40 --seed 7
+"""
+import argparse
+import os
+import time
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from config.composite_attributes import COMPOSITE_ATTRIBUTES
+from config.defender_presets import DEFENDER_PRESETS
+from config.forward_presets import FORWARD_PRESETS
+from config.stat_categories import STAT_CATEGORIES
+
+# Position folders read by load_all_league_data and their share of the rows
+POSITION_FOLDERS = {'def': 0.4, 'mid': 0.35, 'fwd': 0.25}
+
+# Position strings (and their frequency) of every folder
+FOLDER_POSITIONS = {
+    'def': {'CB': 0.2, 'LCB, CB': 0.15, 'RCB, CB': 0.15, 'LCB': 0.08, 'RCB': 0.08,
+            'LB': 0.1, 'RB': 0.1, 'LWB, LB': 0.05, 'RWB, RB': 0.05, 'LCB3, CB3': 0.04},
+    'mid': {'DMF': 0.2, 'LDMF, DMF': 0.12, 'RDMF, DMF': 0.12, 'LCMF': 0.14, 'RCMF': 0.14,
+            'AMF': 0.14, 'LCMF3, RCMF3': 0.06, 'AMF, LCMF': 0.08},
+    'fwd': {'CF': 0.35, 'CF, AMF': 0.1, 'LW': 0.1, 'RW': 0.1, 'LWF': 0.08, 'RWF': 0.08,
+            'LAMF': 0.07, 'RAMF': 0.07, 'CF, LW': 0.05}
+}
+
+# Latent player traits and their correlation
+TRAITS = ['DEF', 'AER', 'PAS', 'PRO', 'ATT', 'CRE', 'DIS']
+TRAIT_CORRELATION = np.array([
+    #  DEF   AER   PAS   PRO   ATT   CRE   DIS
+    [1.00, 0.40, 0.10, -0.10, -0.30, -0.20, 0.25],  # DEF
+    [0.40, 1.00, -0.10, -0.20, 0.10, -0.20, 0.15],  # AER
+    [0.10, -0.10, 1.00, 0.45, 0.10, 0.45, -0.10],   # PAS
+    [-0.10, -0.20, 0.45, 1.00, 0.35, 0.45, 0.00],   # PRO
+    [-0.30, 0.10, 0.10, 0.35, 1.00, 0.45, 0.00],    # ATT
+    [-0.20, -0.20, 0.45, 0.45, 0.45, 1.00, -0.05],  # CRE
+    [0.25, 0.15, -0.10, 0.00, 0.00, -0.05, 1.00],   # DIS
+])
+
+# Stat generators: kind, (def, mid, fwd) baseline, spread, trait loadings, base NaN rate
+#   rate:  positive per-90 rate (lognormal around the baseline)
+#   pct:   percentage (logistic around the baseline, noisier for low minutes)
+#   event: per-90 rate of a rare event (Poisson count over minutes played)
+#   team:  per-90 team-level rate (shared by teammates)
+#   gk:    goalkeeper-only stat (0 for outfield players)
+STAT_SPECS = {
+    "Duels won, %": ('pct', (50, 48, 42), 0.25, {'DEF': 0.6, 'AER': 0.3}, 0.01),
+    "pAdj Tkl+Int per 90": ('rate', (7.5, 6.5, 3.0), 0.3, {'DEF': 1.0}, 0.002),
+    "Successful defensive actions per 90": ('rate', (8.5, 7.5, 3.5), 0.3, {'DEF': 1.0}, 0.002),
+    "PAdj Sliding tackles": ('rate', (0.5, 0.4, 0.15), 0.6, {'DEF': 0.8}, 0.002),
+    "Defensive duels won, %": ('pct', (64, 60, 52), 0.3, {'DEF': 0.7}, 0.02),
+    "Shots blocked per 90": ('event', (0.5, 0.25, 0.08), 0.4, {'DEF': 0.6}, 0.0),
+    "PAdj Interceptions": ('rate', (5.5, 5.0, 2.0), 0.3, {'DEF': 0.8, 'PAS': 0.2}, 0.002),
+    "Aerial duels won, %": ('pct', (58, 45, 35), 0.4, {'AER': 1.0}, 0.04),
+    "Aerial duels won per 90": ('rate', (2.5, 1.2, 1.5), 0.45, {'AER': 0.9}, 0.002),
+    "Progressive passes per 90": ('rate', (5.0, 6.5, 2.5), 0.35, {'PAS': 0.6, 'PRO': 0.6}, 0.002),
+    "Progressive runs per 90": ('rate', (1.0, 1.8, 2.2), 0.45, {'PRO': 0.8, 'ATT': 0.3}, 0.002),
+    "Accelerations per 90": ('rate', (0.6, 1.0, 1.6), 0.5, {'PRO': 0.8}, 0.002),
+    "Smart passes per 90": ('rate', (0.3, 0.8, 0.9), 0.55, {'CRE': 0.8, 'PAS': 0.3}, 0.002),
+    "Passes per 90": ('rate', (45, 48, 25), 0.3, {'PAS': 1.0}, 0.002),
+    "Accurate passes, %": ('pct', (84, 82, 72), 0.35, {'PAS': 0.8}, 0.005),
+    "Accurate short / medium passes, %": ('pct', (88, 86, 78), 0.35, {'PAS': 0.7}, 0.005),
+    "Accurate long passes, %": ('pct', (52, 55, 40), 0.35, {'PAS': 0.6}, 0.05),
+    "Crosses per 90": ('rate', (1.0, 0.6, 1.2), 0.7, {'CRE': 0.5, 'PRO': 0.4}, 0.002),
+    "Accurate crosses, %": ('pct', (30, 28, 28), 0.35, {'CRE': 0.5}, 0.12),
+    "Non-penalty goals per 90": ('event', (0.04, 0.12, 0.35), 0.45, {'ATT': 1.0}, 0.0),
+    "npxG per 90": ('rate', (0.05, 0.12, 0.33), 0.45, {'ATT': 1.0}, 0.002),
+    "Assists per 90": ('event', (0.04, 0.12, 0.15), 0.45, {'CRE': 0.8, 'ATT': 0.3}, 0.0),
+    "xA per 90": ('rate', (0.05, 0.12, 0.15), 0.5, {'CRE': 1.0}, 0.002),
+    "Shot assists per 90": ('rate', (0.4, 1.1, 1.2), 0.45, {'CRE': 0.9}, 0.002),
+    "Second assists per 90": ('event', (0.02, 0.05, 0.05), 0.4, {'CRE': 0.6, 'PAS': 0.3}, 0.0),
+    "Third assists per 90": ('event', (0.02, 0.05, 0.04), 0.4, {'CRE': 0.5, 'PAS': 0.4}, 0.0),
+    "Successful dribbles, %": ('pct', (58, 55, 48), 0.35, {'PRO': 0.5}, 0.08),
+    "Touches in box per 90": ('rate', (0.9, 2.0, 5.0), 0.4, {'ATT': 0.9}, 0.002),
+    "Shots per 90": ('rate', (0.5, 1.3, 2.6), 0.4, {'ATT': 0.9}, 0.002),
+    "Fouls per 90": ('rate', (1.2, 1.3, 1.3), 0.4, {'DIS': 1.0, 'DEF': 0.2}, 0.002),
+    "Cards per 90": ('event', (0.15, 0.17, 0.12), 0.4, {'DIS': 1.0}, 0.0),
+    "Fouls suffered per 90": ('rate', (0.8, 1.3, 1.7), 0.45, {'PRO': 0.5, 'ATT': 0.3}, 0.002),
+    "Conceded goals per 90": ('team', (1.3, 1.3, 1.3), 0.2, {}, 0.0),
+    "Shots against per 90": ('team', (12.0, 12.0, 12.0), 0.15, {}, 0.0),
+    "Prevented goals per 90": ('gk', (0, 0, 0), 0.0, {}, 0.0),
+    "Save rate, %": ('gk', (0, 0, 0), 0.0, {}, 0.0),
+    "Exits per 90": ('gk', (0, 0, 0), 0.0, {}, 0.0),
+    "Goals prevented %": ('gk', (0, 0, 0), 0.0, {}, 0.0),
+}
+
+# Stats computed from other stats after the generators ran
+DERIVED_STATS = [
+    "Passes", "Long Pass\nCmp %", "Goal conversion, %", "xA per Shot Assist",
+    "1st, 2nd, 3rd assists", "npxG per shot"
+]
+
+# Fallback for stats added to the configs without a spec here
+DEFAULT_SPEC = ('rate', (1.0, 1.0, 1.0), 0.5, {}, 0.002)
+
+COUNTRIES = [
+    'Indonesia', 'Japan', 'Korea Republic', 'Thailand', 'Vietnam', 'Malaysia', 'Australia',
+    'Brazil', 'Argentina', 'Spain', 'Portugal', 'France', 'Netherlands', 'Nigeria', 'Ghana',
+    'Serbia', 'Croatia', 'Uruguay', 'Colombia', 'Iran'
+]
+FIRST_NAMES = [
+    'Adi', 'Bima', 'Ryo', 'Min-jae', 'Kaito', 'Lucas', 'Mateo', 'Joao', 'Luis', 'Andre',
+    'Rizky', 'Yuki', 'Hugo', 'Diego', 'Marko', 'Tomas', 'Daniel', 'Fajar', 'Hiroshi', 'Seung'
+]
+LAST_NAMES = [
+    'Pratama', 'Saputra', 'Tanaka', 'Kim', 'Park', 'Silva', 'Santos', 'Garcia', 'Costa', 'Lopez',
+    'Nakamura', 'Suzuki', 'Lee', 'Ridho', 'Hernandez', 'Jovanovic', 'Martins', 'Wijaya', 'Sato', 'Choi'
+]
+
+# Teams per league
+TEAMS_PER_LEAGUE = 18
+
+
+def get_referenced_stat_columns() -> List[str]:
+    """Every stat column used by STAT_CATEGORIES, COMPOSITE_ATTRIBUTES and the presets"""
+    columns = [stat['column'] for category in STAT_CATEGORIES.values() for stat in category['stats']]
+    for configs in (COMPOSITE_ATTRIBUTES, DEFENDER_PRESETS, FORWARD_PRESETS):
+        for config in configs.values():
+            columns.extend(component['stat'] for component in config['components'])
+    return list(dict.fromkeys(columns))
+
+
+def get_league_names(n_leagues: int) -> List[str]:
+    """League names ("League 01", "League 02", ...)"""
+    width = max(2, len(str(n_leagues)))
+    return [f"League {i + 1:0{width}d}" for i in range(n_leagues)]
+
+
+def _latent_traits(rng: np.random.Generator, n_rows: int) -> Dict[str, np.ndarray]:
+    """Correlated standard normal traits of every player"""
+    cholesky = np.linalg.cholesky(TRAIT_CORRELATION)
+    values = rng.standard_normal((n_rows, len(TRAITS))) @ cholesky.T
+    return {trait: values[:, i] for i, trait in enumerate(TRAITS)}
+
+
+def _minutes_played(rng: np.random.Generator, n_rows: int) -> np.ndarray:
+    """Minutes played: a regular-starter bulk plus a fringe of low-minute players"""
+    regulars = rng.beta(2.2, 1.6, n_rows) * 3400
+    fringe = rng.uniform(1, 600, n_rows)
+    return np.round(np.where(rng.random(n_rows) < 0.25, fringe, regulars)).astype(np.int64) + 1
+
+
+def generate_league_frame(n_rows: int, folder: str, league: str, seed: int = 0,
+                          league_index: int = 0, first_id: int = 0) -> pd.DataFrame:
+    """
+    Generate the players of one league file
+
+    Args:
+        n_rows: Number of players
+        folder: Position folder ('def', 'mid' or 'fwd')
+        league: League name
+        seed: Base random seed
+        league_index: Index of the league (part of the file's random stream)
+        first_id: Number of the first player (keeps generated names unique-ish)
+
+    Returns:
+        DataFrame with the info columns, minutes and every referenced stat
+
+    Raises:
+        ValueError: If the folder is unknown
+    """
+    if folder not in POSITION_FOLDERS:
+        raise ValueError(f"Unknown position folder '{folder}' (expected one of {list(POSITION_FOLDERS)})")
+
+    group = list(POSITION_FOLDERS).index(folder)
+    rng = np.random.default_rng([seed, league_index, group])
+
+    positions = FOLDER_POSITIONS[folder]
+    position_probs = np.array(list(positions.values()))
+    team_ids = rng.integers(0, TEAMS_PER_LEAGUE, n_rows)
+    home_country = COUNTRIES[league_index % len(COUNTRIES)]
+    ids = np.arange(first_id, first_id + n_rows)
+
+    data = {
+        'Player': pd.Series(np.array(FIRST_NAMES)[rng.integers(0, len(FIRST_NAMES), n_rows)])
+        + ' ' + np.array(LAST_NAMES)[rng.integers(0, len(LAST_NAMES), n_rows)]
+        + ' ' + ids.astype(str),
+        'Team': np.array([f"{league} FC {t + 1:02d}" for t in range(TEAMS_PER_LEAGUE)])[team_ids],
+        'League': league,
+        'Position': np.array(list(positions))[rng.choice(len(positions), n_rows, p=position_probs / position_probs.sum())],
+        'Age': np.clip(np.round(rng.normal(26, 4.2, n_rows)), 16, 41).astype(np.int64),
+        'Birth country': np.where(rng.random(n_rows) < 0.7, home_country,
+                                  np.array(COUNTRIES)[rng.integers(0, len(COUNTRIES), n_rows)]),
+    }
+
+    minutes = _minutes_played(rng, n_rows)
+    data['Minutes played'] = minutes
+    data['Matches played'] = np.maximum(1, np.ceil(minutes / rng.uniform(60, 90, n_rows))).astype(np.int64)
+
+    traits = _latent_traits(rng, n_rows)
+    nineties = minutes / 90
+    # Small samples are noisy: noise grows as minutes shrink
+    noise_scale = np.clip(np.sqrt(900 / np.maximum(minutes, 90)), 1, 3)
+    team_strength = rng.normal(0, 1, TEAMS_PER_LEAGUE)[team_ids]
+
+    stats = {}
+    for column in get_referenced_stat_columns():
+        if column in DERIVED_STATS:
+            continue
+        kind, baselines, spread, loadings, nan_rate = STAT_SPECS.get(column, DEFAULT_SPEC)
+        baseline = baselines[group]
+        signal = sum(weight * traits[trait] for trait, weight in loadings.items()) if loadings else 0.0
+        noise = rng.standard_normal(n_rows) * 0.15 * noise_scale
+
+        if kind == 'rate':
+            values = baseline * np.exp(spread * signal + noise)
+        elif kind == 'event':
+            rate = baseline * np.exp(spread * signal)
+            values = rng.poisson(rate * nineties) / nineties
+        elif kind == 'pct':
+            logit = np.log(baseline / (100 - baseline)) + spread * signal + noise * 2
+            values = 100 / (1 + np.exp(-logit))
+            # Percentages of few attempts are often missing (no attempts) in the exports
+            nan_rate = nan_rate + 0.35 * np.exp(-minutes / 200)
+        elif kind == 'team':
+            values = baseline * np.exp(spread * team_strength + noise * 0.5)
+        else:
+            values = np.zeros(n_rows)
+
+        values = np.round(values, 2)
+        if np.any(nan_rate):
+            values[rng.random(n_rows) < nan_rate] = np.nan
+        stats[column] = values
+
+    _add_derived_stats(stats, nineties, rng)
+    data.update(stats)
+    return pd.DataFrame(data)
+
+
+def _add_derived_stats(stats: Dict[str, np.ndarray], nineties: np.ndarray, rng: np.random.Generator):
+    """Fill the ratio and total stats from their generated parts"""
+    def ratio(numerator, denominator, scale=1.0):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = np.where(denominator > 0, numerator / denominator * scale, np.nan)
+        return np.round(values, 2)
+
+    def get(column):
+        return np.nan_to_num(stats.get(column, np.zeros(len(nineties))))
+
+    derived = {
+        "Passes": np.round(get("Passes per 90") * nineties),
+        "Long Pass\nCmp %": np.round(np.clip(stats.get("Accurate long passes, %", np.full(len(nineties), np.nan))
+                                             + rng.normal(0, 2, len(nineties)), 0, 100), 2),
+        "Goal conversion, %": ratio(get("Non-penalty goals per 90"), get("Shots per 90"), 100),
+        "xA per Shot Assist": ratio(get("xA per 90"), get("Shot assists per 90")),
+        "1st, 2nd, 3rd assists": np.round((get("Assists per 90") + get("Second assists per 90")
+                                           + get("Third assists per 90")) * nineties),
+        "npxG per shot": ratio(get("npxG per 90"), get("Shots per 90")),
+    }
+    referenced = get_referenced_stat_columns()
+    for column, values in derived.items():
+        if column in referenced:
+            stats[column] = values
+
+
+def plan_files(n_rows: int, n_leagues: int) -> List[Dict]:
+    """
+    Split a total row count over league and position folder files
+
+    Args:
+        n_rows: Total number of players
+        n_leagues: Number of leagues
+
+    Returns:
+        List of {'folder', 'league', 'league_index', 'rows', 'first_id'} dictionaries
+    """
+    leagues = get_league_names(n_leagues)
+    shares = np.array([share for share in POSITION_FOLDERS.values() for _ in leagues]) / n_leagues
+    rows = np.floor(shares * n_rows).astype(np.int64)
+    rows[:n_rows - rows.sum()] += 1
+
+    files = []
+    first_id = 0
+    for i, (folder, league_index) in enumerate((f, l) for f in POSITION_FOLDERS for l in range(n_leagues)):
+        files.append({'folder': folder, 'league': leagues[league_index], 'league_index': league_index,
+                      'rows': int(rows[i]), 'first_id': first_id})
+        first_id += int(rows[i])
+    return files
+
+
+def write_dataset(output_dir: str, n_rows: int, n_leagues: int = 10, seed: int = 0,
+                  verbose: bool = True) -> Dict:
+    """
+    Write a synthetic dataset that load_all_league_data can read
+
+    Args:
+        output_dir: Data folder to create (def/mid/fwd subfolders are created inside)
+        n_rows: Total number of players
+        n_leagues: Number of leagues
+        seed: Random seed (same arguments, same files)
+        verbose: Print progress per file
+
+    Returns:
+        Dictionary with files, rows, bytes and seconds
+    """
+    start = time.perf_counter()
+    files = plan_files(n_rows, n_leagues)
+    total_bytes = 0
+
+    for folder in POSITION_FOLDERS:
+        os.makedirs(os.path.join(output_dir, folder), exist_ok=True)
+
+    for spec in files:
+        if spec['rows'] == 0:
+            continue
+        df = generate_league_frame(spec['rows'], spec['folder'], spec['league'], seed=seed,
+                                   league_index=spec['league_index'], first_id=spec['first_id'])
+        path = os.path.join(output_dir, spec['folder'], f"{spec['league']}.csv")
+        df.to_csv(path, index=False, encoding='utf-8-sig')
+        total_bytes += os.path.getsize(path)
+        if verbose:
+            print(f"{path}: {spec['rows']} players", flush=True)
+
+    return {
+        'files': sum(1 for spec in files if spec['rows'] > 0),
+        'rows': n_rows,
+        'bytes': total_bytes,
+        'seconds': time.perf_counter() - start
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Wyscout-shaped dataset")
+    parser.add_argument('--out', required=True, help="Data folder to write (def/mid/fwd inside)")
+    parser.add_argument('--rows', type=int, default=100000, help="Total number of players")
+    parser.add_argument('--leagues', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--quiet', action='store_true', help="Only print the summary")
+    args = parser.parse_args()
+
+    result = write_dataset(args.out, args.rows, args.leagues, args.seed, verbose=not args.quiet)
+    print(f"Wrote {result['rows']} players in {result['files']} files "
+          f"({result['bytes'] / 1e6:.1f} MB) in {result['seconds']:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
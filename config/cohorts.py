@@ -0,0 +1,39 @@
+"""
+Percentile cohort definitions
+Each cohort ranks players only against players sharing the same key values
+"""
+
+COHORTS = {
+    "global": {
+        "display_name": "Global",
+        "description": "Ranked against every player in every league",
+        "keys": []
+    },
+    "league": {
+        "display_name": "Within League",
+        "description": "Ranked against players of the same league",
+        "keys": ["League"]
+    },
+    "position_group": {
+        "display_name": "Within Position Group",
+        "description": "Ranked against players of the same primary position group",
+        "keys": ["Position group"]
+    },
+    "league_position_group": {
+        "display_name": "Within League × Position Group",
+        "description": "Ranked against players of the same league and primary position group",
+        "keys": ["League", "Position group"]
+    }
+}
+
+DEFAULT_COHORT = "global"
+
+
+def get_cohort_options():
+    """
+    Returns list of cohort keys for UI dropdown
+
+    Returns:
+        List of cohort keys
+    """
+    return list(COHORTS.keys())
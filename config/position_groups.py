@@ -54,3 +54,27 @@ def filter_by_position_group(df, group_name):
 
     # Filter using .isin() for exact matches
     return df[df['Position'].isin(positions)].copy()
+
+
+def get_primary_position_group(position: str) -> str:
+    """
+    Get the position group of a player's primary (first listed) position
+
+    Groups are checked in POSITION_GROUPS order, so specific groups (CB, Fullback,
+    DM, CF, Winger, AM) win over the broader ones (Defender, Forward).
+
+    Args:
+        position: Position string from the data, e.g. "LCB, CB"
+
+    Returns:
+        Position group name, or "Other" if no group contains the position
+    """
+    if not isinstance(position, str) or not position.strip():
+        return "Other"
+
+    primary = position.split(',')[0].strip()
+    for group_name, positions in POSITION_GROUPS.items():
+        if positions is not None and primary in positions:
+            return group_name
+
+    return "Other"
@@ -0,0 +1,38 @@
+"""
+Shared fixtures for the test suite
+Run from the repository root: python -m pytest -q
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import make_player_frame  # noqa: E402
+from config.stat_categories import STAT_CATEGORIES  # noqa: E402
+from utils.column_store import DATASET_VERSION_ATTR  # noqa: E402
+from utils.data_loader import prepare_loaded_data  # noqa: E402
+
+
+def make_prepared_frame(n_rows: int, version: str, seed: int = 0):
+    """
+    Build and prepare a random dataset registered under its own version
+
+    Args:
+        n_rows: Number of players
+        version: Dataset version attached to the raw frame
+        seed: Random seed
+
+    Returns:
+        Prepared global DataFrame (registered in the column store cache)
+    """
+    raw = make_player_frame(n_rows, n_leagues=4, seed=seed)
+    raw.attrs[DATASET_VERSION_ATTR] = version
+    return prepare_loaded_data(raw, STAT_CATEGORIES, rank_cohorts=False)
+
+
+@pytest.fixture(scope='session')
+def prepared_df():
+    """Prepared global frame of 500 random players"""
+    return make_prepared_frame(500, 'tests-prepared')
@@ -0,0 +1,94 @@
+"""
+Tests for mapping frames onto column store rows (utils/column_store.py)
+"""
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import make_player_frame
+from utils.column_store import DATASET_VERSION_ATTR, get_column_store, register_dataset
+
+
+def make_registered_frame(version: str, n_rows: int = 200):
+    """Raw random frame registered as the global frame of ``version``"""
+    df = make_player_frame(n_rows, n_leagues=4, seed=3)
+    df.attrs[DATASET_VERSION_ATTR] = version
+    return df, register_dataset(df)
+
+
+def test_global_frame_maps_to_every_row():
+    df, store = make_registered_frame('tests-store-global')
+    assert get_column_store(df) is store
+    np.testing.assert_array_equal(store.positions(df), np.arange(len(df)))
+
+
+def test_filtered_frame_maps_to_its_stored_rows():
+    df, store = make_registered_frame('tests-store-filtered')
+    filtered = df[df['League'] == 'League 1']
+
+    assert get_column_store(filtered) is store
+    positions = store.positions(filtered)
+    np.testing.assert_array_equal(positions, np.flatnonzero(df['League'].to_numpy() == 'League 1'))
+    np.testing.assert_array_equal(store.column('Player')[positions], filtered['Player'].to_numpy())
+    assert not positions.flags.writeable
+
+
+def test_sorted_frame_keeps_its_labels():
+    df, store = make_registered_frame('tests-store-sorted')
+    ordered = df.sort_values('Age', kind='stable')
+
+    positions = store.positions(ordered)
+    np.testing.assert_array_equal(positions, ordered.index.to_numpy())
+    np.testing.assert_array_equal(store.column('Player')[positions], ordered['Player'].to_numpy())
+
+
+def test_shallow_copy_maps_like_the_frame():
+    df, store = make_registered_frame('tests-store-copy')
+    filtered = df[df['Age'] < 25]
+
+    np.testing.assert_array_equal(store.positions(filtered.copy(deep=False)), store.positions(filtered))
+
+
+def test_reset_labels_are_not_mistaken_for_stored_rows():
+    df, store = make_registered_frame('tests-store-reset')
+    reset = df.sort_values('Age', kind='stable').reset_index(drop=True)
+
+    # Labels 0..n-1 all exist in the store, but name other players
+    assert store.positions(reset) is None
+
+    derived = get_column_store(reset)
+    assert derived is not store
+    assert derived.dataset_version == 'tests-store-reset'
+    assert derived.version != store.version
+    np.testing.assert_array_equal(derived.column('Player'), reset['Player'].to_numpy())
+
+    # The registered store still covers the global frame
+    assert get_column_store(df) is store
+
+
+def test_sub_frames_reuse_the_derived_store():
+    df, store = make_registered_frame('tests-store-derived')
+    reset = df[df['League'] == 'League 2'].reset_index(drop=True)
+    derived = get_column_store(reset)
+
+    sub_frame = reset[reset['Age'] < 25]
+    assert get_column_store(sub_frame) is derived
+    np.testing.assert_array_equal(derived.positions(sub_frame), sub_frame.index.to_numpy())
+
+
+def test_concatenated_frame_with_reused_labels_gets_its_own_store():
+    df, store = make_registered_frame('tests-store-concat')
+    head, tail = df.iloc[:50], df.iloc[50:100]
+    # Reuses labels 0..49 for other players
+    combined = pd.concat([head, tail.set_axis(head.index)])
+    combined.attrs[DATASET_VERSION_ATTR] = 'tests-store-concat'
+
+    assert store.positions(combined) is None
+    assert get_column_store(combined) is not store
+
+
+def test_unversioned_frames_are_keyed_by_content():
+    df = make_player_frame(100, n_leagues=4, seed=5)
+    store = get_column_store(df)
+
+    assert get_column_store(df) is store
+    assert get_column_store(df.copy()).version == store.version
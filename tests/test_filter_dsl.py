@@ -0,0 +1,158 @@
+"""
+Tests for the filter expression language (utils/filter_dsl.py)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.filter_dsl import apply_filter_expression, compile_filter
+
+STAT = 'PAdj Interceptions'
+
+
+@pytest.fixture
+def frame():
+    """Small frame with a NaN stat and string labels"""
+    return pd.DataFrame({
+        'Player': ['A', 'B', 'C', 'D', 'E'],
+        'League': ['Liga 1', 'J1', 'K League 1', 'Liga 1', 'J1'],
+        'Age': [21, 24, 25, 30, 19],
+        STAT: [5.0, np.nan, 7.5, 2.0, 9.0],
+    })
+
+
+def matched(expression: str, df: pd.DataFrame) -> list:
+    return df.loc[compile_filter(expression).mask(df), 'Player'].tolist()
+
+
+@pytest.mark.parametrize('expression, players', [
+    ('Age < 25', ['A', 'B', 'E']),
+    ('Age <= 25', ['A', 'B', 'C', 'E']),
+    ('Age > 24', ['C', 'D']),
+    ('Age >= 24', ['B', 'C', 'D']),
+    ('Age == 30', ['D']),
+    ('Age = 30', ['D']),
+    ('Age != 30', ['A', 'B', 'C', 'E']),
+    ('League == "J1"', ['B', 'E']),
+    ("League != 'J1'", ['A', 'C', 'D']),
+    ('League in ("Liga 1", "J1")', ['A', 'B', 'D', 'E']),
+    ('League not in ("Liga 1", "J1")', ['C']),
+    ('Age in (19, 30)', ['D', 'E']),
+    ('"PAdj Interceptions" > 4', ['A', 'C', 'E']),
+])
+def test_comparisons(frame, expression, players):
+    assert matched(expression, frame) == players
+
+
+def test_nan_matches_no_comparison(frame):
+    assert 'B' not in matched('"PAdj Interceptions" < 100', frame)
+    assert 'B' not in matched('"PAdj Interceptions" >= 0', frame)
+    # Same as pandas: NaN != x is True
+    assert 'B' in matched('"PAdj Interceptions" != 5', frame)
+
+
+def test_and_binds_tighter_than_or(frame):
+    assert matched('Age < 20 or League == "Liga 1" and Age > 25', frame) == ['D', 'E']
+    assert matched('(Age < 20 or League == "Liga 1") and Age > 25', frame) == ['D']
+
+
+def test_not_and_keywords_are_case_insensitive(frame):
+    assert matched('not Age < 25', frame) == ['C', 'D']
+    assert matched('NOT (League == "J1" OR Age > 28)', frame) == ['A', 'C']
+
+
+def test_escaped_quotes_in_strings():
+    df = pd.DataFrame({'Player': ['A', 'B'], 'Team': ['Say "Hi" FC', 'Other']})
+    assert matched(r'Team == "Say \"Hi\" FC"', df) == ['A']
+
+
+def test_columns_are_collected_once(frame):
+    assert compile_filter('Age > 20 and Age < 30 or League == "J1"').columns == ['Age', 'League']
+
+
+@pytest.mark.parametrize('expression', [
+    'Age <',
+    'Age < 25 and',
+    '(Age < 25',
+    'Age < 25)',
+    'Age ~ 25',
+    'Age 25',
+    'League < "J1"',
+    'League not == "J1"',
+    'League in ()',
+    '< 25',
+])
+def test_invalid_expressions_raise(expression):
+    with pytest.raises(ValueError):
+        compile_filter(expression)
+
+
+def test_missing_column_raises(frame):
+    with pytest.raises(ValueError, match="not found"):
+        compile_filter('Minutes > 90').mask(frame)
+
+
+def test_blank_expression_keeps_frame(frame):
+    assert apply_filter_expression(frame, '  ') is frame
+    assert apply_filter_expression(frame, None) is frame
+
+
+def test_mask_of_filtered_frame_matches_pandas(prepared_df):
+    subset = prepared_df[prepared_df['League'].isin(['League 0', 'League 2'])]
+    subset = subset[subset['Age'] >= 20]
+    expression = f'Age < 30 and "{STAT}" > 3 or League == "League 2" and not Age == 25'
+
+    expected = ((subset['Age'] < 30) & (subset[STAT] > 3)) | ((subset['League'] == 'League 2') & ~(subset['Age'] == 25))
+    np.testing.assert_array_equal(compile_filter(expression).mask(subset), expected.to_numpy())
+    # Second call reads the cached full-dataset mask
+    np.testing.assert_array_equal(compile_filter(expression).mask(subset), expected.to_numpy())
+    assert compile_filter(expression).apply(subset).index.equals(subset.index[expected.to_numpy()])
+
+
+def test_mask_of_reset_frame_matches_pandas(prepared_df):
+    reset = prepared_df.sort_values('Age', kind='stable').reset_index(drop=True)
+    expected = (reset['Age'] < 22).to_numpy()
+    np.testing.assert_array_equal(compile_filter('Age < 22').mask(reset), expected)
+
+
+NUMERIC_STATS = {'Age': {'min': 20.0, 'max': 28.0}, STAT: {'min': None, 'max': None}}
+LABEL_STATS = {'League': {'values': ['Liga 1', 'J1']}}
+
+
+@pytest.mark.parametrize('expression, may_match', [
+    ('Age < 20', False),
+    ('Age <= 20', True),
+    ('Age > 28', False),
+    ('Age >= 28', True),
+    ('Age == 30', False),
+    ('Age == 25', True),
+    ('Age in (18, 30)', False),
+    ('Age in (18, 22)', True),
+    # All-NaN column: no comparison can match
+    (f'"{STAT}" > 0', False),
+    (f'"{STAT}" == 1', False),
+    # Columns without statistics are assumed to match
+    ('Height > 200', True),
+    # Negations and != never prune
+    ('Age != 25', True),
+    ('not Age < 30', True),
+    ('Age not in (18, 30)', True),
+    # Boolean combinations
+    ('Age < 20 or Age > 27', True),
+    ('Age < 20 and Age > 27', False),
+    ('Age > 25 and Age > 30', False),
+])
+def test_numeric_pruning(expression, may_match):
+    assert compile_filter(expression).may_match(NUMERIC_STATS) is may_match
+
+
+@pytest.mark.parametrize('expression, may_match', [
+    ('League == "J1"', True),
+    ('League == "Serie A"', False),
+    ('League in ("Serie A", "Liga 1")', True),
+    ('League in ("Serie A", "Ligue 1")', False),
+    ('League != "J1"', True),
+    ('League not in ("Liga 1", "J1")', True),
+])
+def test_label_pruning(expression, may_match):
+    assert compile_filter(expression).may_match(LABEL_STATS) is may_match
@@ -0,0 +1,103 @@
+"""
+Tests for streaming percentile updates (utils/incremental_percentiles.py)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.common import make_player_frame
+from config.stat_categories import STAT_CATEGORIES
+from utils.column_store import DATASET_VERSION_ATTR
+from utils.data_loader import append_players, prepare_loaded_data
+from utils.incremental_percentiles import IncrementalPercentiles
+
+STAT_COLUMNS = ['a', 'b', 'c']
+
+
+def make_values(n_rows: int, seed: int) -> np.ndarray:
+    """Values with many ties and NaN; column 'c' is NaN in every other row"""
+    rng = np.random.default_rng(seed)
+    values = rng.integers(0, 8, (n_rows, len(STAT_COLUMNS))).astype(np.float64)
+    values[rng.random(values.shape) < 0.1] = np.nan
+    values[::2, 2] = np.nan
+    return values
+
+
+def full_percentiles(values: np.ndarray) -> np.ndarray:
+    return pd.DataFrame(values).rank(pct=True).to_numpy() * 100
+
+
+def test_from_values_matches_full_ranking():
+    values = make_values(300, seed=0)
+    incremental = IncrementalPercentiles.from_values(values, STAT_COLUMNS)
+
+    assert incremental.n_rows == 300
+    np.testing.assert_array_equal(incremental.counts(), (~np.isnan(values)).sum(axis=0))
+    np.testing.assert_allclose(incremental.percentiles(), full_percentiles(values))
+
+
+@pytest.mark.parametrize('batch', [1, 7, 150])
+def test_appends_match_full_ranking(batch):
+    values = make_values(300, seed=1)
+    incremental = IncrementalPercentiles.from_values(values, STAT_COLUMNS)
+
+    for seed in range(2, 5):
+        new_values = make_values(batch, seed=seed)
+        incremental = incremental.append(new_values)
+        values = np.vstack([values, new_values])
+        np.testing.assert_allclose(incremental.percentiles(), full_percentiles(values))
+
+
+def test_append_with_new_extremes_and_all_nan_rows():
+    values = make_values(50, seed=6)
+    incremental = IncrementalPercentiles.from_values(values, STAT_COLUMNS)
+    new_values = np.array([[-1.0, 100.0, np.nan], [np.nan, np.nan, np.nan], [3.0, 3.0, 3.0]])
+
+    appended = incremental.append(new_values)
+    np.testing.assert_allclose(appended.percentiles(), full_percentiles(np.vstack([values, new_values])))
+
+
+def test_append_leaves_original_unchanged():
+    values = make_values(100, seed=7)
+    incremental = IncrementalPercentiles.from_values(values, STAT_COLUMNS)
+    before = incremental.percentiles().copy()
+
+    incremental.append(make_values(20, seed=8))
+    assert incremental.n_rows == 100
+    np.testing.assert_array_equal(incremental.percentiles(), before)
+
+
+def test_append_players_matches_prepared_rebuild():
+    raw = make_player_frame(400, n_leagues=4, seed=0)
+    raw.attrs[DATASET_VERSION_ATTR] = 'tests-append'
+    df = prepare_loaded_data(raw, STAT_CATEGORIES, rank_cohorts=False)
+
+    first, second = make_player_frame(5, seed=1), make_player_frame(30, seed=2)
+    appended = append_players(append_players(df, first, STAT_CATEGORIES), second, STAT_CATEGORIES)
+    rebuilt = prepare_loaded_data(pd.concat([raw, first, second], ignore_index=True), STAT_CATEGORIES,
+                                  rank_cohorts=False)
+
+    assert list(appended.columns) == list(rebuilt.columns)
+    derived_cols = [col for col in rebuilt.columns if col.endswith('_percentile') or col.startswith('COMP_')]
+    np.testing.assert_array_equal(appended[derived_cols].to_numpy(), rebuilt[derived_cols].to_numpy())
+    assert len(df) == 400
+
+
+def test_append_players_rejects_filtered_frames(prepared_df):
+    with pytest.raises(ValueError):
+        append_players(prepared_df[prepared_df['Age'] < 25], make_player_frame(2, seed=3), STAT_CATEGORIES)
+
+
+def test_append_players_rejects_filtered_frames_of_evicted_datasets():
+    from utils.column_store import MAX_CACHED_VERSIONS, register_dataset
+
+    raw = make_player_frame(100, n_leagues=4, seed=4)
+    raw.attrs[DATASET_VERSION_ATTR] = 'tests-append-evicted'
+    df = prepare_loaded_data(raw, STAT_CATEGORIES, rank_cohorts=False)
+    for i in range(MAX_CACHED_VERSIONS):
+        other = make_player_frame(10, seed=i)
+        other.attrs[DATASET_VERSION_ATTR] = f'tests-append-other-{i}'
+        register_dataset(other)
+
+    with pytest.raises(ValueError):
+        append_players(df[df['Age'] < 25], make_player_frame(2, seed=5), STAT_CATEGORIES)
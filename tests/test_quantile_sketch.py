@@ -0,0 +1,88 @@
+"""
+Tests for mergeable quantile sketches (utils/quantile_sketch.py)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.common import make_player_frame
+from utils.data_loader import calculate_percentiles
+from utils.quantile_sketch import QuantileSketch, build_sketches, merge_sketches
+
+
+def exact_percentiles(values: np.ndarray) -> np.ndarray:
+    return pd.Series(values).rank(pct=True).to_numpy() * 100
+
+
+def make_values(n_rows: int, seed: int) -> np.ndarray:
+    """Skewed values with ties and NaN, like the stat columns"""
+    rng = np.random.default_rng(seed)
+    values = rng.gamma(2.0, 2.0, n_rows).round(1)
+    values[rng.random(n_rows) < 0.05] = np.nan
+    return values
+
+
+def test_small_column_is_exact():
+    values = make_values(500, seed=1)
+    sketch = QuantileSketch.from_values(values, max_points=1000)
+
+    assert sketch.max_rank_error == 0
+    assert sketch.error_bound() == 0
+    assert sketch.count == (~np.isnan(values)).sum()
+    np.testing.assert_allclose(sketch.percentiles(values), exact_percentiles(values))
+
+
+@pytest.mark.parametrize('max_points', [16, 64, 256])
+def test_compressed_column_stays_within_bound(max_points):
+    values = make_values(5000, seed=2)
+    sketch = QuantileSketch.from_values(values, max_points=max_points)
+
+    assert len(sketch) <= max_points
+    assert sketch.count == (~np.isnan(values)).sum()
+    error = np.abs(sketch.percentiles(values) - exact_percentiles(values))
+    assert np.nanmax(error) <= sketch.error_bound()
+    assert sketch.error_bound() == pytest.approx(100 * sketch.max_rank_error / sketch.count)
+
+
+def test_nan_gets_nan_rank():
+    sketch = QuantileSketch.from_values(make_values(100, seed=3))
+    ranks = sketch.percentiles(np.array([np.nan, 1.0]))
+    assert np.isnan(ranks[0]) and not np.isnan(ranks[1])
+    assert np.isnan(QuantileSketch.from_values(np.array([np.nan])).percentiles(np.array([1.0]))[0])
+
+
+@pytest.mark.parametrize('max_points', [None, 128])
+def test_merged_shards_stay_within_bound(max_points):
+    shards = [make_values(n_rows, seed=seed) for seed, n_rows in enumerate([3000, 800, 50, 4100])]
+    sketches = [QuantileSketch.from_values(shard, max_points=256) for shard in shards]
+    merged = QuantileSketch.merge(sketches, max_points=max_points)
+
+    assert merged.max_rank_error >= sum(s.max_rank_error for s in sketches)
+    all_values = np.concatenate(shards)
+    assert merged.count == (~np.isnan(all_values)).sum()
+    error = np.abs(merged.percentiles(all_values) - exact_percentiles(all_values))
+    assert np.nanmax(error) <= merged.error_bound()
+
+
+def test_merge_order_does_not_matter():
+    sketches = [QuantileSketch.from_values(make_values(2000, seed=seed), max_points=100) for seed in range(3)]
+    probe = np.linspace(0, 20, 41)
+    np.testing.assert_allclose(QuantileSketch.merge(sketches).percentiles(probe),
+                               QuantileSketch.merge(sketches[::-1]).percentiles(probe))
+
+
+def test_sharded_percentiles_match_global_ranking():
+    df = make_player_frame(3000, n_leagues=4, seed=4)
+    stat_columns = ['PAdj Interceptions', 'Progressive runs per 90', 'Not a column']
+    present = stat_columns[:2]
+    shards = [df[df['League'] == league] for league in sorted(df['League'].unique())]
+
+    merged = merge_sketches(build_sketches(shard, stat_columns, max_points=128) for shard in shards)
+    assert sorted(merged) == sorted(present)
+
+    exact = calculate_percentiles(df, present)
+    for shard in shards:
+        estimated = calculate_percentiles(shard, present, sketches=merged)
+        for col in present:
+            error = np.abs(estimated[f"{col}_percentile"] - exact.loc[shard.index, f"{col}_percentile"])
+            assert error.max() <= merged[col].error_bound()
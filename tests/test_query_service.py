@@ -0,0 +1,111 @@
+"""
+Tests for the HTTP query service and its shared session (utils/query_service.py)
+"""
+import json
+import threading
+import urllib.error
+import urllib.request
+from urllib.parse import quote
+
+import pytest
+
+from utils import scouting_api
+from utils.query_service import create_server
+from utils.scouting_api import ScoutingSession
+
+
+@pytest.fixture(scope='module')
+def session(prepared_df):
+    return ScoutingSession(df=prepared_df)
+
+
+@pytest.fixture(scope='module')
+def server(session):
+    server = create_server(session, port=0, workers=2)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def request(server, path: str, body=None):
+    """Send a GET (or a POST with a JSON body) and return (status, payload)"""
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    url = f"http://127.0.0.1:{server.server_port}{path}"
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data), timeout=30) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_health(server, prepared_df):
+    status, payload = request(server, '/health')
+    assert status == 200
+    assert payload['players'] == len(prepared_df)
+
+
+def test_similar(server, prepared_df):
+    player = prepared_df['Player'].iloc[0]
+    status, payload = request(server, f"/similar?player={quote(player)}&top_n=3")
+    assert status == 200
+    assert len(payload['result']) == 3
+    assert player not in [row['Player'] for row in payload['result']]
+
+
+def test_player_profile(server, prepared_df):
+    status, payload = request(server, f"/player/{prepared_df.index[5]}")
+    assert status == 200
+    assert payload['result']
+
+
+@pytest.mark.parametrize('path', [
+    '/similar?player=Nobody',
+    '/player/99999999',
+    '/unknown',
+    '/player',
+])
+def test_not_found(server, path):
+    status, payload = request(server, path)
+    assert status == 404
+    assert payload['error']
+
+
+@pytest.mark.parametrize('path', [
+    '/similar?player=Nobody&top_n=abc',
+    '/player/abc',
+    '/finder?preset=No%20such%20preset',
+])
+def test_invalid_parameters(server, path):
+    status, payload = request(server, path)
+    assert status == 400
+    assert payload['error']
+
+
+def test_internal_errors_are_500(server, monkeypatch):
+    def fail(self, **kwargs):
+        raise KeyError('boom')
+
+    monkeypatch.setattr(ScoutingSession, 'similar', fail)
+    status, payload = request(server, '/similar?player=Nobody')
+    assert status == 500
+    assert payload['error'].startswith('KeyError')
+
+
+def test_batch_reports_errors_per_query(server, prepared_df):
+    player = prepared_df['Player'].iloc[1]
+    status, payload = request(server, '/batch', {'queries': [
+        {'type': 'similar', 'player': player, 'top_n': 2},
+        {'type': 'similar', 'player': 'Nobody'},
+    ]})
+    assert status == 200
+    assert len(payload['results'][0]['result']) == 2
+    assert 'error' in payload['results'][1]
+
+
+def test_similarity_scorers_are_bounded(session, prepared_df, monkeypatch):
+    monkeypatch.setattr(scouting_api, 'MAX_CACHED_SCORERS', 8)
+    player = prepared_df['Player'].iloc[0]
+    for i in range(20):
+        session.similar(player, expression=f"Age < {100 + i}", top_n=2)
+    assert len(session._similarity_scorers) <= 8
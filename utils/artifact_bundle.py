@@ -0,0 +1,249 @@
+"""
+Precomputed dataset bundles opened with memory mapping
+
+``python -m utils.artifact_bundle`` runs prepare_data_global once and writes a
+versioned bundle folder:
+
+    <out>/<dataset version>/
+        manifest.json                       format, dataset version, column lists
+        meta.pkl                            label and integer columns (Player, Team, League, ...)
+        values.npy                          float32 matrix: raw stats, then ``_percentile``
+                                            columns, then ``COMP_*`` columns
+        index_<name>_{keys,offsets,rows}.npy  player, league and position indexes
+
+The matrix is stored column-major, so every column (and every group of
+columns) is one contiguous run. It is a single file because pandas merges
+same-dtype blocks on concat, which would copy separately mapped matrices; one
+block lets the frame built by open_bundle read the mapped pages directly.
+Replicas on one host share those pages through the OS page cache, and opening a
+bundle only maps files instead of recomputing percentiles and composites.
+
+Bundles are trusted build outputs (the metadata table is a pickle); only open
+bundles you built.
+
+Usage:
+    python -m utils.artifact_bundle --data data/2025 --out data/bundle
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.column_store import DATASET_VERSION_ATTR, KeyIndex, compute_file_version, register_dataset
+from utils.quantized_block import block_values, is_quantized
+
+# Bumped whenever the bundle layout changes; older bundles are ignored
+BUNDLE_FORMAT = 1
+
+MANIFEST_FILE = 'manifest.json'
+META_FILE = 'meta.pkl'
+VALUES_FILE = 'values.npy'
+
+# Column groups of the float matrix, in column order
+MATRIX_GROUPS = ['stats', 'percentiles', 'composites']
+
+# Bundled key indexes: name -> (ColumnStore artifact key, column, separator)
+INDEXES = {
+    'player': ('player_name_index', 'Player', None),
+    'league': ('league_index', 'League', None),
+    'position': ('position_index', 'Position', ','),
+}
+
+
+def classify_columns(df: pd.DataFrame) -> Dict[str, List[str]]:
+    """
+    Split the prepared frame's columns into the bundle's matrices and metadata table
+
+    Args:
+        df: Frame returned by prepare_data_global
+
+    Returns:
+        Dictionary with 'meta', 'stats', 'percentiles' and 'composites' column lists
+    """
+    groups = {'meta': [], 'stats': [], 'percentiles': [], 'composites': []}
+    for col in df.columns:
+        # Fixed-point columns (compact mode) are bundled as floats like the rest of the block
+        if not pd.api.types.is_float_dtype(df[col].dtype) and not is_quantized(df, col):
+            groups['meta'].append(col)
+        elif col.startswith('COMP_'):
+            groups['composites'].append(col)
+        elif col.endswith('_percentile'):
+            groups['percentiles'].append(col)
+        else:
+            groups['stats'].append(col)
+    return groups
+
+
+def build_bundle(data_folder: str, output_dir: str, stat_categories: Dict) -> str:
+    """
+    Prepare the global dataset once and write it as a bundle
+
+    Args:
+        data_folder: Folder with the def/mid/fwd league CSVs
+        output_dir: Folder holding bundles (one subfolder per dataset version)
+        stat_categories: Dictionary of stat categories
+
+    Returns:
+        Path of the written bundle folder
+    """
+    from utils.data_loader import prepare_data_global
+
+    df = prepare_data_global(data_folder, stat_categories)
+    version = df.attrs[DATASET_VERSION_ATTR]
+    groups = classify_columns(df)
+
+    os.makedirs(output_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=f".{version}-", dir=output_dir)
+    try:
+        df[groups['meta']].to_pickle(os.path.join(staging, META_FILE))
+        matrix_columns = [col for group in MATRIX_GROUPS for col in groups[group]]
+        values = block_values(df, matrix_columns, np.float32)
+        np.save(os.path.join(staging, VALUES_FILE), np.asfortranarray(values))
+
+        for name, (_, column, separator) in INDEXES.items():
+            index = KeyIndex.from_values(df[column].to_numpy(), separator=separator)
+            np.save(os.path.join(staging, f"index_{name}_keys.npy"), index.keys)
+            np.save(os.path.join(staging, f"index_{name}_offsets.npy"), index.offsets)
+            np.save(os.path.join(staging, f"index_{name}_rows.npy"), index.rows)
+
+        manifest = {
+            'format': BUNDLE_FORMAT,
+            'dataset_version': version,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'source': os.path.abspath(data_folder),
+            'rows': len(df),
+            'columns': groups
+        }
+        with open(os.path.join(staging, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+        # Swap the finished folder in, so readers never see a partial bundle
+        bundle_dir = os.path.join(output_dir, version)
+        if os.path.exists(bundle_dir):
+            shutil.rmtree(bundle_dir)
+        os.rename(staging, bundle_dir)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    return bundle_dir
+
+
+def read_manifest(bundle_dir: str) -> Optional[Dict]:
+    """
+    Read a bundle's manifest
+
+    Args:
+        bundle_dir: Bundle folder
+
+    Returns:
+        Manifest dictionary, or None if the folder is not a bundle of the current format
+    """
+    try:
+        with open(os.path.join(bundle_dir, MANIFEST_FILE), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('format') == BUNDLE_FORMAT else None
+
+
+def find_bundle(bundle_root: str, data_folder: str = None) -> Optional[str]:
+    """
+    Find the bundle to serve
+
+    With league CSVs present, only the bundle built from exactly those files
+    (same dataset version) is used, so a stale bundle is never served. Without
+    CSVs (replicas shipping only the bundle) the newest bundle is used.
+
+    Args:
+        bundle_root: Folder holding bundles
+        data_folder: Folder with the def/mid/fwd league CSVs
+
+    Returns:
+        Bundle folder, or None if there is no usable bundle
+    """
+    from utils.data_loader import get_league_files
+
+    if not os.path.isdir(bundle_root):
+        return None
+
+    csv_files = get_league_files(data_folder) if data_folder and os.path.isdir(data_folder) else []
+    if csv_files:
+        bundle_dir = os.path.join(bundle_root, compute_file_version(csv_files))
+        return bundle_dir if read_manifest(bundle_dir) is not None else None
+
+    candidates = []
+    for name in os.listdir(bundle_root):
+        bundle_dir = os.path.join(bundle_root, name)
+        manifest = read_manifest(bundle_dir)
+        if manifest is not None:
+            candidates.append((manifest['created'], bundle_dir))
+    return max(candidates)[1] if candidates else None
+
+
+def open_bundle(bundle_dir: str) -> pd.DataFrame:
+    """
+    Open a bundle as the global player DataFrame
+
+    The float matrix is memory-mapped copy-on-write: pages are read lazily and
+    shared with other processes until written to. The frame carries the source
+    dataset version and its column store starts with the bundled key indexes;
+    cohort blocks and sorted indexes are built on first use as usual.
+
+    Args:
+        bundle_dir: Bundle folder written by build_bundle
+
+    Returns:
+        DataFrame with metadata columns followed by the stat, percentile and
+        composite columns (float32)
+
+    Raises:
+        ValueError: If the folder is not a bundle of the current format
+    """
+    manifest = read_manifest(bundle_dir)
+    if manifest is None:
+        raise ValueError(f"Not a format {BUNDLE_FORMAT} bundle: {bundle_dir}")
+
+    meta = pd.read_pickle(os.path.join(bundle_dir, META_FILE))
+    matrix_columns = [col for group in MATRIX_GROUPS for col in manifest['columns'][group]]
+    values = np.load(os.path.join(bundle_dir, VALUES_FILE), mmap_mode='c')
+    matrix = pd.DataFrame(values, index=meta.index, columns=matrix_columns, copy=False)
+
+    df = pd.concat([meta, matrix], axis=1, copy=False)
+    df.attrs[DATASET_VERSION_ATTR] = manifest['dataset_version']
+
+    store = register_dataset(df)
+    for name, (artifact_key, _, _) in INDEXES.items():
+        index = KeyIndex(*[
+            np.load(os.path.join(bundle_dir, f"index_{name}_{part}.npy"), mmap_mode='r')
+            for part in ('keys', 'offsets', 'rows')
+        ])
+        store.artifact(artifact_key, lambda s, index=index: index)
+
+    return df
+
+
+def main():
+    from config.stat_categories import STAT_CATEGORIES
+
+    parser = argparse.ArgumentParser(description="Build a memory-mappable dataset bundle")
+    parser.add_argument('--data', default=os.path.join('data', '2025'), help="Folder with league CSV files")
+    parser.add_argument('--out', default=os.path.join('data', 'bundle'), help="Folder holding bundles")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    bundle_dir = build_bundle(args.data, args.out, STAT_CATEGORIES)
+    manifest = read_manifest(bundle_dir)
+    size_mb = sum(os.path.getsize(os.path.join(bundle_dir, f)) for f in os.listdir(bundle_dir)) / 1e6
+    print(f"Wrote {bundle_dir}: {manifest['rows']} players, {size_mb:.1f} MB "
+          f"in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+"""
+Headless batch rendering of player scouting cards
+
+A card is the combined percentile bar chart plus the composite attribute chart
+of one player. Cards are rendered in a process pool (matplotlib is not
+thread-safe) and written to an output directory; cards already present are
+skipped, so an interrupted run can be resumed with the same command.
+
+Usage:
+    python -m utils.card_renderer --data data/2025 --out cards --leagues "Liga 1" --format pdf
+"""
+import argparse
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+# Supported output formats
+CARD_FORMATS = ['png', 'pdf']
+
+# Resolution of the rendered chart images inside a card
+CARD_DPI = 150
+
+# Log throughput every N finished cards
+PROGRESS_EVERY = 50
+
+logger = logging.getLogger(__name__)
+
+
+def _slugify(text: str) -> str:
+    """Make a string safe for file names"""
+    slug = re.sub(r'[^A-Za-z0-9]+', '-', str(text)).strip('-').lower()
+    return slug or 'player'
+
+
+def get_card_filename(player_info: Dict, fmt: str) -> str:
+    """
+    Get the output file name of a player's card
+
+    The row id keeps players with the same name apart; names stay readable.
+
+    Args:
+        player_info: Player info dictionary (with 'id', 'name' and 'team')
+        fmt: One of CARD_FORMATS
+
+    Returns:
+        File name such as "00042_rizky-ridho_persija.png"
+    """
+    return f"{int(player_info['id']):05d}_{_slugify(player_info['name'])}_{_slugify(player_info['team'])}.{fmt}"
+
+
+def _figure_to_array(fig):
+    """Render a figure to an RGBA array and close it"""
+    import matplotlib.pyplot as plt
+    import numpy as np
+
+    fig.set_dpi(CARD_DPI)
+    fig.canvas.draw()
+    image = np.asarray(fig.canvas.buffer_rgba()).copy()
+    plt.close(fig)
+    return image
+
+
+def render_card(player_data: Dict, stat_categories: Dict, player_color: str, output_path: str):
+    """
+    Render one scouting card to a PNG or PDF file
+
+    Args:
+        player_data: Player data dictionary (info, stats, composite_attributes)
+        stat_categories: Dictionary of stat categories
+        player_color: Primary color for the player
+        output_path: Destination file (format taken from the extension)
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    from utils.player_comparison import create_combined_player_chart, create_player_composite_chart
+
+    stats_image = _figure_to_array(create_combined_player_chart(player_data, stat_categories, player_color))
+    composite_image = _figure_to_array(create_player_composite_chart(player_data, player_color))
+
+    # Lay both charts side by side under a header, sized to the chart pixels
+    header_px = 120
+    width_px = stats_image.shape[1] + composite_image.shape[1]
+    height_px = max(stats_image.shape[0], composite_image.shape[0]) + header_px
+
+    card = plt.figure(figsize=(width_px / CARD_DPI, height_px / CARD_DPI), dpi=CARD_DPI)
+    card.patch.set_facecolor('#f5f3e8')
+
+    info = player_data['info']
+    card.text(0.02, 1 - 45 / height_px, info['name'], fontsize=18, fontweight='bold', color=player_color, va='center')
+    card.text(
+        0.02, 1 - 90 / height_px,
+        f"Age: {info['age']}  |  Position: {info['position']}  |  Team: {info['team']}  |  Country: {info['country']}",
+        fontsize=10, color='#7f8c8d', va='center'
+    )
+
+    left = 0.0
+    for image in (stats_image, composite_image):
+        width = image.shape[1] / width_px
+        height = image.shape[0] / height_px
+        ax = card.add_axes([left, 1 - header_px / height_px - height, width, height])
+        ax.imshow(image)
+        ax.axis('off')
+        left += width
+
+    # Write to a temporary name first so an interrupted run never leaves a partial card
+    temp_path = f"{output_path}.part"
+    try:
+        card.savefig(temp_path, dpi=CARD_DPI, facecolor=card.get_facecolor(),
+                     format=os.path.splitext(output_path)[1][1:])
+    finally:
+        plt.close(card)
+    os.replace(temp_path, output_path)
+
+
+def _render_card_task(task: Tuple[Dict, Dict, str, str]) -> str:
+    """Process pool entry point"""
+    player_data, stat_categories, player_color, output_path = task
+    render_card(player_data, stat_categories, player_color, output_path)
+    return output_path
+
+
+def build_card_tasks(df: pd.DataFrame, stat_categories: Dict, output_dir: str,
+                     fmt: str = 'png', cohort: str = 'global',
+                     player_color: str = None) -> Tuple[List[Tuple], int]:
+    """
+    Build render tasks for every player in a DataFrame, skipping finished cards
+
+    Args:
+        df: (Filtered) player DataFrame from prepare_data_global
+        stat_categories: Dictionary of stat categories
+        output_dir: Directory the cards are written to
+        fmt: One of CARD_FORMATS
+        cohort: Percentile cohort key from config/cohorts.py
+        player_color: Card accent color (default: first of PLAYER_COLORS)
+
+    Returns:
+        (tasks, skipped) where ``skipped`` counts cards that already exist
+    """
+    from config.composite_attributes import COMPOSITE_ATTRIBUTES
+    from config.stat_categories import PLAYER_COLORS, PLAYER_INFO_COLUMNS
+    from utils.data_loader import get_all_stat_columns, get_player_profile
+
+    if fmt not in CARD_FORMATS:
+        raise ValueError(f"Unsupported card format '{fmt}' (expected one of {CARD_FORMATS})")
+
+    color = player_color or PLAYER_COLORS[0]
+    stat_columns = get_all_stat_columns(stat_categories)
+    name_column = PLAYER_INFO_COLUMNS['name']
+
+    tasks = []
+    skipped = 0
+    for label in df.index:
+        # One-row frame so players sharing a name resolve to the right row
+        player_df = df.loc[[label]]
+        player_data = get_player_profile(
+            player_df, player_df[name_column].iloc[0], stat_columns,
+            PLAYER_INFO_COLUMNS, COMPOSITE_ATTRIBUTES, cohort=cohort
+        )
+
+        output_path = os.path.join(output_dir, get_card_filename(player_data['info'], fmt))
+        if os.path.exists(output_path):
+            skipped += 1
+            continue
+
+        tasks.append((player_data, stat_categories, color, output_path))
+
+    return tasks, skipped
+
+
+def render_cards(df: pd.DataFrame, stat_categories: Dict, output_dir: str, fmt: str = 'png',
+                 cohort: str = 'global', workers: int = None) -> Dict:
+    """
+    Render scouting cards for every player in a DataFrame using a process pool
+
+    Args:
+        df: (Filtered) player DataFrame from prepare_data_global
+        stat_categories: Dictionary of stat categories
+        output_dir: Directory the cards are written to (created if missing)
+        fmt: One of CARD_FORMATS
+        cohort: Percentile cohort key from config/cohorts.py
+        workers: Number of worker processes (default: CPU count)
+
+    Returns:
+        Dictionary with rendered, skipped, failed, errors ({output path: message}
+        of the failed cards), seconds and cards_per_second
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    tasks, skipped = build_card_tasks(df, stat_categories, output_dir, fmt=fmt, cohort=cohort)
+
+    rendered = 0
+    errors = {}
+    start = time.perf_counter()
+
+    if tasks:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(_render_card_task, task): task[3] for task in tasks}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    rendered += 1
+                except Exception as e:
+                    errors[futures[future]] = str(e)
+                    logger.error("Error rendering %s: %s", futures[future], e)
+
+                done = rendered + len(errors)
+                if done % PROGRESS_EVERY == 0:
+                    elapsed = time.perf_counter() - start
+                    logger.info("%d/%d cards (%.1f cards/sec)", done, len(tasks), done / elapsed)
+
+    elapsed = time.perf_counter() - start
+    return {
+        'rendered': rendered,
+        'skipped': skipped,
+        'failed': len(errors),
+        'errors': errors,
+        'seconds': elapsed,
+        'cards_per_second': rendered / elapsed if elapsed > 0 else 0.0
+    }
+
+
+def main():
+    from config.cohorts import COHORTS, DEFAULT_COHORT
+    from config.stat_categories import STAT_CATEGORIES
+    from utils.data_loader import filter_players, prepare_data_global
+
+    parser = argparse.ArgumentParser(description="Render scouting cards for a filtered player list")
+    parser.add_argument('--data', default=os.path.join('data', '2025'), help="Folder with league CSV files")
+    parser.add_argument('--out', default='cards', help="Output directory (re-run to resume)")
+    parser.add_argument('--format', default='png', choices=CARD_FORMATS)
+    parser.add_argument('--leagues', nargs='*', help="Leagues to include (default: all)")
+    parser.add_argument('--positions', nargs='*', help="Positions to include (default: all)")
+    parser.add_argument('--expression', help="Filter expression, e.g. 'Age < 25 and \"Minutes played\" >= 900'")
+    parser.add_argument('--cohort', default=DEFAULT_COHORT, choices=list(COHORTS))
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    df = prepare_data_global(args.data, STAT_CATEGORIES)
+    df = filter_players(df, positions=args.positions, leagues=args.leagues, expression=args.expression)
+    logger.info("Rendering cards for %d players to %s", len(df), args.out)
+
+    result = render_cards(df, STAT_CATEGORIES, args.out, fmt=args.format,
+                          cohort=args.cohort, workers=args.workers)
+    logger.info("Rendered %d cards, skipped %d existing, %d failed in %.1fs (%.1f cards/sec)",
+                result['rendered'], result['skipped'], result['failed'], result['seconds'],
+                result['cards_per_second'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Bounded LRU cache of rendered chart images
+Matplotlib charts are rendered once to PNG bytes and reused across Streamlit reruns
+"""
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable
+
+import matplotlib.pyplot as plt
+
+# Maximum number of rendered charts kept in memory
+MAX_CHART_ENTRIES = 256
+
+# Same output options as st.pyplot, so cached images look identical
+PNG_OPTIONS = {"bbox_inches": "tight", "dpi": 200, "format": "png"}
+
+
+def hash_config(config) -> str:
+    """
+    Get a stable hash of a configuration structure (e.g. STAT_CATEGORIES)
+
+    Args:
+        config: JSON-serializable dict/list
+
+    Returns:
+        Short hex digest
+    """
+    payload = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def figure_to_png(fig) -> bytes:
+    """
+    Render a matplotlib figure to PNG bytes and close it
+
+    Args:
+        fig: matplotlib figure
+
+    Returns:
+        PNG image bytes
+    """
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, **PNG_OPTIONS)
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+
+class ChartCache:
+    """
+    Thread-safe LRU of rendered chart bytes with hit/miss counters
+    """
+
+    def __init__(self, max_entries: int = MAX_CHART_ENTRIES):
+        """
+        Args:
+            max_entries: Maximum number of charts kept
+        """
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Hashable, bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, key: Hashable, render: Callable[[], object]) -> bytes:
+        """
+        Get a chart's image, rendering it on a miss
+
+        Args:
+            key: Cache key (must capture everything the chart depends on)
+            render: Function returning a matplotlib figure
+
+        Returns:
+            PNG image bytes
+        """
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return image
+            self.misses += 1
+
+        # Render outside the lock so other sessions are not blocked
+        image = figure_to_png(render())
+
+        with self._lock:
+            self._entries[key] = image
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return image
+
+    def clear(self):
+        """Drop all cached charts and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with entries, bytes, hits, misses and hit_rate (0-1)
+        """
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': sum(len(image) for image in self._entries.values()),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else 0.0
+            }
+
+
+_CHART_CACHE = ChartCache()
+
+
+def get_chart_cache() -> ChartCache:
+    """Get the process-wide chart cache (shared by all sessions)"""
+    return _CHART_CACHE
@@ -0,0 +1,434 @@
+"""
+Cohort-relative percentiles (league, position group, league x position group)
+All cohorts are ranked once per dataset version and kept as compact float32 blocks
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config.cohorts import COHORTS
+from config.position_groups import get_primary_position_group
+from utils.column_store import build_sorted_index, get_column_store
+
+
+def get_position_group_labels(df: pd.DataFrame) -> pd.Series:
+    """
+    Get the primary position group of every player
+
+    Args:
+        df: Player DataFrame with a Position column
+
+    Returns:
+        Series of position group names aligned with ``df``
+    """
+    positions = df['Position']
+    # Map each distinct position string once instead of every row
+    mapping = {pos: get_primary_position_group(pos) for pos in positions.dropna().unique()}
+    return positions.map(mapping).fillna("Other")
+
+
+def _get_cohort_keys(df: pd.DataFrame, cohort: str) -> pd.DataFrame:
+    """Key columns defining the groups of a cohort (empty for the global cohort)"""
+    key_columns = {}
+    for key in COHORTS[cohort]['keys']:
+        if key == 'Position group':
+            key_columns[key] = get_position_group_labels(df).to_numpy()
+        else:
+            key_columns[key] = df[key].to_numpy()
+    return pd.DataFrame(key_columns, index=df.index)
+
+
+def get_cohort_codes(df: pd.DataFrame, cohort: str) -> np.ndarray:
+    """
+    Get the integer group code of every player for a cohort
+
+    Args:
+        df: Player DataFrame
+        cohort: Key from COHORTS
+
+    Returns:
+        Array of group codes aligned with ``df`` (all zeros for the global cohort)
+    """
+    keys = COHORTS[cohort]['keys']
+    if not keys:
+        return np.zeros(len(df), dtype=np.uint16)
+
+    key_df = _get_cohort_keys(df, cohort)
+    codes = key_df.groupby(keys, sort=False, dropna=False).ngroup().to_numpy()
+
+    # Compact codes keep the per-cohort sort a radix sort
+    if codes.max(initial=0) < np.iinfo(np.uint16).max:
+        return codes.astype(np.uint16)
+    return codes
+
+
+class CohortPercentiles:
+    """
+    Percentile blocks (rows x stats, float32) for every cohort of one dataset version
+    """
+
+    def __init__(self, stat_columns: List[str], blocks: Dict[str, np.ndarray],
+                 codes: Dict[str, np.ndarray]):
+        """
+        Args:
+            stat_columns: Stat columns in block column order
+            blocks: {cohort: float32 array of shape (n_rows, n_stats)}
+            codes: {cohort: group code of every row}
+        """
+        self.stat_columns = stat_columns
+        self.column_index = {col: i for i, col in enumerate(stat_columns)}
+        self.blocks = blocks
+        self.codes = codes
+
+    def block(self, cohort: str) -> np.ndarray:
+        """
+        Get the percentile block of a cohort
+
+        Args:
+            cohort: Key from COHORTS
+
+        Returns:
+            float32 array of shape (n_rows, n_stats)
+        """
+        if cohort not in self.blocks:
+            raise ValueError(f"Unknown cohort '{cohort}'")
+        return self.blocks[cohort]
+
+    def row(self, cohort: str, position: int) -> Dict[str, float]:
+        """
+        Get one player's percentiles for a cohort
+
+        Args:
+            cohort: Key from COHORTS
+            position: Row position in the global frame
+
+        Returns:
+            Dictionary of {stat_column: percentile}
+        """
+        values = self.block(cohort)[position]
+        return {col: float(values[i]) for i, col in enumerate(self.stat_columns)}
+
+
+def _grouped_percentiles(values: np.ndarray, order: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """
+    Percentile rank of every value within its group
+
+    Matches ``groupby(codes).rank(pct=True) * 100``: ties get the average rank,
+    NaN stays NaN and the denominator is the group's non-NaN count.
+
+    Args:
+        values: Column values
+        order: Stable ascending argsort of ``values`` (NaN last), shared by all cohorts
+        codes: Group code of every row
+
+    Returns:
+        float64 percentiles aligned with ``values``
+    """
+    # Stable sort by group keeps the value order inside each group
+    # (small integer codes use numpy's radix sort)
+    if codes.max(initial=0) == 0:
+        grouped_order = order
+    else:
+        grouped_order = order[np.argsort(codes[order], kind='stable')]
+    sorted_codes = codes[grouped_order]
+    sorted_values = values[grouped_order]
+    n = len(values)
+    slots = np.arange(n)
+
+    new_group = np.empty(n, dtype=bool)
+    new_group[:1] = True
+    new_group[1:] = sorted_codes[1:] != sorted_codes[:-1]
+    group_start = np.maximum.accumulate(np.where(new_group, slots, 0))
+    ordinal = slots - group_start + 1
+
+    # Runs of tied values inside a group share their average rank
+    new_run = new_group.copy()
+    new_run[1:] |= sorted_values[1:] != sorted_values[:-1]
+    run_starts = np.flatnonzero(new_run)
+    run_ends = np.append(run_starts[1:], n) - 1
+    run_rank = (ordinal[run_starts] + ordinal[run_ends]) / 2.0
+    average_rank = run_rank[np.cumsum(new_run) - 1]
+
+    valid = ~np.isnan(sorted_values)
+    group_counts = np.bincount(sorted_codes[valid], minlength=int(codes.max(initial=0)) + 1)
+    percentiles = np.full(n, np.nan)
+    percentiles[valid] = average_rank[valid] / group_counts[sorted_codes[valid]] * 100
+
+    result = np.empty(n)
+    result[grouped_order] = percentiles
+    return result
+
+
+def calculate_cohort_percentiles(df: pd.DataFrame, stat_columns: List[str]) -> CohortPercentiles:
+    """
+    Rank all stat columns within every cohort in one pass
+
+    Each stat column is sorted once and that order is reused for every cohort
+    (a stable sort by group code keeps it inside each group), so adding cohorts
+    costs only integer sorts and linear scans. Results match
+    ``Series.rank(pct=True) * 100`` per group.
+
+    Args:
+        df: Global player DataFrame
+        stat_columns: Stat columns to rank
+
+    Returns:
+        CohortPercentiles with one float32 block per cohort
+    """
+    present = [col for col in stat_columns if col in df.columns]
+    codes = {cohort: get_cohort_codes(df, cohort) for cohort in COHORTS}
+    blocks = {cohort: np.empty((len(df), len(present)), dtype=np.float32) for cohort in COHORTS}
+
+    for j, col in enumerate(present):
+        values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        order = np.argsort(values, kind='stable')
+        for cohort in COHORTS:
+            blocks[cohort][:, j] = _grouped_percentiles(values, order, codes[cohort])
+
+    return CohortPercentiles(present, blocks, codes)
+
+
+def get_cohort_percentiles(df: pd.DataFrame, stat_columns: List[str]) -> CohortPercentiles:
+    """
+    Get cohort percentiles for a DataFrame's dataset version (computed once)
+
+    Args:
+        df: Global or filtered player DataFrame
+        stat_columns: Stat columns to rank
+
+    Returns:
+        CohortPercentiles covering every row of the global frame
+    """
+    store = get_column_store(df)
+    return store.artifact(
+        f"cohort_percentiles:{'|'.join(stat_columns)}",
+        lambda s: calculate_cohort_percentiles(s.df, stat_columns)
+    )
+
+
+def _calculate_cohort_composites(store, stat_columns: List[str], cohort: str,
+                                 composite_attributes: Dict) -> np.ndarray:
+    """Composite scores of every stored row using a cohort's percentiles"""
+    from utils.data_loader import get_composite_weights
+
+    cohort_percentiles = get_cohort_percentiles(store.df, stat_columns)
+    block = cohort_percentiles.block(cohort)
+    weights, offsets, source_cols, fill_values = get_composite_weights(
+        list(store.df.columns), composite_attributes
+    )
+
+    # Percentile components read the cohort block, raw components the stored column
+    values = np.empty((store.n_rows, len(source_cols)))
+    for i, source in enumerate(source_cols):
+        stat_name = source[:-len('_percentile')] if source.endswith('_percentile') else None
+        if stat_name in cohort_percentiles.column_index:
+            values[:, i] = block[:, cohort_percentiles.column_index[stat_name]]
+        else:
+            values[:, i] = store.numeric_column(source)
+
+    values = np.where(np.isnan(values), fill_values, values)
+    return values @ weights + offsets
+
+
+def _get_cohort_composite_scores(store, stat_columns: List[str], cohort: str,
+                                 composite_attributes: Dict) -> np.ndarray:
+    """Cached (n_rows, n_attributes) composite scores of a cohort"""
+    return store.artifact(
+        f"cohort_composites:{cohort}:{'|'.join(composite_attributes)}",
+        lambda s: _calculate_cohort_composites(s, stat_columns, cohort, composite_attributes)
+    )
+
+
+def get_cohort_composites(df: pd.DataFrame, stat_columns: List[str], cohort: str,
+                          composite_attributes: Dict) -> pd.DataFrame:
+    """
+    Get COMP_* scores of a cohort for the rows of a DataFrame
+
+    Same formula as calculate_composite_attributes_batch, computed once per
+    dataset version and cohort from the precomputed percentile blocks.
+
+    Args:
+        df: Global or filtered player DataFrame
+        stat_columns: Stat columns the percentiles were ranked on
+        cohort: Key from COHORTS
+        composite_attributes: COMPOSITE_ATTRIBUTES config
+
+    Returns:
+        DataFrame of COMP_* columns indexed like ``df``
+    """
+    store = get_column_store(df)
+    scores = _get_cohort_composite_scores(store, stat_columns, cohort, composite_attributes)
+
+    return pd.DataFrame(
+        scores[store.positions(df)],
+        index=df.index,
+        columns=[f"COMP_{attr_key}" for attr_key in composite_attributes]
+    )
+
+
+def get_composite_sorted_index(df: pd.DataFrame, stat_columns: List[str], cohort: str,
+                               composite_attributes: Dict, attr_key: str):
+    """
+    Get the sorted index of one composite attribute's scores (built once per version)
+
+    Args:
+        df: Global or filtered player DataFrame
+        stat_columns: Stat columns the percentiles were ranked on
+        cohort: Key from COHORTS
+        composite_attributes: COMPOSITE_ATTRIBUTES config
+        attr_key: Composite attribute key
+
+    Returns:
+        Sorted index tuple over every stored row (see ColumnStore.sorted_index)
+    """
+    store = get_column_store(df)
+    column = f"COMP_{attr_key}"
+    if cohort == 'global' and store.has_column(column):
+        return store.sorted_index(column)
+
+    attr_index = list(composite_attributes).index(attr_key)
+    return store.artifact(
+        f"cohort_composite_index:{cohort}:{attr_key}:{'|'.join(composite_attributes)}",
+        lambda s: build_sorted_index(
+            _get_cohort_composite_scores(s, stat_columns, cohort, composite_attributes)[:, attr_index]
+        )
+    )
+
+
+class PercentileLookup:
+    """
+    Sorted stat values of every group of one cohort, for ranking values that
+    are not part of the dataset (trial players, opponents' stat lines)
+    """
+
+    def __init__(self, cohort: str, sorted_values: Dict[str, np.ndarray],
+                 group_starts: np.ndarray, group_valid: Dict[str, np.ndarray],
+                 group_codes: Dict[Tuple, int]):
+        """
+        Args:
+            cohort: Key from COHORTS
+            sorted_values: {stat_column: values sorted by (group code, value), NaN last per group}
+            group_starts: First slot of every group in the sorted arrays
+            group_valid: {stat_column: non-NaN count of every group}
+            group_codes: {group key tuple: group code}
+        """
+        self.cohort = cohort
+        self.sorted_values = sorted_values
+        self.group_starts = group_starts
+        self.group_valid = group_valid
+        self.group_codes = group_codes
+
+    def group_code(self, league: Optional[str] = None, position: Optional[str] = None) -> int:
+        """
+        Get the group a player with the given league and position falls into
+
+        Args:
+            league: League name (needed by league cohorts)
+            position: Position string such as "LCB, RCB" (needed by position group cohorts)
+
+        Returns:
+            Group code
+
+        Raises:
+            ValueError: If a required key is missing or the group has no players
+        """
+        keys = COHORTS[self.cohort]['keys']
+        if not keys:
+            return 0
+
+        values = {'League': league, 'Position group': get_primary_position_group(position or '')}
+        if 'League' in keys and not league:
+            raise ValueError(f"Cohort '{self.cohort}' needs the player's league")
+        if 'Position group' in keys and not position:
+            raise ValueError(f"Cohort '{self.cohort}' needs the player's position")
+
+        key = tuple(values[k] for k in keys)
+        if key not in self.group_codes:
+            raise ValueError(f"No players in cohort group {key}")
+        return self.group_codes[key]
+
+    def percentile(self, stat_column: str, value: float, group: int = 0) -> float:
+        """
+        Percentile a value would have if it were added to its group
+
+        Two binary searches give the number of lower and equal values; the
+        result matches ``rank(pct=True) * 100`` of the group plus the new value.
+
+        Args:
+            stat_column: Stat column
+            value: Raw stat value
+            group: Group code from ``group_code``
+
+        Returns:
+            Percentile (0-100), NaN for NaN values or stats with no data
+        """
+        n_valid = int(self.group_valid[stat_column][group])
+        if np.isnan(value) or n_valid == 0:
+            return np.nan
+
+        start = self.group_starts[group]
+        values = self.sorted_values[stat_column][start:start + n_valid]
+        n_less = int(np.searchsorted(values, value, side='left'))
+        n_equal = int(np.searchsorted(values, value, side='right')) - n_less
+
+        # The new value ties with n_equal others and shares their average rank
+        average_rank = n_less + (n_equal + 2) / 2.0
+        return average_rank / (n_valid + 1) * 100
+
+
+def _build_percentile_lookup(store, stat_columns: List[str], cohort: str) -> PercentileLookup:
+    """Group the store's sorted indexes by cohort group"""
+    df = store.df
+    present = [col for col in stat_columns if col in df.columns]
+    codes = get_cohort_codes(df, cohort)
+    n_groups = int(codes.max(initial=0)) + 1 if len(codes) else 1
+    group_starts = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=n_groups))[:-1]])
+
+    group_codes = {}
+    if COHORTS[cohort]['keys']:
+        key_df = _get_cohort_keys(df, cohort)
+        key_df['code'] = codes
+        for row in key_df.drop_duplicates('code').itertuples(index=False):
+            group_codes[tuple(row[:-1])] = int(row[-1])
+    else:
+        group_codes[()] = 0
+
+    sorted_values = {}
+    group_valid = {}
+    for col in present:
+        order, col_sorted, _, n_valid = store.sorted_index(col)
+        values = store.numeric_column(col)
+        if n_groups == 1:
+            sorted_values[col] = col_sorted
+        else:
+            # Stable sort by group keeps the value order (and NaN last) inside each group
+            grouped_order = order[np.argsort(codes[order], kind='stable')]
+            sorted_values[col] = values[grouped_order]
+        valid = ~np.isnan(values)
+        group_valid[col] = np.bincount(codes[valid], minlength=n_groups)
+
+    return PercentileLookup(cohort, sorted_values, group_starts, group_valid, group_codes)
+
+
+def get_percentile_lookup(df: pd.DataFrame, stat_columns: List[str],
+                          cohort: str = 'global') -> PercentileLookup:
+    """
+    Get the percentile lookup of a cohort (built once per dataset version)
+
+    Args:
+        df: Global or filtered player DataFrame
+        stat_columns: Stat columns to rank against
+        cohort: Key from COHORTS
+
+    Returns:
+        PercentileLookup over every row of the global frame
+    """
+    if cohort not in COHORTS:
+        raise ValueError(f"Unknown cohort '{cohort}'")
+
+    store = get_column_store(df)
+    return store.artifact(
+        f"percentile_lookup:{cohort}:{'|'.join(stat_columns)}",
+        lambda s: _build_percentile_lookup(s, stat_columns, cohort)
+    )
@@ -0,0 +1,489 @@
+"""
+Per-dataset column cache shared by the query engines
+Numpy views and sorted indexes are built once per dataset version and reused across reruns
+"""
+import hashlib
+import itertools
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.quantized_block import column_values
+
+# Key in DataFrame.attrs holding the dataset version stamped by the loader
+DATASET_VERSION_ATTR = 'dataset_version'
+
+# Number of dataset versions kept in memory at once
+MAX_CACHED_VERSIONS = 4
+
+# Stores of frames that carry a dataset version but not its rows (see get_column_store)
+MAX_DERIVED_STORES = 4
+
+# Columns compared when mapping a frame onto the stored rows: attrs (and so the
+# dataset version) survive reset_index, sorting and concat, after which a
+# frame's index labels no longer point at its own rows
+IDENTITY_COLUMNS = ['Player', 'Team', 'Season']
+
+# Frames whose row mapping has been checked, per store
+MAX_VERIFIED_FRAMES = 32
+
+
+def compute_file_version(file_paths: List[str]) -> str:
+    """
+    Build a dataset version string from the source files
+
+    Args:
+        file_paths: Paths of the CSV files making up the dataset
+
+    Returns:
+        Short hex digest that changes whenever a file is added, removed or modified
+    """
+    digest = hashlib.sha1()
+    for path in sorted(file_paths):
+        stat = os.stat(path)
+        digest.update(f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}\n".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def enable_copy_on_write():
+    """
+    Turn on pandas copy-on-write for the process
+
+    Called by the entry points (app, scout CLI, query service), not on import.
+    Frames cut from the global frame (filters, scorer pools, overlays) then
+    share its columns until one of them is written to, so shallow copies are
+    free and a write to one frame never reaches the others.
+    """
+    pd.set_option('mode.copy_on_write', True)
+
+
+def copy_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Copy a frame so writes to the copy do not reach ``df``
+
+    Args:
+        df: DataFrame to copy
+
+    Returns:
+        A lazy copy under copy-on-write, a deep copy otherwise
+    """
+    return df.copy(deep=not pd.get_option('mode.copy_on_write'))
+
+
+def get_dataset_version(df: pd.DataFrame) -> str:
+    """
+    Get the dataset version of a DataFrame
+
+    Frames produced by the loader carry the version in ``df.attrs``; any other
+    frame falls back to a content hash.
+
+    Args:
+        df: Player DataFrame
+
+    Returns:
+        Dataset version string
+    """
+    version = df.attrs.get(DATASET_VERSION_ATTR)
+    if version:
+        return version
+
+    digest = hashlib.sha1()
+    digest.update(repr((df.shape, list(df.columns))).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return f"content-{digest.hexdigest()[:16]}"
+
+
+def _read_only(values: np.ndarray) -> np.ndarray:
+    """Return a read-only view so cached arrays cannot be mutated by callers"""
+    view = values.view()
+    view.flags.writeable = False
+    return view
+
+
+def _same_values(stored: np.ndarray, values: np.ndarray) -> bool:
+    """Check two label arrays for equality, treating missing values as equal"""
+    equal = stored == values
+    if not isinstance(equal, np.ndarray):
+        return False
+    if equal.all():
+        return True
+    return bool((equal | (pd.isna(stored) & pd.isna(values))).all())
+
+
+def build_sorted_index(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    """
+    Build the ascending sort index of a float array
+
+    Args:
+        values: float64 values (NaN allowed)
+
+    Returns:
+        (order, sorted_values, inverse, n_valid) where ``order`` are row positions
+        sorted by value, ``inverse[row]`` is the row's slot in ``order`` and NaN
+        values occupy the slots from ``n_valid`` onwards
+    """
+    order = np.argsort(values, kind='stable')
+    inverse = np.empty_like(order)
+    inverse[order] = np.arange(len(order))
+    sorted_values = values[order]
+    n_valid = int(np.count_nonzero(~np.isnan(values)))
+    return _read_only(order), _read_only(sorted_values), _read_only(inverse), n_valid
+
+
+def descending_ranks(sorted_index: Tuple[np.ndarray, np.ndarray, np.ndarray, int],
+                     values: np.ndarray, positions: Optional[np.ndarray] = None) -> Tuple[np.ndarray, int]:
+    """
+    Rank values against a pool of indexed rows (1 = highest)
+
+    Ties share the best rank. With ``positions`` the pool is restricted to
+    those rows (one linear count over the index); without it the pool is
+    every row and only the binary searches are needed.
+
+    Args:
+        sorted_index: Entry from ColumnStore.sorted_index or build_sorted_index
+        values: Values to rank (NaN gets a NaN rank)
+        positions: Row positions forming the pool (default: all rows)
+
+    Returns:
+        (ranks, pool_size) where pool_size counts the pool's non-NaN values
+    """
+    _, sorted_values, inverse, n_valid = sorted_index
+    values = np.asarray(values, dtype=np.float64)
+    at_or_below = np.searchsorted(sorted_values[:n_valid], values, side='right')
+
+    if positions is None:
+        counts = at_or_below
+        pool_size = n_valid
+    else:
+        slots = inverse[positions]
+        slots = slots[slots < n_valid]
+        cumulative = np.concatenate([[0], np.cumsum(np.bincount(slots, minlength=n_valid))])
+        counts = cumulative[at_or_below]
+        pool_size = int(cumulative[-1])
+
+    ranks = (pool_size - counts + 1).astype(np.float64)
+    ranks[np.isnan(values)] = np.nan
+    return ranks, pool_size
+
+
+class KeyIndex:
+    """
+    Row positions of every distinct key of a label column (player, league, position)
+
+    Keys are kept sorted with one contiguous slice of row positions per key, so
+    the index is three flat arrays that can be saved and memory-mapped.
+    """
+
+    def __init__(self, keys: np.ndarray, offsets: np.ndarray, rows: np.ndarray):
+        """
+        Args:
+            keys: Sorted distinct keys (unicode array)
+            offsets: ``rows[offsets[i]:offsets[i + 1]]`` are the rows of ``keys[i]``
+            rows: Row positions grouped by key, ascending within each key
+        """
+        self.keys = keys
+        self.offsets = offsets
+        self.rows = rows
+
+    @classmethod
+    def from_values(cls, values: np.ndarray, separator: str = None) -> 'KeyIndex':
+        """
+        Build the index of a label column
+
+        Args:
+            values: One label per row (missing values are skipped)
+            separator: Split labels on this separator and index every part
+                (e.g. ',' for "CB, LCB")
+
+        Returns:
+            KeyIndex over the column
+        """
+        series = pd.Series(values, copy=False).dropna().astype(str)
+        if separator is not None:
+            series = series.str.split(separator).explode().str.strip()
+            series = series[series != '']
+
+        row_positions = series.index.to_numpy(dtype=np.int64)
+        labels = series.to_numpy(dtype=str)
+        order = np.argsort(labels, kind='stable')
+        keys, counts = np.unique(labels[order], return_counts=True)
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        return cls(keys, offsets, row_positions[order])
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key) -> bool:
+        return self._slot(key) is not None
+
+    def _slot(self, key) -> Optional[int]:
+        slot = int(np.searchsorted(self.keys, str(key)))
+        if slot < len(self.keys) and self.keys[slot] == str(key):
+            return slot
+        return None
+
+    def get(self, key, default: np.ndarray = None) -> np.ndarray:
+        """
+        Get the row positions of one key
+
+        Args:
+            key: Label to look up
+            default: Returned when the key is not indexed
+
+        Returns:
+            Ascending row positions
+        """
+        slot = self._slot(key)
+        if slot is None:
+            return default
+        return self.rows[self.offsets[slot]:self.offsets[slot + 1]]
+
+    def mask(self, keys: List, n_rows: int) -> np.ndarray:
+        """
+        Get a boolean row mask of every row having any of the keys
+
+        Args:
+            keys: Labels to match
+            n_rows: Number of indexed rows
+
+        Returns:
+            Boolean array of length ``n_rows``
+        """
+        mask = np.zeros(n_rows, dtype=bool)
+        for key in keys:
+            rows = self.get(key)
+            if rows is not None:
+                mask[rows] = True
+        return mask
+
+
+class ColumnStore:
+    """
+    Read-only numpy columns and sorted indexes for one dataset version
+    """
+
+    def __init__(self, df: pd.DataFrame, version: str = None):
+        """
+        Args:
+            df: Global player DataFrame (all leagues, all positions)
+            version: Key of the store (default: the dataset version of ``df``)
+        """
+        self.df = df
+        self.dataset_version = get_dataset_version(df)
+        self.version = version or self.dataset_version
+        self.index = df.index
+        self.n_rows = len(df)
+        self._columns: Dict[str, np.ndarray] = {}
+        self._numeric: Dict[str, np.ndarray] = {}
+        self._sorted: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray, int]] = {}
+        self._artifacts: Dict[str, Any] = {}
+        self._verified: 'OrderedDict[int, Tuple[weakref.ref, weakref.ref, np.ndarray]]' = OrderedDict()
+        self._lock = threading.RLock()
+
+    def has_column(self, name: str) -> bool:
+        """Check whether the stored frame has a column"""
+        return name in self.df.columns
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Get a column as a read-only numpy array
+
+        Args:
+            name: Column name
+
+        Returns:
+            Array with one value per stored row
+
+        Raises:
+            KeyError: If the column does not exist
+        """
+        values = self._columns.get(name)
+        if values is None:
+            if name not in self.df.columns:
+                raise KeyError(name)
+            values = _read_only(self.df[name].to_numpy())
+            self._columns[name] = values
+        return values
+
+    def numeric_column(self, name: str) -> np.ndarray:
+        """
+        Get a column as a read-only float64 array (non-numeric values become NaN,
+        fixed-point percentile and composite codes are decoded)
+
+        Args:
+            name: Column name
+
+        Returns:
+            Float array with one value per stored row
+
+        Raises:
+            KeyError: If the column does not exist
+        """
+        values = self._numeric.get(name)
+        if values is None:
+            if name not in self.df.columns:
+                raise KeyError(name)
+            values = _read_only(column_values(self.df, name))
+            self._numeric[name] = values
+        return values
+
+    def sorted_index(self, name: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+        """
+        Get the ascending sort index of a numeric column (built once per column)
+
+        Args:
+            name: Column name
+
+        Returns:
+            (order, sorted_values, inverse, n_valid) where ``order`` are row positions
+            sorted by value, ``inverse[row]`` is the row's slot in ``order`` and NaN
+            values occupy the slots from ``n_valid`` onwards
+        """
+        entry = self._sorted.get(name)
+        if entry is None:
+            with self._lock:
+                entry = self._sorted.get(name)
+                if entry is None:
+                    entry = build_sorted_index(self.numeric_column(name))
+                    self._sorted[name] = entry
+        return entry
+
+    def positions(self, df: pd.DataFrame) -> Optional[np.ndarray]:
+        """
+        Map the rows of a (filtered) frame to stored row positions
+
+        Rows are looked up by index label, and the IDENTITY_COLUMNS of the frame
+        must match the stored rows they map to, so a frame whose labels were
+        reset or reused (reset_index, sort_values, concat) is not mistaken for
+        stored rows. The check runs once per frame object.
+
+        Args:
+            df: DataFrame whose index labels come from the stored frame
+
+        Returns:
+            Read-only array of stored row positions, or None if some rows are not in the store
+        """
+        if df is self.df:
+            return np.arange(self.n_rows)
+
+        with self._lock:
+            entry = self._verified.get(id(df))
+        if entry is not None and entry[0]() is df and entry[1]() is df.index:
+            return entry[2]
+
+        positions = self.index.get_indexer(df.index)
+        if (positions < 0).any():
+            return None
+        for col in IDENTITY_COLUMNS:
+            if col in df.columns and self.has_column(col):
+                if not _same_values(self.column(col)[positions], df[col].to_numpy()):
+                    return None
+
+        positions = _read_only(positions)
+        with self._lock:
+            self._verified[id(df)] = (weakref.ref(df), weakref.ref(df.index), positions)
+            self._verified.move_to_end(id(df))
+            while len(self._verified) > MAX_VERIFIED_FRAMES:
+                self._verified.popitem(last=False)
+        return positions
+
+    def position_of(self, label) -> int:
+        """
+        Get the stored row position of an index label
+
+        Args:
+            label: Index label from the stored frame
+
+        Returns:
+            Row position
+        """
+        return int(self.index.get_loc(label))
+
+    def artifact(self, key: str, builder: Callable[['ColumnStore'], Any]) -> Any:
+        """
+        Get a derived structure for this dataset version, building it on first use
+
+        Args:
+            key: Artifact name
+            builder: Function called with this store to build the artifact
+
+        Returns:
+            The cached artifact
+        """
+        if key not in self._artifacts:
+            with self._lock:
+                if key not in self._artifacts:
+                    self._artifacts[key] = builder(self)
+        return self._artifacts[key]
+
+
+_STORES: 'OrderedDict[str, ColumnStore]' = OrderedDict()
+_DERIVED_STORES: 'OrderedDict[str, ColumnStore]' = OrderedDict()
+_DERIVED_IDS = itertools.count(1)
+_STORES_LOCK = threading.Lock()
+
+
+def register_dataset(df: pd.DataFrame) -> ColumnStore:
+    """
+    Create and register the column store for a global DataFrame
+
+    Args:
+        df: Global player DataFrame
+
+    Returns:
+        The registered ColumnStore
+    """
+    store = ColumnStore(df)
+    with _STORES_LOCK:
+        _STORES[store.version] = store
+        _STORES.move_to_end(store.version)
+        while len(_STORES) > MAX_CACHED_VERSIONS:
+            _STORES.popitem(last=False)
+    return store
+
+
+def get_column_store(df: pd.DataFrame) -> ColumnStore:
+    """
+    Get the column store covering a DataFrame
+
+    Filtered frames share the store of the global frame they were cut from.
+    A frame carrying a dataset version whose registered rows do not cover it
+    (labels reset after filtering, or a dataset that was evicted) gets a store
+    of its own under a derived key, so the registered store is never replaced
+    by a partial frame.
+
+    Args:
+        df: Global or filtered player DataFrame
+
+    Returns:
+        ColumnStore whose rows include every row of ``df``
+    """
+    version = get_dataset_version(df)
+    with _STORES_LOCK:
+        store = _STORES.get(version)
+        if store is not None:
+            _STORES.move_to_end(version)
+        derived = [s for s in reversed(_DERIVED_STORES.values()) if s.dataset_version == version]
+
+    if store is not None and store.positions(df) is not None:
+        return store
+
+    # Frames without a loader version are keyed by their own content
+    if not df.attrs.get(DATASET_VERSION_ATTR):
+        return register_dataset(df)
+
+    for store in derived:
+        if store.positions(df) is not None:
+            return store
+
+    store = ColumnStore(df, version=f"{version}/derived-{next(_DERIVED_IDS)}")
+    with _STORES_LOCK:
+        _DERIVED_STORES[store.version] = store
+        while len(_DERIVED_STORES) > MAX_DERIVED_STORES:
+            _DERIVED_STORES.popitem(last=False)
+    return store
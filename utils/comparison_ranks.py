@@ -0,0 +1,69 @@
+"""
+Attribute ranks for multi-player comparisons
+Pool ranks come from the per-column sorted indexes instead of sorting on every render
+"""
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from utils.cohort_percentiles import get_composite_sorted_index
+from utils.column_store import descending_ranks, get_column_store
+
+
+def rank_within_selection(scores: np.ndarray) -> np.ndarray:
+    """
+    Rank players against each other for every attribute (1 = highest, ties share the best rank)
+
+    Args:
+        scores: Array of shape (n_players, n_attributes)
+
+    Returns:
+        float array of ranks with the same shape (NaN scores get NaN)
+    """
+    higher = (scores[np.newaxis, :, :] > scores[:, np.newaxis, :]).sum(axis=1)
+    ranks = (higher + 1).astype(np.float64)
+    ranks[np.isnan(scores)] = np.nan
+    return ranks
+
+
+def compute_attribute_ranks(df: pd.DataFrame, players_data: List[Dict], attr_keys: List[str],
+                            stat_columns: List[str], composite_attributes: Dict,
+                            cohort: str = 'global') -> Dict:
+    """
+    Rank selected players on composite attributes, within the selection and within the pool
+
+    Args:
+        df: Filtered player DataFrame forming the pool
+        players_data: List of player data dictionaries (with 'composite_attributes' key)
+        attr_keys: Composite attribute keys to rank
+        stat_columns: List of all stat column names
+        composite_attributes: Dictionary defining composite attribute formulas
+        cohort: Percentile cohort key the composite scores were computed in
+
+    Returns:
+        Dictionary with 'attributes', 'scores', 'selection_ranks', 'pool_ranks'
+        (arrays of shape (n_players, n_attributes)) and 'pool_sizes' (one per attribute)
+    """
+    attr_keys = [key for key in attr_keys if key in composite_attributes]
+    scores = np.array([
+        [player_data['composite_attributes'].get(key, {}).get('score', np.nan) for key in attr_keys]
+        for player_data in players_data
+    ], dtype=np.float64).reshape(len(players_data), len(attr_keys))
+
+    store = get_column_store(df)
+    positions = None if len(df) == store.n_rows else store.positions(df)
+
+    pool_ranks = np.full(scores.shape, np.nan)
+    pool_sizes = np.zeros(len(attr_keys), dtype=np.int64)
+    for j, attr_key in enumerate(attr_keys):
+        sorted_index = get_composite_sorted_index(df, stat_columns, cohort, composite_attributes, attr_key)
+        pool_ranks[:, j], pool_sizes[j] = descending_ranks(sorted_index, scores[:, j], positions)
+
+    return {
+        'attributes': attr_keys,
+        'scores': scores,
+        'selection_ranks': rank_within_selection(scores),
+        'pool_ranks': pool_ranks,
+        'pool_sizes': pool_sizes
+    }
@@ -0,0 +1,241 @@
+"""
+Threshold constraint search over the global player frame
+Each predicate resolves to a row set by binary search on a per-column sorted index
+"""
+import re
+from typing import List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from utils.column_store import ColumnStore, get_column_store
+
+# Supported comparison operators (unicode variants are normalized on parse)
+OPERATORS = ['>=', '>', '<=', '<', '==']
+
+_OPERATOR_ALIASES = {'≥': '>=', '≤': '<=', '=': '=='}
+
+_CONSTRAINT_PATTERN = re.compile(
+    r'^\s*(?P<column>.+?)\s*(?P<op>>=|<=|==|≥|≤|>|<|=)\s*(?P<value>[-+]?\d+(?:\.\d+)?)\s*$',
+    re.DOTALL
+)
+
+Constraint = Tuple[str, str, float]
+
+
+def parse_constraint(text: str) -> Constraint:
+    """
+    Parse a single constraint such as "Aerial duels won, % >= 65"
+
+    Args:
+        text: Constraint text (column, operator, number)
+
+    Returns:
+        (column, operator, value) tuple
+
+    Raises:
+        ValueError: If the text is not a valid constraint
+    """
+    match = _CONSTRAINT_PATTERN.match(text)
+    if not match:
+        raise ValueError(f"Invalid constraint '{text.strip()}' (expected '<column> <op> <number>')")
+
+    op = _OPERATOR_ALIASES.get(match.group('op'), match.group('op'))
+    return match.group('column').strip().strip('"'), op, float(match.group('value'))
+
+
+def parse_constraints(text: str) -> List[Constraint]:
+    """
+    Parse constraints joined by "and" or newlines
+
+    Example:
+        "Aerial duels won, % ≥ 65 and Progressive passes per 90 ≥ 6 and Age ≤ 24"
+
+    Args:
+        text: Constraint text
+
+    Returns:
+        List of (column, operator, value) tuples (empty if text is blank)
+    """
+    parts = re.split(r'\s+and\s+|\n', text.strip(), flags=re.IGNORECASE)
+    return [parse_constraint(part) for part in parts if part.strip()]
+
+
+class ConstraintIndex:
+    """
+    Resolve threshold constraints with binary search over sorted column indexes
+    """
+
+    def __init__(self, store: ColumnStore):
+        """
+        Args:
+            store: Column store of the global DataFrame
+        """
+        self.store = store
+
+    def resolve_range(self, column: str, op: str, value: float) -> Tuple[int, int]:
+        """
+        Resolve a predicate to a slot range of the column's sorted index
+
+        Args:
+            column: Column name
+            op: One of OPERATORS
+            value: Threshold value
+
+        Returns:
+            (lo, hi) so that ``order[lo:hi]`` are the matching rows (NaN never matches)
+        """
+        if not self.store.has_column(column):
+            raise ValueError(f"Column '{column}' not found in dataframe")
+        if op not in OPERATORS:
+            raise ValueError(f"Unsupported operator '{op}'")
+
+        _, sorted_values, _, n_valid = self.store.sorted_index(column)
+        valid_values = sorted_values[:n_valid]
+
+        if op == '>=':
+            return int(np.searchsorted(valid_values, value, side='left')), n_valid
+        if op == '>':
+            return int(np.searchsorted(valid_values, value, side='right')), n_valid
+        if op == '<=':
+            return 0, int(np.searchsorted(valid_values, value, side='right'))
+        if op == '<':
+            return 0, int(np.searchsorted(valid_values, value, side='left'))
+        return (int(np.searchsorted(valid_values, value, side='left')),
+                int(np.searchsorted(valid_values, value, side='right')))
+
+    def resolve(self, column: str, op: str, value: float) -> np.ndarray:
+        """
+        Resolve a single predicate to a sorted array of row positions
+
+        Args:
+            column: Column name
+            op: One of OPERATORS
+            value: Threshold value
+
+        Returns:
+            Sorted row positions matching the predicate
+        """
+        lo, hi = self.resolve_range(column, op, value)
+        order = self.store.sorted_index(column)[0]
+        return np.sort(order[lo:hi])
+
+    def query(self, constraints: List[Constraint]) -> np.ndarray:
+        """
+        Find rows satisfying every constraint
+
+        Ranges are resolved first (two binary searches each), then the smallest
+        set is materialized and intersected with the others in increasing size
+        by checking each candidate's slot in the next sorted index.
+
+        Args:
+            constraints: List of (column, operator, value) tuples
+
+        Returns:
+            Sorted row positions of the stored frame
+        """
+        if not constraints:
+            return np.arange(self.store.n_rows)
+
+        ranges = []
+        for column, op, value in constraints:
+            lo, hi = self.resolve_range(column, op, value)
+            ranges.append((hi - lo, column, lo, hi))
+
+        # Smallest set first
+        ranges.sort(key=lambda r: r[0])
+
+        size, column, lo, hi = ranges[0]
+        candidates = self.store.sorted_index(column)[0][lo:hi]
+
+        for size, column, lo, hi in ranges[1:]:
+            if len(candidates) == 0:
+                break
+            slots = self.store.sorted_index(column)[2][candidates]
+            candidates = candidates[(slots >= lo) & (slots < hi)]
+
+        return np.sort(candidates)
+
+    def mask(self, df: pd.DataFrame, constraints: List[Constraint]) -> np.ndarray:
+        """
+        Evaluate constraints on the rows of a (filtered) DataFrame
+
+        Args:
+            df: Global or filtered player DataFrame covered by the store
+            constraints: List of (column, operator, value) tuples
+
+        Returns:
+            Boolean array aligned with the rows of ``df``
+        """
+        positions = self.store.positions(df)
+        if positions is None:
+            raise ValueError("DataFrame rows are not part of the indexed dataset")
+
+        matched = np.zeros(self.store.n_rows, dtype=bool)
+        matched[self.query(constraints)] = True
+        return matched[positions]
+
+    def filter(self, df: pd.DataFrame, constraints: List[Constraint]) -> pd.DataFrame:
+        """
+        Restrict a (filtered) DataFrame to rows satisfying every constraint
+
+        Args:
+            df: Global or filtered player DataFrame covered by the store
+            constraints: List of (column, operator, value) tuples
+
+        Returns:
+            Subset of ``df`` (row order preserved)
+        """
+        return df[self.mask(df, constraints)]
+
+
+def get_constraint_index(df: pd.DataFrame) -> ConstraintIndex:
+    """
+    Get the constraint index for a DataFrame's dataset version
+
+    Args:
+        df: Global or filtered player DataFrame
+
+    Returns:
+        ConstraintIndex (built once per dataset version)
+    """
+    store = get_column_store(df)
+    return store.artifact('constraint_index', ConstraintIndex)
+
+
+def apply_constraints(df: pd.DataFrame, constraints: Union[str, List[Constraint], None]) -> pd.DataFrame:
+    """
+    Filter a DataFrame by threshold constraints
+
+    Args:
+        df: Global or filtered player DataFrame
+        constraints: Constraint text or list of (column, operator, value) tuples
+
+    Returns:
+        Filtered DataFrame (``df`` itself if there are no constraints)
+    """
+    if isinstance(constraints, str):
+        constraints = parse_constraints(constraints)
+    if not constraints:
+        return df
+
+    return get_constraint_index(df).filter(df, constraints)
+
+
+def constraint_mask(df: pd.DataFrame, constraints: Union[str, List[Constraint], None]) -> np.ndarray:
+    """
+    Evaluate threshold constraints without filtering the DataFrame
+
+    Args:
+        df: Global or filtered player DataFrame
+        constraints: Constraint text or list of (column, operator, value) tuples
+
+    Returns:
+        Boolean array aligned with the rows of ``df`` (all True if there are no constraints)
+    """
+    if isinstance(constraints, str):
+        constraints = parse_constraints(constraints)
+    if not constraints:
+        return np.ones(len(df), dtype=bool)
+
+    return get_constraint_index(df).mask(df, constraints)
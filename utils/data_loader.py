@@ -7,6 +7,20 @@ from typing import Dict, List
 import glob
 import os
 import re
+from utils.column_store import (
+    DATASET_VERSION_ATTR, KeyIndex, compute_file_version, copy_frame, get_column_store, register_dataset
+)
+from utils.filter_dsl import apply_filter_expression
+from utils.cohort_percentiles import get_cohort_composites, get_cohort_percentiles, get_percentile_lookup
+from utils.instrumentation import instrument
+from utils.quantized_block import (
+    COMPACT_STORAGE, block_values, decode_frame, encode, is_quantized, quantized_columns, quantized_matmul
+)
+
+
+class PlayerNotFoundError(ValueError):
+    """Raised when a player name or id is not in the dataset (a ValueError, so existing handlers still apply)"""
+
 
 def load_player_data(csv_path: str) -> pd.DataFrame:
     """
@@ -28,18 +42,15 @@ def load_player_data(csv_path: str) -> pd.DataFrame:
     return df
 
 
-def load_all_league_data(data_folder: str) -> pd.DataFrame:
+def get_league_files(data_folder: str) -> List[str]:
     """
-    Load all CSV files from data folder and combine into single DataFrame
+    List the league CSV files of a data folder
 
     Args:
-        data_folder: Path to the folder containing CSV files
+        data_folder: Path to the folder containing the def/mid/fwd subfolders
 
     Returns:
-        Combined DataFrame with all players from all leagues
-
-    Raises:
-        ValueError: If no valid CSV files found or all files failed to load
+        CSV file paths (empty if there are none)
     """
     subfolders = ["def", "mid", "fwd"]
     # Use glob to find all CSV files
@@ -49,6 +60,49 @@ def load_all_league_data(data_folder: str) -> pd.DataFrame:
         csv_files.extend(
             glob.glob(os.path.join(data_folder, sub, "*.csv"))
         )
+    return csv_files
+
+
+def load_league_file(csv_path: str) -> pd.DataFrame:
+    """
+    Load one league CSV file and check its schema
+
+    Args:
+        csv_path: Path to the CSV file
+
+    Returns:
+        DataFrame with player statistics
+
+    Raises:
+        ValueError: If required columns are missing
+    """
+    # Use existing load_player_data() function
+    df = load_player_data(csv_path)
+
+    # Validate schema (required columns must exist)
+    required_cols = ['Player', 'Age', 'League', 'Position', 'Team', 'Birth country']
+    missing_cols = [col for col in required_cols if col not in df.columns]
+
+    if missing_cols:
+        raise ValueError(f"Missing columns {missing_cols}")
+
+    return df
+
+
+def load_all_league_data(data_folder: str) -> pd.DataFrame:
+    """
+    Load all CSV files from data folder and combine into single DataFrame
+
+    Args:
+        data_folder: Path to the folder containing CSV files
+
+    Returns:
+        Combined DataFrame with all players from all leagues
+
+    Raises:
+        ValueError: If no valid CSV files found or all files failed to load
+    """
+    csv_files = get_league_files(data_folder)
 
     # Handle empty folder
     if not csv_files:
@@ -60,18 +114,7 @@ def load_all_league_data(data_folder: str) -> pd.DataFrame:
     # Iterate through files, catch errors, continue on failure
     for csv_path in csv_files:
         try:
-            # Use existing load_player_data() function
-            df = load_player_data(csv_path)
-
-            # Validate schema (required columns must exist)
-            required_cols = ['Player', 'Age', 'League', 'Position', 'Team', 'Birth country']
-            missing_cols = [col for col in required_cols if col not in df.columns]
-
-            if missing_cols:
-                errors.append(f"{os.path.basename(csv_path)}: Missing columns {missing_cols}")
-                continue  # Skip this file
-
-            all_dataframes.append(df)
+            all_dataframes.append(load_league_file(csv_path))
 
         except Exception as e:
             errors.append(f"{os.path.basename(csv_path)}: {str(e)}")
@@ -88,6 +131,9 @@ def load_all_league_data(data_folder: str) -> pd.DataFrame:
     # Combine with ignore_index=True to reset row numbers
     combined_df = pd.concat(all_dataframes, ignore_index=True)
 
+    # Stamp dataset version so caches built on this data can be shared and invalidated
+    combined_df.attrs[DATASET_VERSION_ATTR] = compute_file_version(csv_files)
+
     return combined_df
 
 
@@ -115,38 +161,63 @@ def get_distinct_values(df: pd.DataFrame) -> Dict:
     }
 
 
-def filter_players(df: pd.DataFrame, positions: List[str] = None, leagues: List[str] = None) -> pd.DataFrame:
+@instrument('filter_players')
+def filter_players(df: pd.DataFrame, positions: List[str] = None, leagues: List[str] = None,
+                   expression: str = None, seasons: List[str] = None) -> pd.DataFrame:
     """
-    Filter DataFrame by positions and leagues
+    Filter DataFrame by positions, leagues, seasons and an optional filter expression
 
     Args:
         df: DataFrame with all players
         positions: List of positions to include (None or empty = all positions)
         leagues: List of leagues to include (None or empty = all leagues)
+        expression: Filter expression, e.g. 'League in ("Liga 1","J1") and Age < 25'
+            (see utils/filter_dsl.py)
+        seasons: List of seasons to include (None or empty = all seasons); needs
+            the 'Season' column of frames read from the season store
 
     Returns:
         Filtered DataFrame
+
+    Raises:
+        ValueError: If the filter expression is invalid, or seasons are given
+            for a frame without a 'Season' column
     """
-    # Work on copy to avoid mutation
-    filtered_df = df.copy()
+    # Apply expression first: one vectorized pass over the cached columns
+    if expression:
+        df = apply_filter_expression(df, expression)
+
+    if seasons and 'Season' not in df.columns:
+        raise ValueError("Season filter needs a 'Season' column (load the data from the season store)")
 
-    # Apply position filter if specified
-    if positions and len(positions) > 0:
-        #filtered_df = filtered_df[filtered_df['Position'].isin(positions)]
-        filtered_df = filtered_df[
-            filtered_df['Position']
-            .str.split(',')
-            .apply(lambda pos_list: any(p.strip() in positions for p in pos_list))
-        ]
-        
+    mask = None
+    if (positions and len(positions) > 0) or (leagues and len(leagues) > 0) or (seasons and len(seasons) > 0):
+        # Position and league lookups use the key indexes built once per dataset version
+        store = get_column_store(df)
+        rows = store.positions(df)
 
-    # Apply league filter if specified
-    if leagues and len(leagues) > 0:
-        filtered_df = filtered_df[filtered_df['League'].isin(leagues)]
+        # Apply position filter if specified (any listed position matches)
+        if positions and len(positions) > 0:
+            position_index = store.artifact('position_index', _get_position_index)
+            mask = position_index.mask(positions, store.n_rows)[rows]
 
-    return filtered_df
+        # Apply league filter if specified
+        if leagues and len(leagues) > 0:
+            league_mask = store.artifact('league_index', _get_league_index).mask(leagues, store.n_rows)[rows]
+            mask = league_mask if mask is None else mask & league_mask
 
+        # Apply season filter if specified
+        if seasons and len(seasons) > 0:
+            season_mask = store.artifact('season_index', _get_season_index).mask(seasons, store.n_rows)[rows]
+            mask = season_mask if mask is None else mask & season_mask
 
+    # Work on copy to avoid mutation (lazy under copy-on-write)
+    if mask is None:
+        return copy_frame(df)
+    return df[mask]
+
+
+@instrument('load_data')
 def prepare_data_global(data_folder: str, stat_categories: Dict) -> pd.DataFrame:
     """
     Load all league data and calculate GLOBAL percentiles across all players
@@ -159,48 +230,198 @@ def prepare_data_global(data_folder: str, stat_categories: Dict) -> pd.DataFrame
     Returns:
         DataFrame with all players, global percentile calculations, and composite attributes
     """
-    from config.composite_attributes import COMPOSITE_ATTRIBUTES
-
     # Load all data
     df = load_all_league_data(data_folder)
 
+    return prepare_loaded_data(df, stat_categories)
+
+
+def prepare_loaded_data(df: pd.DataFrame, stat_categories: Dict, rank_cohorts: bool = True,
+                        sketches: Dict = None, compact: bool = None) -> pd.DataFrame:
+    """
+    Calculate percentiles and composite attributes of loaded league data
+
+    Args:
+        df: Combined DataFrame from load_all_league_data (or a subset of its files)
+        stat_categories: Dictionary of stat categories
+        rank_cohorts: Also rank every cohort and build the percentile lookup now
+            (otherwise they are built on first use)
+        sketches: Merged quantile sketches of all shards (see utils/quantile_sketch.py);
+            when given, ``df`` is one shard and its percentiles are global estimates
+        compact: Store percentiles and composites as uint16 fixed-point codes
+            (see utils/quantized_block.py; default: SCOUTING_COMPACT_PERCENTILES)
+
+    Returns:
+        DataFrame with percentile calculations and composite attributes
+    """
+    from config.composite_attributes import COMPOSITE_ATTRIBUTES
+
+    if compact is None:
+        compact = COMPACT_STORAGE
+
     # Get all stat columns
     stat_columns = get_all_stat_columns(stat_categories)
 
     # Calculate GLOBAL percentiles (across ALL players from ALL leagues)
-    df = calculate_percentiles(df, stat_columns)
+    df = calculate_percentiles(df, stat_columns, sketches=sketches, compact=compact)
 
-    # Calculate composite attributes for all players
+    # Calculate composite attributes for all players (stored like the percentiles)
     df = calculate_composite_attributes_batch(df, stat_columns, COMPOSITE_ATTRIBUTES)
 
+    # Register column store (sorted indexes etc. are built lazily once per version)
+    register_dataset(df)
+
+    if not rank_cohorts:
+        return df
+
+    # Rank every cohort (league, position group, league x position group) once
+    get_cohort_percentiles(df, stat_columns)
+
+    # Sorted value arrays for ranking hypothetical players against the global pool
+    get_percentile_lookup(df, stat_columns)
+
     return df
 
 
-def calculate_percentiles(df: pd.DataFrame, stat_columns: List[str]) -> pd.DataFrame:
+def append_players(df: pd.DataFrame, new_players: pd.DataFrame, stat_categories: Dict) -> pd.DataFrame:
+    """
+    Append players to a prepared dataset without re-ranking it from scratch
+
+    Global percentiles are updated through an IncrementalPercentiles kept with
+    the dataset (see utils/incremental_percentiles.py) and composites are
+    recomputed from them, so the result equals prepare_loaded_data over the
+    combined rows. Cohort percentiles are ranked again on first use.
+
+    Args:
+        df: Global frame from prepare_data_global (or a previous append_players)
+        new_players: Raw rows with the league CSV columns
+        stat_categories: Dictionary of stat categories
+
+    Returns:
+        New global DataFrame: ``df``'s rows followed by the new ones
+
+    Raises:
+        ValueError: If ``df`` is not a registered global frame (e.g. a filtered one)
+            or required columns are missing
+    """
+    import hashlib
+    from config.composite_attributes import COMPOSITE_ATTRIBUTES
+    from utils.incremental_percentiles import IncrementalPercentiles
+
+    required_cols = ['Player', 'Age', 'League', 'Position', 'Team', 'Birth country']
+    missing_cols = [col for col in required_cols if col not in new_players.columns]
+    if missing_cols:
+        raise ValueError(f"Missing columns {missing_cols}")
+
+    # Derived stores cover filtered frames whose global store is not registered
+    store = get_column_store(df)
+    if store.df is not df or store.version != store.dataset_version:
+        raise ValueError("Players can only be appended to the registered global frame, not a filtered one")
+
+    stat_columns = get_all_stat_columns(stat_categories)
+    present = [col for col in dict.fromkeys(stat_columns) if col in df.columns]
+    incremental = store.artifact('incremental_percentiles', lambda s: IncrementalPercentiles.from_sorted_indexes(
+        present, [s.sorted_index(col) for col in present]
+    ))
+    new_values = new_players.reindex(columns=present).apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+    incremental = incremental.append(new_values)
+
+    # Raw columns of both frames, then the percentile block and composites as in prepare_loaded_data
+    derived_cols = [col for col in df.columns if col.endswith('_percentile') or col.startswith('COMP_')]
+    combined = pd.concat([df.drop(columns=derived_cols), new_players], ignore_index=True)
+    percentiles = incremental.percentiles()
+    if quantized_columns(df):
+        percentiles = encode(percentiles)
+    percentile_df = pd.DataFrame(percentiles, index=combined.index,
+                                 columns=[f"{col}_percentile" for col in present], copy=False)
+    combined = _attach_block(combined, percentile_df)
+    combined = calculate_composite_attributes_batch(combined, stat_columns, COMPOSITE_ATTRIBUTES)
+
+    digest = hashlib.sha1(store.version.encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(new_players, index=False).to_numpy().tobytes())
+    combined.attrs[DATASET_VERSION_ATTR] = digest.hexdigest()[:16]
+
+    # The updated ranks carry over, so the next append is incremental too
+    register_dataset(combined).artifact('incremental_percentiles', lambda s: incremental)
+    return combined
+
+
+def calculate_percentiles(df: pd.DataFrame, stat_columns: List[str], sketches: Dict = None,
+                          compact: bool = False) -> pd.DataFrame:
     """
     Calculate percentile ranks for specified statistics
 
+    All stat columns are ranked in one operation over a 2D array and the
+    ``_percentile`` block is attached in a single step. The input frame is not
+    copied: the returned frame shares its existing columns.
+
     Args:
         df: DataFrame with player data
         stat_columns: List of column names to calculate percentiles for
+        sketches: Dictionary of {column: QuantileSketch} merged from every shard
+            (see utils/quantile_sketch.py). Rows are then ranked against the
+            sketched global distribution instead of against ``df`` alone;
+            columns without a sketch are ranked exactly within ``df``
+        compact: Store the percentiles as uint16 fixed-point codes
+            (see utils/quantized_block.py)
 
     Returns:
         DataFrame with original data plus percentile columns
     """
-    df_copy = df.copy()
-
-    for col in stat_columns:
-        if col in df_copy.columns:
-            # Calculate percentile rank (0-100)
-            percentile_col = f"{col}_percentile"
-            df_copy[percentile_col] = df_copy[col].rank(pct=True) * 100
+    present = []
+    for col in dict.fromkeys(stat_columns):
+        if col in df.columns:
+            present.append(col)
         else:
             print(f"Warning: Column '{col}' not found in data")
 
-    return df_copy
+    percentile_cols = [f"{col}_percentile" for col in present]
+
+    # Rank every stat column in one pass over a 2D array (percentile rank 0-100)
+    values = df[present].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+    sketched = [i for i, col in enumerate(present) if sketches and col in sketches]
+    if not sketched:
+        ranks = pd.DataFrame(values, copy=False).rank(pct=True).to_numpy() * 100
+    else:
+        # Sharded preprocessing: global estimates from the merged sketches
+        ranks = np.empty_like(values)
+        for i in sketched:
+            ranks[:, i] = sketches[present[i]].percentiles(values[:, i])
+        exact = [i for i in range(len(present)) if i not in set(sketched)]
+        if exact:
+            ranks[:, exact] = pd.DataFrame(values[:, exact]).rank(pct=True).to_numpy() * 100
+
+    if compact:
+        ranks = encode(ranks)
+    percentile_df = pd.DataFrame(ranks, index=df.index, columns=percentile_cols, copy=False)
+
+    # Recalculation replaces stale percentile columns
+    stale_cols = [col for col in percentile_cols if col in df.columns]
+    if stale_cols:
+        df = df.drop(columns=stale_cols)
 
+    return _attach_block(df, percentile_df)
 
-def get_player_stats(df: pd.DataFrame, player_name: str, stat_columns: List[str]) -> Dict:
+
+def _attach_block(df: pd.DataFrame, block_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Attach a block of new columns without copying the existing ones
+
+    Args:
+        df: DataFrame to extend
+        block_df: New columns (same index as ``df``)
+
+    Returns:
+        New DataFrame sharing the memory of both inputs
+    """
+    attrs = dict(df.attrs)
+    combined = pd.concat([df, block_df], axis=1, copy=False)
+    combined.attrs.update(attrs)
+    return combined
+
+
+def get_player_stats(df: pd.DataFrame, player_name: str, stat_columns: List[str],
+                     cohort: str = 'global') -> Dict:
     """
     Get statistics for a specific player
 
@@ -208,23 +429,112 @@ def get_player_stats(df: pd.DataFrame, player_name: str, stat_columns: List[str]
         df: DataFrame with player data and percentiles
         player_name: Name of the player
         stat_columns: List of stat columns to retrieve
+        cohort: Percentile cohort key from config/cohorts.py (default: global)
 
     Returns:
         Dictionary with player stats and percentiles
     """
-    player_row = df[df['Player'] == player_name].iloc[0]
+    player_row = decode_frame(df[df['Player'] == player_name].iloc[:1]).iloc[0]
+
+    # Cohort percentiles come from the precomputed float32 blocks
+    cohort_percentiles = None
+    if cohort != 'global':
+        store = get_column_store(df)
+        cohort_percentiles = get_cohort_percentiles(df, stat_columns).row(
+            cohort, store.position_of(player_row.name)
+        )
 
     stats = {}
     for col in stat_columns:
         percentile_col = f"{col}_percentile"
+        if cohort_percentiles is not None:
+            percentile = cohort_percentiles.get(col, 0)
+        else:
+            percentile = player_row.get(percentile_col, 0)
         stats[col] = {
             'value': player_row[col],
-            'percentile': player_row.get(percentile_col, 0)
+            'percentile': percentile
+        }
+
+    return stats
+
+
+def get_hypothetical_player_stats(df: pd.DataFrame, raw_stats: Dict, stat_columns: List[str],
+                                  cohort: str = 'global', league: str = None,
+                                  position: str = None) -> Dict:
+    """
+    Get percentiles for a stat line that is not part of the dataset
+
+    Each value is placed by binary search in the cohort's sorted values, so the
+    dataset is neither extended nor re-ranked. The result has the same shape as
+    get_player_stats and can be passed to calculate_composite_attributes.
+
+    Args:
+        df: DataFrame with player data (global or filtered)
+        raw_stats: Dictionary of {stat_column: raw value}
+        stat_columns: List of stat columns the dataset was ranked on
+        cohort: Percentile cohort key from config/cohorts.py (default: global)
+        league: League of the player (needed by league cohorts)
+        position: Position of the player (needed by position group cohorts)
+
+    Returns:
+        Dictionary with player stats and percentiles (stats missing from
+        ``raw_stats`` are left out)
+
+    Raises:
+        ValueError: If a stat is unknown or the player's cohort group is empty
+    """
+    unknown = [col for col in raw_stats if col not in stat_columns]
+    if unknown:
+        raise ValueError(f"Unknown stat column(s): {unknown}")
+
+    lookup = get_percentile_lookup(df, stat_columns, cohort)
+    group = lookup.group_code(league=league, position=position)
+
+    stats = {}
+    for col in stat_columns:
+        if col not in raw_stats or col not in lookup.sorted_values:
+            continue
+        value = float(raw_stats[col])
+        stats[col] = {
+            'value': value,
+            'percentile': lookup.percentile(col, value, group)
         }
 
     return stats
 
 
+def get_hypothetical_player_profile(df: pd.DataFrame, raw_stats: Dict, stat_columns: List[str],
+                                    composite_attributes: Dict, cohort: str = 'global', league: str = None,
+                                    position: str = None) -> Dict:
+    """
+    Get percentiles and composite scores for a stat line that is not part of the dataset
+
+    Args:
+        df: DataFrame with player data (global or filtered)
+        raw_stats: Dictionary of {stat_column: raw value}
+        stat_columns: List of stat columns the dataset was ranked on
+        composite_attributes: Dictionary defining composite attribute formulas
+        cohort: Percentile cohort key from config/cohorts.py (default: global)
+        league: League of the player (needed by league cohorts)
+        position: Position of the player (needed by position group cohorts)
+
+    Returns:
+        Dictionary with 'stats' (as get_hypothetical_player_stats) and
+        'composite_attributes' (as calculate_composite_attributes, so missing
+        stats count as the 50th percentile)
+
+    Raises:
+        ValueError: If a stat is unknown or the player's cohort group is empty
+    """
+    stats = get_hypothetical_player_stats(df, raw_stats, stat_columns, cohort=cohort, league=league,
+                                          position=position)
+    return {
+        'stats': stats,
+        'composite_attributes': calculate_composite_attributes(stats, composite_attributes)
+    }
+
+
 def filter_midfielders(df: pd.DataFrame) -> pd.DataFrame:
     """
     Filter dataframe to include only DM/CM players (no CAM)
@@ -292,7 +602,7 @@ def prepare_data(csv_path: str, stat_categories: Dict) -> pd.DataFrame:
 
 def get_player_info(df: pd.DataFrame, player_name: str, info_columns: Dict) -> Dict:
     """
-    Get player information (name, age, team, country)
+    Get player information (name, age, team, country) and the player's row id
 
     Args:
         df: DataFrame with player data
@@ -305,6 +615,7 @@ def get_player_info(df: pd.DataFrame, player_name: str, info_columns: Dict) -> D
     player_row = df[df[info_columns['name']] == player_name].iloc[0]
 
     info = {
+        'id': player_row.name,
         'name': player_row[info_columns['name']],
         'age': int(player_row[info_columns['age']]),
         'team': player_row[info_columns['team']],
@@ -315,6 +626,103 @@ def get_player_info(df: pd.DataFrame, player_name: str, info_columns: Dict) -> D
     return info
 
 
+def _get_player_name_index(store) -> KeyIndex:
+    """Row positions of every player name in the stored frame"""
+    return KeyIndex.from_values(store.column('Player'))
+
+
+def _get_league_index(store) -> KeyIndex:
+    """Row positions of every league in the stored frame"""
+    return KeyIndex.from_values(store.column('League'))
+
+
+def _get_season_index(store) -> KeyIndex:
+    """Row positions of every season in the stored frame"""
+    return KeyIndex.from_values(store.column('Season'))
+
+
+def _get_position_index(store) -> KeyIndex:
+    """Row positions of every single position ("CB, LCB" is indexed under both)"""
+    return KeyIndex.from_values(store.column('Position'), separator=',')
+
+
+def get_player_profile(df: pd.DataFrame, player_name: str, stat_columns: List[str],
+                       info_columns: Dict, composite_attributes: Dict,
+                       cohort: str = 'global') -> Dict:
+    """
+    Get a player's info, stat percentiles and composite scores in one lookup
+
+    Reads the precomputed ``_percentile`` and ``COMP_*`` columns (or the
+    cohort's precomputed blocks) instead of recalculating composites, so the
+    result matches calculate_composite_attributes_batch.
+
+    Args:
+        df: DataFrame with player data, percentiles and composite attributes
+        player_name: Name of the player (first match in ``df``, as in get_player_stats)
+        stat_columns: List of stat columns to retrieve
+        info_columns: Dictionary mapping info types to column names
+        composite_attributes: Dictionary defining composite attribute formulas
+        cohort: Percentile cohort key from config/cohorts.py (default: global)
+
+    Returns:
+        Dictionary with 'info', 'stats' and 'composite_attributes' (same shapes
+        as get_player_info, get_player_stats and calculate_composite_attributes)
+
+    Raises:
+        ValueError: If the player is not in ``df``
+    """
+    store = get_column_store(df)
+    name_index = store.artifact('player_name_index', _get_player_name_index)
+
+    positions = name_index.get(player_name, np.empty(0, dtype=np.int64))
+    labels = store.index[np.sort(positions)]
+    labels = labels[labels.isin(df.index)] if df is not store.df else labels
+    if len(labels) == 0:
+        raise PlayerNotFoundError(f"Player '{player_name}' not found")
+
+    player_df = decode_frame(df.loc[labels[:1]])
+    player_row = player_df.iloc[0]
+
+    info = {
+        'id': player_row.name,
+        'name': player_row[info_columns['name']],
+        'age': int(player_row[info_columns['age']]),
+        'team': player_row[info_columns['team']],
+        'country': player_row[info_columns['country']],
+        'position': player_row[info_columns['position']]
+    }
+
+    # Cohort percentiles and composites come from the precomputed blocks
+    if cohort != 'global':
+        percentiles = get_cohort_percentiles(df, stat_columns).row(cohort, store.position_of(player_row.name))
+        composite_row = get_cohort_composites(player_df, stat_columns, cohort, composite_attributes).iloc[0]
+    else:
+        percentiles = {col: player_row.get(f"{col}_percentile", 0) for col in stat_columns}
+        composite_row = player_row
+
+    stats = {}
+    for col in stat_columns:
+        stats[col] = {
+            'value': player_row[col],
+            'percentile': percentiles.get(col, 0)
+        }
+
+    composite_scores = {}
+    for attr_key, attr_config in composite_attributes.items():
+        composite_scores[attr_key] = {
+            'score': float(composite_row[f"COMP_{attr_key}"]),
+            'display_name': attr_config['display_name'],
+            'icon': attr_config.get('icon', ''),
+            'description': attr_config.get('description', '')
+        }
+
+    return {
+        'info': info,
+        'stats': stats,
+        'composite_attributes': composite_scores
+    }
+
+
 def calculate_composite_attributes(player_stats: Dict, composite_attributes: Dict) -> Dict:
     """
     Calculate composite attributes for a player based on weighted stat combinations
@@ -367,6 +775,11 @@ def calculate_composite_attributes_batch(df: pd.DataFrame, stat_columns: List[st
     """
     Calculate composite attributes for all players in DataFrame
 
+    Scores are one matrix product over the percentile (or raw) columns, attached
+    as a single block without copying the input frame. When the percentiles are
+    stored as fixed-point codes, the product runs over the codes and the
+    composites are stored the same way.
+
     Args:
         df: DataFrame with player data and percentile columns
         stat_columns: List of all stat column names
@@ -375,47 +788,75 @@ def calculate_composite_attributes_batch(df: pd.DataFrame, stat_columns: List[st
     Returns:
         DataFrame with added composite attribute columns (prefixed with COMP_)
     """
-    df_copy = df.copy()
+    weights, offsets, source_cols, fill_values = get_composite_weights(
+        list(df.columns), composite_attributes
+    )
 
-    # For each composite attribute
-    for attr_key, attr_config in composite_attributes.items():
-        scores = []
-
-        # Calculate for each player
-        for idx, row in df_copy.iterrows():
-            score = 0.0
-            total_weight = 0.0
-
-            for component in attr_config['components']:
-                stat_name = component['stat']
-                weight = component['weight']
-                use_percentile = component.get('use_percentile', True)
-
-                # Skip if stat not available
-                if stat_name not in df_copy.columns:
-                    continue
-
-                if use_percentile:
-                    # Use percentile column
-                    percentile_col = f"{stat_name}_percentile"
-                    if percentile_col in df_copy.columns:
-                        value = row.get(percentile_col, 50)
-                    else:
-                        value = 50
-                else:
-                    # Use raw value
-                    value = row.get(stat_name, 0)
-
-                # Handle NaN
-                if pd.isna(value):
-                    value = 50 if use_percentile else 0
-
-                score += weight * value
-                total_weight += abs(weight)
-
-            scores.append(score)
-
-        # Add composite attribute column to DataFrame
-        df_copy[f"COMP_{attr_key}"] = scores
-
-    return df_copy
\ No newline at end of file
+    # Missing values count as 50th percentile (or 0 for raw values)
+    compact = bool(source_cols) and all(is_quantized(df, col) for col in source_cols)
+    if compact:
+        scores = encode(quantized_matmul(df[source_cols].to_numpy(), weights, fill_values) + offsets)
+    else:
+        values = block_values(df, source_cols)
+        values = np.where(np.isnan(values), fill_values, values)
+        scores = values @ weights + offsets
+
+    comp_cols = [f"COMP_{attr_key}" for attr_key in composite_attributes]
+    comp_df = pd.DataFrame(scores, index=df.index, columns=comp_cols, copy=False)
+
+    stale_cols = [col for col in comp_cols if col in df.columns]
+    if stale_cols:
+        df = df.drop(columns=stale_cols)
+
+    return _attach_block(df, comp_df)
+
+
+def get_composite_weights(columns: List[str], composite_attributes: Dict):
+    """
+    Build the weight matrix turning source columns into composite scores
+
+    Components whose stat is missing from the data are skipped; percentile
+    components without a ``_percentile`` column count as 50.
+
+    Args:
+        columns: Columns available in the DataFrame
+        composite_attributes: Dictionary defining composite attribute formulas
+
+    Returns:
+        (weights, offsets, source_cols, fill_values) where
+        ``scores = filled(df[source_cols]) @ weights + offsets`` and NaN source
+        values are replaced by ``fill_values``
+    """
+    available = set(columns)
+    source_cols = []
+    fill_values = []
+    source_index = {}
+    entries = []
+    offsets = np.zeros(len(composite_attributes))
+
+    for j, attr_config in enumerate(composite_attributes.values()):
+        for component in attr_config['components']:
+            stat_name = component['stat']
+            weight = component['weight']
+            use_percentile = component.get('use_percentile', True)
+
+            # Skip if stat not available
+            if stat_name not in available:
+                continue
+
+            source = f"{stat_name}_percentile" if use_percentile else stat_name
+            if source not in available:
+                offsets[j] += weight * 50
+                continue
+
+            if source not in source_index:
+                source_index[source] = len(source_cols)
+                source_cols.append(source)
+                fill_values.append(50.0 if use_percentile else 0.0)
+            entries.append((source_index[source], j, weight))
+
+    weights = np.zeros((len(source_cols), len(composite_attributes)))
+    for i, j, weight in entries:
+        weights[i, j] += weight
+
+    return weights, offsets, source_cols, np.array(fill_values)
@@ -0,0 +1,372 @@
+"""
+Compact filter expression language compiled to numpy masks
+
+Example:
+    League in ("Liga 1", "J1") and Age < 25 and "PAdj Interceptions_percentile" > 70
+
+Grammar:
+    expr       := and_expr ("or" and_expr)*
+    and_expr   := not_expr ("and" not_expr)*
+    not_expr   := "not" not_expr | "(" expr ")" | comparison
+    comparison := column op literal | column ["not"] "in" "(" literal ("," literal)* ")"
+    column     := identifier | "quoted column name"
+    op         := < | <= | > | >= | == | = | !=
+
+Comparisons with NaN are False (same as pandas boolean filtering).
+
+Besides the mask, every expression compiles to a pruning test over per-partition
+statistics (numeric min/max, distinct labels), so partitioned stores can skip
+partitions that cannot contain a matching row.
+"""
+import re
+import threading
+import weakref
+from functools import lru_cache
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.column_store import get_column_store
+from utils.quantized_block import column_values
+
+# (column name, numeric) -> array with one value per row
+ColumnGetter = Callable[[str, bool], np.ndarray]
+MaskFunction = Callable[[ColumnGetter], np.ndarray]
+
+# Partition statistics ({column: {'min', 'max'} or {'values'}}) -> could any row match
+PruneFunction = Callable[[Dict], bool]
+
+_TOKEN_PATTERN = re.compile(r'''
+    \s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<number>[-+]?\d+(?:\.\d+)?)
+      | (?P<op><=|>=|==|!=|<|>|=)
+      | (?P<punct>[(),])
+      | (?P<ident>[A-Za-z_][A-Za-z0-9_]*)
+    )''', re.VERBOSE)
+
+_KEYWORDS = {'and', 'or', 'not', 'in'}
+
+
+def _tokenize(expression: str) -> List[Tuple[str, object]]:
+    """Split an expression into (kind, value) tokens"""
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+
+    while position < len(expression):
+        match = _TOKEN_PATTERN.match(expression, position)
+        if not match or match.end() == position:
+            raise ValueError(f"Unexpected character at position {position}: '{expression[position:position + 10]}'")
+        position = match.end()
+
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == 'string':
+            tokens.append(('string', re.sub(r'\\(.)', r'\1', text[1:-1])))
+        elif kind == 'number':
+            tokens.append(('number', float(text)))
+        elif kind == 'ident' and text.lower() in _KEYWORDS:
+            tokens.append(('keyword', text.lower()))
+        else:
+            tokens.append((kind, text))
+
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser producing mask closures"""
+
+    def __init__(self, expression: str):
+        self.tokens = _tokenize(expression)
+        self.position = 0
+        self.columns: List[str] = []
+
+    def _peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def _next(self):
+        token = self._peek()
+        if token[0] is None:
+            raise ValueError("Unexpected end of expression")
+        self.position += 1
+        return token
+
+    def _expect(self, kind: str, value=None):
+        token = self._next()
+        if token[0] != kind or (value is not None and token[1] != value):
+            raise ValueError(f"Expected '{value or kind}' but found '{token[1]}'")
+        return token
+
+    def parse(self) -> Tuple[MaskFunction, PruneFunction]:
+        fn, prune = self._parse_or()
+        if self._peek()[0] is not None:
+            raise ValueError(f"Unexpected token '{self._peek()[1]}'")
+        return fn, prune
+
+    def _parse_or(self) -> Tuple[MaskFunction, PruneFunction]:
+        parts = [self._parse_and()]
+        while self._peek() == ('keyword', 'or'):
+            self._next()
+            parts.append(self._parse_and())
+        if len(parts) == 1:
+            return parts[0]
+        return (lambda get: np.logical_or.reduce([part(get) for part, _ in parts]),
+                lambda stats: any(prune(stats) for _, prune in parts))
+
+    def _parse_and(self) -> Tuple[MaskFunction, PruneFunction]:
+        parts = [self._parse_not()]
+        while self._peek() == ('keyword', 'and'):
+            self._next()
+            parts.append(self._parse_not())
+        if len(parts) == 1:
+            return parts[0]
+        return (lambda get: np.logical_and.reduce([part(get) for part, _ in parts]),
+                lambda stats: all(prune(stats) for _, prune in parts))
+
+    def _parse_not(self) -> Tuple[MaskFunction, PruneFunction]:
+        token = self._peek()
+        if token == ('keyword', 'not'):
+            self._next()
+            inner, _ = self._parse_not()
+            # Negations are never used to skip partitions
+            return lambda get: ~inner(get), lambda stats: True
+        if token == ('punct', '('):
+            self._next()
+            inner = self._parse_or()
+            self._expect('punct', ')')
+            return inner
+        return self._parse_comparison()
+
+    def _parse_literal(self):
+        kind, value = self._next()
+        if kind not in ('number', 'string'):
+            raise ValueError(f"Expected a number or string but found '{value}'")
+        return value
+
+    def _parse_comparison(self) -> Tuple[MaskFunction, PruneFunction]:
+        kind, column = self._next()
+        if kind not in ('ident', 'string'):
+            raise ValueError(f"Expected a column name but found '{column}'")
+        self.columns.append(column)
+
+        negate = False
+        if self._peek() == ('keyword', 'not'):
+            self._next()
+            negate = True
+            if self._peek() != ('keyword', 'in'):
+                raise ValueError("Expected 'in' after 'not'")
+
+        if self._peek() == ('keyword', 'in'):
+            self._next()
+            self._expect('punct', '(')
+            values = [self._parse_literal()]
+            while self._peek() == ('punct', ','):
+                self._next()
+                values.append(self._parse_literal())
+            self._expect('punct', ')')
+            return _membership(column, values, negate)
+
+        kind, op = self._next()
+        if kind != 'op':
+            raise ValueError(f"Expected a comparison operator after '{column}' but found '{op}'")
+        return _comparison(column, '==' if op == '=' else op, self._parse_literal())
+
+
+def _may_contain(stats: Dict, column: str, value) -> bool:
+    """Check whether partition statistics allow a column value"""
+    column_stats = stats.get(column)
+    if column_stats is None:
+        return True
+    if 'values' in column_stats:
+        return value in column_stats['values']
+    if isinstance(value, float) and 'min' in column_stats:
+        # All-NaN columns have no min/max and match no comparison
+        low, high = column_stats['min'], column_stats['max']
+        return low is not None and low <= value <= high
+    return True
+
+
+def _membership(column: str, values: list, negate: bool) -> Tuple[MaskFunction, PruneFunction]:
+    """Build mask (and pruning test) for ``column [not] in (values)``"""
+    numeric = all(isinstance(v, float) for v in values)
+
+    def fn(get: ColumnGetter) -> np.ndarray:
+        if numeric:
+            mask = np.isin(get(column, True), values)
+        else:
+            mask = pd.Series(get(column, False), copy=False).isin(values).to_numpy()
+        return ~mask if negate else mask
+
+    def prune(stats: Dict) -> bool:
+        return negate or any(_may_contain(stats, column, value) for value in values)
+
+    return fn, prune
+
+
+def _comparison(column: str, op: str, value) -> Tuple[MaskFunction, PruneFunction]:
+    """Build mask (and pruning test) for ``column op value``"""
+    numeric = isinstance(value, float)
+    if not numeric and op not in ('==', '!='):
+        raise ValueError(f"Operator '{op}' requires a number (got \"{value}\")")
+
+    def fn(get: ColumnGetter) -> np.ndarray:
+        values = get(column, numeric)
+        with np.errstate(invalid='ignore'):
+            if op == '<':
+                return values < value
+            if op == '<=':
+                return values <= value
+            if op == '>':
+                return values > value
+            if op == '>=':
+                return values >= value
+            if op == '==':
+                return np.asarray(values == value, dtype=bool)
+            # NaN != value is True in pandas as well
+            return np.asarray(values != value, dtype=bool)
+
+    def prune(stats: Dict) -> bool:
+        if op == '!=':
+            return True
+        if op == '==':
+            return _may_contain(stats, column, value)
+        column_stats = stats.get(column)
+        if column_stats is None or 'min' not in column_stats:
+            return True
+        low, high = column_stats['min'], column_stats['max']
+        if low is None:
+            return False
+        if op == '<':
+            return low < value
+        if op == '<=':
+            return low <= value
+        if op == '>':
+            return high > value
+        return high >= value
+
+    return fn, prune
+
+
+class CompiledFilter:
+    """
+    Filter expression compiled to a vectorized mask function
+    """
+
+    def __init__(self, expression: str):
+        """
+        Args:
+            expression: Filter expression text
+
+        Raises:
+            ValueError: If the expression cannot be parsed
+        """
+        parser = _Parser(expression)
+        self.expression = expression
+        self._fn, self._prune = parser.parse()
+        self.columns = list(dict.fromkeys(parser.columns))
+        # Mask over every stored row per ColumnStore; lives only as long as this
+        # compiled filter (compile_filter's LRU) and the store itself
+        self._masks = weakref.WeakKeyDictionary()
+        self._masks_lock = threading.Lock()
+
+    def may_match(self, stats: Dict) -> bool:
+        """
+        Check whether a partition could contain matching rows
+
+        Args:
+            stats: Partition statistics: {column: {'min': x, 'max': y}} for numeric
+                columns (None for all-NaN) and {column: {'values': [...]}} for labels;
+                columns without statistics are assumed to match
+
+        Returns:
+            False only if no row of the partition can match
+        """
+        return self._prune(stats)
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Evaluate the filter on a DataFrame
+
+        The mask over the whole dataset is computed once per dataset version from
+        the cached store columns and kept while this compiled filter is cached;
+        filtered frames take their rows from it.
+
+        Args:
+            df: Global or filtered player DataFrame
+
+        Returns:
+            Boolean array aligned with the rows of ``df``
+
+        Raises:
+            ValueError: If a referenced column does not exist
+        """
+        missing = [col for col in self.columns if col not in df.columns]
+        if missing:
+            raise ValueError(f"Column(s) not found: {missing}")
+
+        store = get_column_store(df)
+        if all(store.has_column(col) for col in self.columns):
+            with self._masks_lock:
+                full_mask = self._masks.get(store)
+            if full_mask is None:
+                full_mask = self._fn(
+                    lambda name, numeric: store.numeric_column(name) if numeric else store.column(name)
+                )
+                with self._masks_lock:
+                    self._masks[store] = full_mask
+            return full_mask[store.positions(df)]
+
+        # Columns added after loading (e.g. scores) are read from the frame itself
+        def get_frame_column(name: str, numeric: bool) -> np.ndarray:
+            if numeric:
+                return column_values(df, name)
+            return df[name].to_numpy()
+
+        return self._fn(get_frame_column)
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Filter a DataFrame
+
+        Args:
+            df: Global or filtered player DataFrame
+
+        Returns:
+            Rows of ``df`` matching the expression
+        """
+        return df[self.mask(df)]
+
+
+@lru_cache(maxsize=256)
+def compile_filter(expression: str) -> CompiledFilter:
+    """
+    Parse and compile a filter expression (memoized by expression text)
+
+    Args:
+        expression: Filter expression text
+
+    Returns:
+        CompiledFilter
+
+    Raises:
+        ValueError: If the expression cannot be parsed
+    """
+    return CompiledFilter(expression.strip())
+
+
+def apply_filter_expression(df: pd.DataFrame, expression: str = None) -> pd.DataFrame:
+    """
+    Filter a DataFrame by an optional expression
+
+    Args:
+        df: Global or filtered player DataFrame
+        expression: Filter expression text (None or blank = no filtering)
+
+    Returns:
+        Filtered DataFrame (``df`` itself if there is no expression)
+    """
+    if not expression or not expression.strip():
+        return df
+    return compile_filter(expression.strip()).apply(df)
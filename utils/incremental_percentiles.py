@@ -0,0 +1,156 @@
+"""
+Incremental global percentiles for appended players
+
+Late-window signings arrive a few rows at a time. Instead of re-sorting every
+stat column, an IncrementalPercentiles keeps per stat the sorted values (the
+same sorted arrays the percentile lookup binary-searches, see
+utils/cohort_percentiles.py) and every row's average rank, so appending k rows
+only needs:
+
+    new rows:       two binary searches each over the merged sorted values   O(k log n)
+    existing rows:  rows at or above the smallest new value move up by
+                    (#new below + #new equal / 2), one binary search each
+                    over the k new values                                     O(a log k)
+    sorted values:  one bulk insert per stat                                  (one memmove)
+
+Average ranks are half-integers, so the updates are exact, and percentiles are
+``rank / count * 100`` exactly like ``rank(pct=True) * 100`` over the whole
+column. Every percentile still changes when the count grows, so producing the
+percentile block is one vectorized division per stat.
+"""
+from typing import List, Tuple
+
+import numpy as np
+
+from utils.column_store import build_sorted_index
+
+
+class IncrementalPercentiles:
+    """
+    Sorted values and average ranks of every stat column, updatable by appends
+    """
+
+    def __init__(self, stat_columns: List[str], sorted_values: List[np.ndarray],
+                 order: List[np.ndarray], ranks: np.ndarray):
+        """
+        Args:
+            stat_columns: Ranked columns
+            sorted_values: Per stat, the non-NaN values in ascending order
+            order: Per stat, the row position of every sorted value (stable order)
+            ranks: float64 array (stats, rows) of average ranks (1-based, NaN for NaN
+                values); one contiguous row of ranks per stat
+        """
+        self.stat_columns = list(stat_columns)
+        self.sorted_values = sorted_values
+        self.order = order
+        self.ranks = ranks
+
+    @classmethod
+    def from_sorted_indexes(cls, stat_columns: List[str],
+                            sorted_indexes: List[Tuple[np.ndarray, np.ndarray, np.ndarray, int]]
+                            ) -> 'IncrementalPercentiles':
+        """
+        Build from the sorted indexes of the stat columns (ColumnStore.sorted_index)
+
+        Args:
+            stat_columns: Ranked columns
+            sorted_indexes: One (order, sorted_values, inverse, n_valid) entry per column
+
+        Returns:
+            IncrementalPercentiles over the indexed rows
+        """
+        n_rows = len(sorted_indexes[0][0]) if sorted_indexes else 0
+        sorted_values, order = [], []
+        ranks = np.full((len(stat_columns), n_rows), np.nan)
+        for j, (column_order, column_sorted, _, n_valid) in enumerate(sorted_indexes):
+            column_sorted = column_sorted[:n_valid]
+            sorted_values.append(column_sorted)
+            order.append(column_order[:n_valid])
+
+            # Average rank of every sorted value: (less + less_or_equal + 1) / 2
+            less = np.searchsorted(column_sorted, column_sorted, side='left')
+            less_or_equal = np.searchsorted(column_sorted, column_sorted, side='right')
+            ranks[j, column_order[:n_valid]] = (less + less_or_equal + 1) / 2
+        return cls(stat_columns, sorted_values, order, ranks)
+
+    @classmethod
+    def from_values(cls, values: np.ndarray, stat_columns: List[str]) -> 'IncrementalPercentiles':
+        """
+        Rank every stat column once
+
+        Args:
+            values: float64 array (rows, stats) of raw stat values
+            stat_columns: Column names of ``values``
+
+        Returns:
+            IncrementalPercentiles over the rows
+        """
+        return cls.from_sorted_indexes(
+            stat_columns, [build_sorted_index(values[:, j]) for j in range(values.shape[1])]
+        )
+
+    @property
+    def n_rows(self) -> int:
+        return self.ranks.shape[1]
+
+    def counts(self) -> np.ndarray:
+        """Number of non-NaN values per stat"""
+        return np.array([len(values) for values in self.sorted_values], dtype=np.float64)
+
+    def percentiles(self) -> np.ndarray:
+        """
+        Percentile ranks of every row (0-100, equal to ``rank(pct=True) * 100``)
+
+        Returns:
+            float64 array (rows, stats)
+        """
+        percentiles = self.ranks / self.counts()[:, None]
+        percentiles *= 100
+        return percentiles.T
+
+    def append(self, new_values: np.ndarray) -> 'IncrementalPercentiles':
+        """
+        Add rows after the existing ones
+
+        Args:
+            new_values: float64 array (new rows, stats) in stat_columns order
+
+        Returns:
+            New IncrementalPercentiles covering the existing and the new rows
+            (this one is left unchanged)
+        """
+        n_rows, k = self.n_rows, len(new_values)
+        ranks = np.empty((len(self.stat_columns), n_rows + k))
+        ranks[:, :n_rows] = self.ranks
+        ranks[:, n_rows:] = np.nan
+        sorted_values, order = [], []
+
+        for j in range(len(self.stat_columns)):
+            column_sorted, column_order = self.sorted_values[j], self.order[j]
+            new = new_values[:, j]
+            new_rows = np.flatnonzero(~np.isnan(new))
+            if len(new_rows) == 0:
+                sorted_values.append(column_sorted)
+                order.append(column_order)
+                continue
+            new_order = np.argsort(new[new_rows], kind='stable')
+            new_rows = new_rows[new_order]
+            new_sorted = new[new_rows]
+
+            # Existing rows at or above the smallest new value move up
+            start = int(np.searchsorted(column_sorted, new_sorted[0], side='left'))
+            moved = column_sorted[start:]
+            ranks[j, column_order[start:]] += (np.searchsorted(new_sorted, moved, side='left') +
+                                               np.searchsorted(new_sorted, moved, side='right')) / 2
+
+            # Bulk insert after equal existing values (the stable order of a full sort)
+            slots = np.searchsorted(column_sorted, new_sorted, side='right')
+            merged_sorted = np.insert(column_sorted, slots, new_sorted)
+            sorted_values.append(merged_sorted)
+            order.append(np.insert(column_order, slots, n_rows + new_rows))
+
+            less = np.searchsorted(merged_sorted, new_sorted, side='left')
+            less_or_equal = np.searchsorted(merged_sorted, new_sorted, side='right')
+            ranks[j, n_rows + new_rows] = (less + less_or_equal + 1) / 2
+
+        return IncrementalPercentiles(self.stat_columns, sorted_values, order, ranks)
@@ -0,0 +1,315 @@
+"""
+Per-rerun timing instrumentation for the hot paths
+
+Hot functions are wrapped with @instrument (or a ``with timed(...)`` block).
+While a Streamlit rerun is being recorded, every call adds a span with its
+wall time and, when allocation tracing is on, the memory it allocated
+(tracemalloc). Outside a recorded rerun (CLI, benchmarks, workers) the wrappers
+cost one thread-local lookup.
+
+Every finished rerun is appended as one JSON line to a rotating log. With
+``?debug=1`` the sidebar shows the spans of the current rerun (and allocations
+are traced); ``?profile=1`` captures a cProfile of one rerun to a .prof file
+that pstats, snakeviz or tuna can open.
+
+tracemalloc is process-wide, so allocation figures of sessions traced at the
+same time include each other's work.
+"""
+import cProfile
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from typing import Dict, List
+
+# Rotating log of per-rerun timings (one JSON object per line)
+PERF_LOG_PATH = os.environ.get('SCOUTING_PERF_LOG', os.path.join('logs', 'perf.log'))
+PERF_LOG_MAX_BYTES = 5 * 1024 * 1024
+PERF_LOG_BACKUPS = 3
+
+# Folder for cProfile captures
+PROFILE_DIR = os.environ.get('SCOUTING_PROFILE_DIR', os.path.join('logs', 'profiles'))
+
+# Query parameters switching on the debug panel and single-rerun profiling
+DEBUG_QUERY_PARAM = 'debug'
+PROFILE_QUERY_PARAM = 'profile'
+
+_local = threading.local()
+_logger_lock = threading.Lock()
+_logger = None
+
+
+class RerunRecord:
+    """
+    Spans recorded during one rerun
+    """
+
+    def __init__(self, trace_allocations: bool = False, profile: bool = False):
+        """
+        Args:
+            trace_allocations: Record allocated bytes per span (tracemalloc, slower)
+            profile: Capture a cProfile of the rerun
+        """
+        self.started = time.time()
+        self.trace_allocations = trace_allocations
+        self.spans = []
+        self.fields = {}
+        self.total_seconds = None
+        self.peak_alloc_bytes = None
+        self.profile_path = None
+        self._start = time.perf_counter()
+        self._stack = []
+        self._depth = 0
+        self._started_tracing = False
+        self._profiler = cProfile.Profile() if profile else None
+
+    def summary(self) -> List[Dict]:
+        """
+        Spans aggregated by name, slowest first
+
+        Returns:
+            List of {'name', 'calls', 'seconds', 'alloc_mb', 'peak_mb'} (memory
+            values are None without allocation tracing)
+        """
+        totals = {}
+        for span in self.spans:
+            entry = totals.setdefault(span['name'], {
+                'name': span['name'], 'calls': 0, 'seconds': 0.0, 'alloc_mb': None, 'peak_mb': None
+            })
+            entry['calls'] += 1
+            entry['seconds'] += span['seconds']
+            if span['alloc_bytes'] is not None:
+                entry['alloc_mb'] = (entry['alloc_mb'] or 0.0) + span['alloc_bytes'] / 1e6
+                entry['peak_mb'] = max(entry['peak_mb'] or 0.0, span['peak_bytes'] / 1e6)
+        return sorted(totals.values(), key=lambda entry: entry['seconds'], reverse=True)
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable form written to the log"""
+        return {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            **self.fields,
+            'total_s': self.total_seconds,
+            'peak_alloc_mb': None if self.peak_alloc_bytes is None else self.peak_alloc_bytes / 1e6,
+            'profile': self.profile_path,
+            'spans': self.summary()
+        }
+
+
+def get_current_rerun() -> RerunRecord:
+    """Record of the rerun running on this thread (None outside a recorded rerun)"""
+    return getattr(_local, 'record', None)
+
+
+def start_rerun(trace_allocations: bool = False, profile: bool = False) -> RerunRecord:
+    """
+    Start recording spans on this thread
+
+    Args:
+        trace_allocations: Record allocated bytes per span (tracemalloc, slower)
+        profile: Capture a cProfile of the rerun
+
+    Returns:
+        The new RerunRecord
+    """
+    record = RerunRecord(trace_allocations=trace_allocations, profile=profile)
+    if trace_allocations:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            record._started_tracing = True
+        tracemalloc.reset_peak()
+        record._stack.append({'start': tracemalloc.get_traced_memory()[0], 'peak': 0})
+    _local.record = record
+    if record._profiler is not None:
+        record._profiler.enable()
+    return record
+
+
+def annotate_rerun(**fields):
+    """Attach fields (page, player counts, ...) to the current rerun's log line"""
+    record = get_current_rerun()
+    if record is not None:
+        record.fields.update(fields)
+
+
+def finish_rerun(log: bool = True) -> RerunRecord:
+    """
+    Stop recording, write the profile (if captured) and append the rerun to the log
+
+    Args:
+        log: Append the rerun to the rotating log
+
+    Returns:
+        The finished RerunRecord (None if no rerun was being recorded)
+    """
+    record = get_current_rerun()
+    if record is None:
+        return None
+    _local.record = None
+
+    if record._profiler is not None:
+        record._profiler.disable()
+        record.profile_path = _write_profile(record._profiler)
+
+    record.total_seconds = time.perf_counter() - record._start
+    if record.trace_allocations:
+        current, peak = tracemalloc.get_traced_memory()
+        root = record._stack[0]
+        record.peak_alloc_bytes = max(root['peak'], peak) - root['start']
+        if record._started_tracing:
+            tracemalloc.stop()
+
+    if log:
+        write_log_entry(record.to_dict())
+    return record
+
+
+@contextmanager
+def timed(name: str):
+    """
+    Record a span around a block (no-op outside a recorded rerun)
+
+    Args:
+        name: Span name shown in the panel and the log
+    """
+    record = get_current_rerun()
+    if record is None:
+        yield
+        return
+
+    tracing = record.trace_allocations and tracemalloc.is_tracing()
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        parent = record._stack[-1]
+        parent['peak'] = max(parent['peak'], peak)
+        tracemalloc.reset_peak()
+        frame = {'start': current, 'peak': current}
+        record._stack.append(frame)
+
+    record._depth += 1
+    depth = record._depth
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        record._depth -= 1
+        alloc_bytes = peak_bytes = None
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            frame = record._stack.pop()
+            frame['peak'] = max(frame['peak'], peak)
+            alloc_bytes = current - frame['start']
+            peak_bytes = frame['peak'] - frame['start']
+            record._stack[-1]['peak'] = max(record._stack[-1]['peak'], frame['peak'])
+        record.spans.append({'name': name, 'seconds': seconds, 'alloc_bytes': alloc_bytes,
+                             'peak_bytes': peak_bytes, 'depth': depth})
+
+
+def instrument(name: str):
+    """
+    Decorator recording every call of a function as a span
+
+    Args:
+        name: Span name shown in the panel and the log
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if get_current_rerun() is None:
+                return fn(*args, **kwargs)
+            with timed(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _get_logger() -> logging.Logger:
+    """Rotating JSON-lines logger (created on first use)"""
+    global _logger
+    with _logger_lock:
+        if _logger is None:
+            logger = logging.getLogger('scouting.perf')
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            try:
+                os.makedirs(os.path.dirname(PERF_LOG_PATH) or '.', exist_ok=True)
+                handler = RotatingFileHandler(PERF_LOG_PATH, maxBytes=PERF_LOG_MAX_BYTES,
+                                              backupCount=PERF_LOG_BACKUPS, encoding='utf-8')
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                logger.addHandler(handler)
+            except OSError as e:
+                print(f"Warning: performance log disabled ({str(e)})")
+                logger.addHandler(logging.NullHandler())
+            _logger = logger
+    return _logger
+
+
+def write_log_entry(entry: Dict):
+    """Append one JSON object to the rotating performance log"""
+    _get_logger().info(json.dumps(entry, default=str))
+
+
+def _write_profile(profiler: cProfile.Profile) -> str:
+    """Dump a profile in pstats format and return its path (None if it cannot be written)"""
+    path = os.path.join(PROFILE_DIR, f"rerun-{time.strftime('%Y%m%d-%H%M%S')}-{threading.get_ident()}.prof")
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(path)
+    except OSError as e:
+        print(f"Warning: could not write profile ({str(e)})")
+        return None
+    return path
+
+
+def get_instrumentation_flags() -> Dict[str, bool]:
+    """
+    Read the debug and profile switches from the page's query parameters
+
+    The profile parameter is removed once read, so only one rerun is captured.
+
+    Returns:
+        Dictionary with 'debug' and 'profile'
+    """
+    import streamlit as st
+
+    params = st.query_params
+    debug = params.get(DEBUG_QUERY_PARAM, '0') not in ('', '0', 'false')
+    profile = params.get(PROFILE_QUERY_PARAM, '0') not in ('', '0', 'false')
+    if profile:
+        del params[PROFILE_QUERY_PARAM]
+    return {'debug': debug, 'profile': profile}
+
+
+def display_debug_panel(record: RerunRecord):
+    """
+    Show the spans of a finished rerun in a sidebar expander
+
+    Args:
+        record: Finished RerunRecord
+    """
+    import pandas as pd
+    import streamlit as st
+
+    if record is None:
+        return
+
+    with st.sidebar.expander("⏱️ Performance (last rerun)", expanded=False):
+        st.caption(f"Rerun: {record.total_seconds * 1000:.0f} ms"
+                   + (f" | peak alloc {record.peak_alloc_bytes / 1e6:.1f} MB"
+                      if record.peak_alloc_bytes is not None else ""))
+        summary = record.summary()
+        if summary:
+            table = pd.DataFrame(summary)
+            table['ms'] = table.pop('seconds') * 1000
+            st.dataframe(table[['name', 'calls', 'ms', 'alloc_mb', 'peak_mb']], hide_index=True,
+                         use_container_width=True)
+        else:
+            st.caption("No instrumented calls in this rerun")
+        if record.profile_path:
+            st.caption(f"Profile written to {record.profile_path}")
+        st.caption(f"Log: {PERF_LOG_PATH} | add ?{PROFILE_QUERY_PARAM}=1 to the URL to profile one rerun")
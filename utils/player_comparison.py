@@ -3,8 +3,11 @@ Visualization utilities for player comparison charts
 """
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
-from typing import List, Dict
+from typing import List, Dict, Hashable
+import pandas as pd
 import streamlit as st
+from utils.chart_cache import get_chart_cache, hash_config
+from utils.instrumentation import instrument
 
 
 def get_percentile_color(percentile: float) -> str:
@@ -93,8 +96,10 @@ def create_combined_player_chart(
         linewidth=1.5
     )
 
-    # Add percentile text on bars
+    # Add percentile text on bars (stats without data have no bar and no label)
     for i, (bar, percentile) in enumerate(zip(bars, all_percentiles)):
+        if pd.isna(percentile):
+            continue
         width = bar.get_width()
         ax.text(
             width + 2,
@@ -198,10 +203,49 @@ def create_player_header(player_info: Dict, color: str):
     return header_html
 
 
+def get_player_chart_id(player_data: Dict) -> Hashable:
+    """
+    Get the identifier of a player for chart cache keys
+
+    Args:
+        player_data: Player data dictionary
+
+    Returns:
+        Global row id for dataset players, a hash of the stat line for ad-hoc players
+    """
+    player_id = player_data['info'].get('id')
+    if player_id is not None:
+        return player_id
+    return f"adhoc-{hash_config([player_data['info'], player_data['stats']])}"
+
+
+@instrument('chart_render')
+def render_cached_chart(key, render, dataset_version: str = None):
+    """
+    Display a matplotlib chart through the chart cache
+
+    Args:
+        key: Cache key (without the dataset version)
+        render: Function returning a matplotlib figure
+        dataset_version: Version of the dataset the chart was built from
+            (None renders without caching)
+    """
+    if dataset_version is None:
+        fig = render()
+        st.pyplot(fig, use_container_width=True)
+        plt.close(fig)
+        return
+
+    image = get_chart_cache().get_or_render((dataset_version,) + tuple(key), render)
+    st.image(image, use_column_width=True)
+
+
 def display_player_comparison(
     players_data: List[Dict],
     stat_categories: Dict,
-    player_colors: List[str]
+    player_colors: List[str],
+    dataset_version: str = None,
+    cohort: str = 'global'
 ):
     """
     Display complete player comparison with side-by-side column layout
@@ -210,8 +254,11 @@ def display_player_comparison(
         players_data: List of player data dictionaries
         stat_categories: Dictionary of stat categories
         player_colors: List of colors for players
+        dataset_version: Dataset version used to cache rendered charts (None = no caching)
+        cohort: Percentile cohort the stats were ranked in
     """
     num_players = len(players_data)
+    config_hash = hash_config(stat_categories)
 
     # Create columns for each player
     st.markdown("### Player Comparison")
@@ -228,15 +275,16 @@ def display_player_comparison(
             )
 
             # Display combined chart with all categories
-            fig = create_combined_player_chart(
-                player_data,
-                stat_categories,
-                player_colors[idx]
+            render_cached_chart(
+                ('player', get_player_chart_id(player_data), player_colors[idx], config_hash, cohort),
+                lambda player_data=player_data, color=player_colors[idx]: create_combined_player_chart(
+                    player_data,
+                    stat_categories,
+                    color
+                ),
+                dataset_version
             )
 
-            st.pyplot(fig, use_container_width=True)
-            plt.close(fig)
-
 
 def create_stats_table(players_data: List[Dict], stat_categories: Dict):
     """
@@ -266,20 +314,209 @@ def create_stats_table(players_data: List[Dict], stat_categories: Dict):
         st.dataframe(df, use_container_width=True, hide_index=True)
 
 
-def display_composite_attributes(
+def create_composite_attribute_chart(
     players_data: List[Dict],
+    attr_key: str,
     player_colors: List[str]
 ):
     """
-    Display composite attributes comparison for selected players
+    Create a ranked bar chart of one composite attribute for all players
 
     Args:
         players_data: List of player data dictionaries (with 'composite_attributes' key)
+        attr_key: Composite attribute key
         player_colors: List of colors for players
+
+    Returns:
+        matplotlib figure
     """
-    import pandas as pd
-    import numpy as np
+    attr_data = players_data[0]['composite_attributes'][attr_key]
+    attr_name = attr_data['display_name']
+    attr_icon = attr_data.get('icon', '')
+    attr_desc = attr_data.get('description', '')
+
+    # Collect scores for all players
+    player_scores = []
+    for player_data in players_data:
+        score = player_data['composite_attributes'][attr_key]['score']
+        player_scores.append({
+            'name': player_data['info']['name'],
+            'score': score
+        })
+
+    # Sort by score descending
+    player_scores.sort(key=lambda x: x['score'], reverse=True)
+
+    # Create horizontal bar chart
+    fig, ax = plt.subplots(figsize=(10, max(2, len(players_data) * 0.6)))
+    fig.patch.set_facecolor('#f5f3e8')
+    ax.set_facecolor('#f5f3e8')
+
+    # Prepare data
+    names = [p['name'] for p in player_scores]
+    scores = [p['score'] for p in player_scores]
+
+    # Assign colors based on original player order
+    bar_colors = []
+    for player_score in player_scores:
+        # Find this player's index in original players_data
+        for idx, player_data in enumerate(players_data):
+            if player_data['info']['name'] == player_score['name']:
+                bar_colors.append(player_colors[idx])
+                break
+
+    y_positions = range(len(names))
+    bars = ax.barh(
+        y_positions,
+        scores,
+        color=bar_colors,
+        alpha=0.85,
+        edgecolor='white',
+        linewidth=2
+    )
+
+    # Add score labels on bars
+    for i, (bar, score) in enumerate(zip(bars, scores)):
+        width = bar.get_width()
+        ax.text(
+            width + 1,
+            bar.get_y() + bar.get_height() / 2,
+            f'{score:.1f}',
+            va='center',
+            fontsize=11,
+            fontweight='bold',
+            color='#2c3e50'
+        )
+
+    # Add rank numbers
+    for i, (bar, rank) in enumerate(zip(bars, range(1, len(names) + 1))):
+        ax.text(
+            -2,
+            bar.get_y() + bar.get_height() / 2,
+            f'#{rank}',
+            va='center',
+            ha='right',
+            fontsize=10,
+            fontweight='bold',
+            color='#7f8c8d'
+        )
+
+    # Customize axes
+    ax.set_yticks(y_positions)
+    ax.set_yticklabels(names, fontsize=11, fontweight='bold')
+    ax.set_xlabel('Score', fontsize=10, fontweight='bold', color='#2c3e50')
+    ax.set_title(
+        f'{attr_icon} {attr_name}\n{attr_desc}',
+        fontsize=12,
+        fontweight='bold',
+        color='#2c3e50',
+        pad=15
+    )
+
+    # Set x-axis limits
+    max_score = max(scores) if scores else 100
+    ax.set_xlim(-5, max_score + 10)
+
+    # Add grid
+    ax.grid(axis='x', alpha=0.3, linestyle='--', linewidth=0.5)
+    ax.set_axisbelow(True)
+
+    # Remove spines
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_visible(False)
+    ax.spines['bottom'].set_color('#95a5a6')
+
+    # Invert y-axis to show highest score on top
+    ax.invert_yaxis()
+
+    plt.tight_layout()
+
+    return fig
+
+
+def create_player_composite_chart(player_data: Dict, player_color: str):
+    """
+    Create a bar chart of all composite attributes of one player (used by scouting cards)
 
+    Args:
+        player_data: Player data dictionary (with 'composite_attributes' key)
+        player_color: Primary color for the player
+
+    Returns:
+        matplotlib figure
+    """
+    attributes = list(player_data['composite_attributes'].values())
+    # Icons are left out: emoji glyphs are missing from the default headless fonts
+    names = [attr['display_name'] for attr in attributes]
+    scores = [attr['score'] for attr in attributes]
+
+    fig, ax = plt.subplots(figsize=(8, len(attributes) * 0.35 + 1))
+    fig.patch.set_facecolor('#f5f3e8')
+    ax.set_facecolor('#f5f3e8')
+
+    y_positions = range(len(names))
+    bars = ax.barh(
+        y_positions,
+        scores,
+        color=player_color,
+        alpha=0.85,
+        edgecolor='white',
+        linewidth=1.5
+    )
+
+    # Add score labels on bars (attributes without data have no bar)
+    for bar, score in zip(bars, scores):
+        if pd.isna(score):
+            continue
+        ax.text(
+            max(bar.get_width(), 0) + 1,
+            bar.get_y() + bar.get_height() / 2,
+            f'{score:.1f}',
+            va='center',
+            fontsize=8,
+            fontweight='bold',
+            color='#2c3e50'
+        )
+
+    ax.set_yticks(y_positions)
+    ax.set_yticklabels(names, fontsize=9)
+    ax.set_xlabel('Score', fontsize=10, fontweight='bold', color='#2c3e50')
+    ax.set_title('Attributes', fontsize=11, fontweight='bold', color='#2c3e50')
+
+    valid_scores = [score for score in scores if not pd.isna(score)]
+    ax.set_xlim(min([0] + valid_scores) - 5, max([100] + valid_scores) + 10)
+
+    ax.grid(axis='x', alpha=0.3, linestyle='--', linewidth=0.5)
+    ax.set_axisbelow(True)
+
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_color('#95a5a6')
+    ax.spines['bottom'].set_color('#95a5a6')
+
+    ax.invert_yaxis()
+
+    plt.tight_layout()
+
+    return fig
+
+
+def display_composite_attributes(
+    players_data: List[Dict],
+    player_colors: List[str],
+    dataset_version: str = None,
+    cohort: str = 'global'
+):
+    """
+    Display composite attributes comparison for selected players
+
+    Args:
+        players_data: List of player data dictionaries (with 'composite_attributes' key)
+        player_colors: List of colors for players
+        dataset_version: Dataset version used to cache rendered charts (None = no caching)
+        cohort: Percentile cohort the composite attributes were computed in
+    """
     st.markdown("---")
     st.markdown("### 📊 Attributes Analysis")
     st.markdown("*Calculated from weighted combinations of key statistics*")
@@ -290,209 +527,116 @@ def display_composite_attributes(
         return
 
     attribute_names = list(players_data[0]['composite_attributes'].keys())
+    player_ids = tuple(get_player_chart_id(player_data) for player_data in players_data)
 
     # Create a chart for each attribute showing all players
     for attr_key in attribute_names:
         attr_data = players_data[0]['composite_attributes'][attr_key]
-        attr_name = attr_data['display_name']
-        attr_icon = attr_data.get('icon', '')
-        attr_desc = attr_data.get('description', '')
-
-        # Collect scores for all players
-        player_scores = []
-        for player_data in players_data:
-            score = player_data['composite_attributes'][attr_key]['score']
-            player_scores.append({
-                'name': player_data['info']['name'],
-                'score': score
-            })
-
-        # Sort by score descending
-        player_scores.sort(key=lambda x: x['score'], reverse=True)
-
-        # Create horizontal bar chart
-        fig, ax = plt.subplots(figsize=(10, max(2, len(players_data) * 0.6)))
-        fig.patch.set_facecolor('#f5f3e8')
-        ax.set_facecolor('#f5f3e8')
-
-        # Prepare data
-        names = [p['name'] for p in player_scores]
-        scores = [p['score'] for p in player_scores]
-
-        # Assign colors based on original player order
-        bar_colors = []
-        for player_score in player_scores:
-            # Find this player's index in original players_data
-            for idx, player_data in enumerate(players_data):
-                if player_data['info']['name'] == player_score['name']:
-                    bar_colors.append(player_colors[idx])
-                    break
-
-        y_positions = range(len(names))
-        bars = ax.barh(
-            y_positions,
-            scores,
-            color=bar_colors,
-            alpha=0.85,
-            edgecolor='white',
-            linewidth=2
+        render_cached_chart(
+            ('composite', attr_key, player_ids, tuple(player_colors), hash_config(attr_data), cohort),
+            lambda attr_key=attr_key: create_composite_attribute_chart(players_data, attr_key, player_colors),
+            dataset_version
         )
 
-        # Add score labels on bars
-        for i, (bar, score) in enumerate(zip(bars, scores)):
-            width = bar.get_width()
-            ax.text(
-                width + 1,
-                bar.get_y() + bar.get_height() / 2,
-                f'{score:.1f}',
-                va='center',
-                fontsize=11,
-                fontweight='bold',
-                color='#2c3e50'
-            )
 
-        # Add rank numbers
-        for i, (bar, rank) in enumerate(zip(bars, range(1, len(names) + 1))):
-            ax.text(
-                -2,
-                bar.get_y() + bar.get_height() / 2,
-                f'#{rank}',
-                va='center',
-                ha='right',
-                fontsize=10,
-                fontweight='bold',
-                color='#7f8c8d'
-            )
+@instrument('chart_render')
+def create_rankings_heatmap(players_data: List[Dict], attribute_ranks: Dict):
+    """
+    Create a heatmap of attribute ranks (one row per player, one column per attribute)
 
-        # Customize axes
-        ax.set_yticks(y_positions)
-        ax.set_yticklabels(names, fontsize=11, fontweight='bold')
-        ax.set_xlabel('Score', fontsize=10, fontweight='bold', color='#2c3e50')
-        ax.set_title(
-            f'{attr_icon} {attr_name}\n{attr_desc}',
-            fontsize=12,
-            fontweight='bold',
-            color='#2c3e50',
-            pad=15
-        )
+    Cells are colored by pool rank and labelled with the score, the rank within
+    the selection and the rank within the pool. A single trace keeps rendering
+    cost independent of the number of players.
 
-        # Set x-axis limits
-        max_score = max(scores) if scores else 100
-        ax.set_xlim(-5, max_score + 10)
+    Args:
+        players_data: List of player data dictionaries
+        attribute_ranks: Result of compute_attribute_ranks
 
-        # Add grid
-        ax.grid(axis='x', alpha=0.3, linestyle='--', linewidth=0.5)
-        ax.set_axisbelow(True)
+    Returns:
+        plotly figure
+    """
+    import numpy as np
+    import plotly.graph_objects as go
 
-        # Remove spines
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.spines['left'].set_visible(False)
-        ax.spines['bottom'].set_color('#95a5a6')
+    attr_keys = attribute_ranks['attributes']
+    scores = attribute_ranks['scores']
+    selection_ranks = attribute_ranks['selection_ranks']
+    pool_ranks = attribute_ranks['pool_ranks']
+    pool_sizes = attribute_ranks['pool_sizes']
+    num_players = len(players_data)
 
-        # Invert y-axis to show highest score on top
-        ax.invert_yaxis()
+    player_names = [player_data['info']['name'] for player_data in players_data]
+    first_attributes = players_data[0]['composite_attributes']
+    attr_labels = [
+        f"{first_attributes.get(key, {}).get('icon', '')} {first_attributes.get(key, {}).get('display_name', key)}".strip()
+        for key in attr_keys
+    ]
+
+    # 100 = best in pool, 0 = worst
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pool_score = 100 * (1 - (pool_ranks - 1) / np.maximum(pool_sizes - 1, 1))
+
+    def _fmt_rank(values):
+        return np.where(np.isnan(values), '-', np.char.mod('%d', np.nan_to_num(values).astype(int)))
+
+    cell_text = np.char.add(np.char.add(np.char.mod('%.1f', scores), '<br>#'), _fmt_rank(selection_ranks))
+    cell_text = np.char.add(np.char.add(cell_text, f'/{num_players} · #'), _fmt_rank(pool_ranks))
+    cell_text = np.char.add(np.char.add(cell_text, '/'), np.char.mod('%d', np.broadcast_to(pool_sizes, scores.shape)))
+
+    fig = go.Figure(go.Heatmap(
+        z=pool_score,
+        x=attr_labels,
+        y=player_names,
+        text=cell_text,
+        texttemplate='%{text}',
+        textfont={'size': 11},
+        colorscale=[[0, '#e74c3c'], [0.4, '#f39c12'], [0.6, '#3498db'], [1, '#2ecc71']],
+        zmin=0,
+        zmax=100,
+        colorbar={'title': 'Pool<br>rank %'},
+        hovertemplate='%{y}<br>%{x}<br>%{text}<extra></extra>',
+        xgap=2,
+        ygap=2
+    ))
+
+    fig.update_layout(
+        height=max(250, 60 + 45 * num_players),
+        margin=dict(l=10, r=10, t=30, b=10),
+        paper_bgcolor='#f5f3e8',
+        plot_bgcolor='#f5f3e8',
+        xaxis=dict(side='top'),
+        yaxis=dict(autorange='reversed')
+    )
 
-        plt.tight_layout()
-        st.pyplot(fig, use_container_width=True)
-        plt.close(fig)
+    return fig
 
 
 def display_position_based_rankings(
     players_data: List[Dict],
     position_type: str,
-    player_colors: List[str]
+    attribute_ranks: Dict
 ):
     """
-    Display position-specific rankings for key composite attributes
+    Display position-specific rankings for key composite attributes as one heatmap
 
     Args:
         players_data: List of player data dictionaries (with 'composite_attributes' key)
-        position_type: Position type ("DM/CM" or "CB")
-        player_colors: List of colors for players
+        position_type: Position type key from POSITION_RANKINGS
+        attribute_ranks: Result of compute_attribute_ranks for the key attributes
     """
     from config.position_rankings import POSITION_RANKINGS
 
-    if position_type not in POSITION_RANKINGS:
+    if position_type not in POSITION_RANKINGS or not attribute_ranks['attributes']:
         return
 
     position_config = POSITION_RANKINGS[position_type]
-    key_attributes = position_config['key_attributes']
 
     st.markdown("---")
     st.markdown("### 🏆 Position-Based Rankings")
-    st.markdown(f"*Key attributes for {position_config['display_name']}*")
-
-    # Medal icons for top 3
-    medals = {1: "🥇", 2: "🥈", 3: "🥉"}
+    st.markdown(
+        f"*Key attributes for {position_config['display_name']} — "
+        f"score, rank within the selection and rank within the filtered pool*"
+    )
 
-    # Create ranking data for each key attribute
-    ranking_data = []
+    st.plotly_chart(create_rankings_heatmap(players_data, attribute_ranks), use_container_width=True)
 
-    for attr_key in key_attributes:
-        # Collect scores for all players for this attribute
-        player_scores = []
-        for idx, player_data in enumerate(players_data):
-            if 'composite_attributes' not in player_data:
-                continue
-
-            if attr_key not in player_data['composite_attributes']:
-                continue
-
-            score = player_data['composite_attributes'][attr_key]['score']
-            player_scores.append({
-                'name': player_data['info']['name'],
-                'score': score,
-                'color': player_colors[idx]
-            })
-
-        # Sort by score descending
-        player_scores.sort(key=lambda x: x['score'], reverse=True)
-
-        # Build ranking string
-        ranking_parts = []
-        for rank, player in enumerate(player_scores[:3], 1):  # Top 3 only
-            medal = medals.get(rank, "")
-            ranking_parts.append(f"{medal} #{rank} {player['name']} ({player['score']:.1f})")
-
-        ranking_string = " • ".join(ranking_parts) if ranking_parts else "N/A"
-
-        # Get attribute display info
-        attr_info = players_data[0]['composite_attributes'].get(attr_key, {})
-        attr_icon = attr_info.get('icon', '')
-        attr_display = attr_info.get('display_name', attr_key)
-
-        ranking_data.append({
-            'Attribute': f"{attr_icon} {attr_display}",
-            'Rankings': ranking_string
-        })
-
-    # Display as a styled dataframe
-    import pandas as pd
-    df_rankings = pd.DataFrame(ranking_data)
-
-    # Custom CSS for the table
-    st.markdown("""
-    <style>
-    .rankings-table {
-        font-size: 14px;
-        line-height: 1.8;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-
-    st.dataframe(
-        df_rankings,
-        use_container_width=True,
-        hide_index=True,
-        column_config={
-            "Attribute": st.column_config.TextColumn(
-                "Attribute",
-                width="medium",
-            ),
-            "Rankings": st.column_config.TextColumn(
-                "Top Players",
-                width="large",
-            )
-        }
-    )
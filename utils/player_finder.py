@@ -4,163 +4,9 @@ Player Finder visualization with defender preset scoring
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
 from typing import Dict, List, Tuple
-
-
-class DefenderScorer:
-    """Calculate weighted scores for defender presets"""
-
-    def __init__(self, presets: Dict):
-        """
-        Args:
-            presets: DEFENDER_PRESETS dictionary
-        """
-        self.presets = presets
-        self.negative_metrics = [
-            'Fouls per 90',
-            'Cards per 90',
-            'Conceded goals per 90'
-        ]  # Metrics where lower is better
-
-    def calculate_preset_score(
-        self,
-        df: pd.DataFrame,
-        preset_name: str,
-        top_n_limit: int = 30
-    ) -> Tuple[pd.DataFrame, Dict[str, float]]:
-        """
-        Calculate weighted score for all players using preset
-
-        Args:
-            df: DataFrame with player data
-            preset_name: Key from DEFENDER_PRESETS
-            top_n_limit: Return only top N players
-
-        Returns:
-            (result_df, normalized_weights)
-        """
-        preset = self.presets[preset_name]
-        components = preset['components']
-
-        # Extract weights and validate metrics exist
-        weights = {}
-        for comp in components:
-            metric = comp['stat']
-            if metric not in df.columns:
-                raise ValueError(f"Metric '{metric}' not found in dataframe")
-            weights[metric] = comp['weight']
-
-        # Normalize weights to sum to 1.0
-        total_weight = sum(abs(w) for w in weights.values())
-        normalized_weights = {k: v/total_weight for k, v in weights.items()}
-
-        # Calculate normalized scores (0-100 scale)
-        result_df = df.copy()
-        weighted_scores = pd.Series(0.0, index=df.index)
-
-        for metric, weight in normalized_weights.items():
-            col_values = df[metric]
-            col_min = col_values.min()
-            col_max = col_values.max()
-
-            if col_max == col_min:
-                normalized_values = pd.Series(50.0, index=df.index)
-            else:
-                # Normalize to 0-100 scale
-                if metric in self.negative_metrics and weight < 0:
-                    # Negative metric with negative weight: invert normalization
-                    normalized_values = 100 - ((col_values - col_min) / (col_max - col_min) * 100)
-                else:
-                    normalized_values = (col_values - col_min) / (col_max - col_min) * 100
-
-            # Add weighted contribution
-            weighted_scores += normalized_values * abs(weight)
-
-        # Add score to result
-        score_column = f'{preset_name.replace(" ", "_")}_Score'
-        result_df[score_column] = weighted_scores
-
-        # Sort by score (descending)
-        result_df = result_df.sort_values(score_column, ascending=False).reset_index(drop=True)
-        result_df['Rank'] = range(1, len(result_df) + 1)
-
-        # Calculate percentile rank
-        percentile_column = f'{score_column}_Percentile'
-        result_df[percentile_column] = result_df[score_column].rank(pct=True) * 100
-
-        # Return top N players only
-        top_players = result_df.head(top_n_limit)
-
-        # Select relevant columns
-        display_cols = [
-            'Rank', 'Player', 'Team', 'Position', 'Age',
-            score_column, percentile_column
-        ] + list(normalized_weights.keys())
-
-        # Filter to only include columns that exist
-        display_cols = [col for col in display_cols if col in top_players.columns]
-
-        return top_players[display_cols], normalized_weights
-
-    def get_metric_contributions(
-        self,
-        df: pd.DataFrame,
-        player_idx: int,
-        preset_name: str
-    ) -> Dict[str, Dict]:
-        """
-        Get individual metric contributions to a player's total score
-
-        Args:
-            df: DataFrame with player data
-            player_idx: Index of player in dataframe
-            preset_name: Key from DEFENDER_PRESETS
-
-        Returns:
-            Dictionary of metric contributions
-        """
-        preset = self.presets[preset_name]
-        components = preset['components']
-
-        # Extract weights
-        weights = {}
-        for comp in components:
-            metric = comp['stat']
-            weights[metric] = comp['weight']
-
-        # Normalize weights
-        total_weight = sum(abs(w) for w in weights.values())
-        normalized_weights = {k: v/total_weight for k, v in weights.items()}
-
-        contributions = {}
-        for metric, weight in normalized_weights.items():
-            if metric in df.columns:
-                col_values = df[metric]
-                col_min = col_values.min()
-                col_max = col_values.max()
-                player_value = df.loc[player_idx, metric]
-
-                if col_max == col_min:
-                    normalized_value = 50.0
-                else:
-                    if metric in self.negative_metrics and weight < 0:
-                        normalized_value = 100 - ((player_value - col_min) / (col_max - col_min) * 100)
-                    else:
-                        normalized_value = (player_value - col_min) / (col_max - col_min) * 100
-
-                    # Clamp to 0-100
-                    normalized_value = max(0, min(100, normalized_value))
-
-                contributions[metric] = {
-                    'raw_value': player_value,
-                    'normalized_score': normalized_value,
-                    'weight': weight,
-                    'weighted_contribution': normalized_value * abs(weight)
-                }
-
-        return contributions
+from utils.instrumentation import instrument, timed
+from utils.preset_scoring import DefenderScorer
 
 
 def get_percentile_color(percentile_rank):
@@ -292,23 +138,25 @@ def display_results_table(results_df, preset_name, used_weights):
                 width="small"
             )
 
-    # Apply styling (color-code the score column)
-    styled_df = display_df.style.apply(
-        lambda row: [
-            style_weighted_score(row[score_col], row[percentile_col])
-            if col == score_col else ''
-            for col in display_df.columns
-        ],
-        axis=1
-    )
+    # Styler work happens when the table is serialized, so time both steps
+    with timed('styler_format'):
+        # Apply styling (color-code the score column)
+        styled_df = display_df.style.apply(
+            lambda row: [
+                style_weighted_score(row[score_col], row[percentile_col])
+                if col == score_col else ''
+                for col in display_df.columns
+            ],
+            axis=1
+        )
 
-    # Display table
-    st.dataframe(
-        styled_df,
-        column_config=column_config,
-        use_container_width=True,
-        hide_index=True
-    )
+        # Display table
+        st.dataframe(
+            styled_df,
+            column_config=column_config,
+            use_container_width=True,
+            hide_index=True
+        )
 
     # Summary stats
     st.markdown("##### 📊 Summary Statistics")
@@ -331,8 +179,12 @@ def display_results_table(results_df, preset_name, used_weights):
     st.dataframe(weights_df, use_container_width=True, hide_index=True)
 
 
+@instrument('chart_render')
 def display_score_distribution(results_df, preset_name):
     """Display score distribution visualizations"""
+    import plotly.express as px
+    import plotly.graph_objects as go
+
     st.markdown("#### Score Distribution Analysis")
 
     score_col = f'{preset_name.replace(" ", "_")}_Score'
@@ -390,6 +242,8 @@ def display_score_distribution(results_df, preset_name):
 
 def display_player_detail(results_df, df_to_score, preset_name, used_weights, scorer):
     """Display individual player analysis"""
+    import plotly.express as px
+
     st.markdown("#### Individual Player Analysis")
 
     # Player selection for detailed view
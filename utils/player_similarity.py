@@ -4,7 +4,37 @@ Player similarity calculation using weighted cosine similarity
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple
-from sklearn.metrics.pairwise import cosine_similarity
+from utils.constraint_search import constraint_mask
+from utils.filter_dsl import compile_filter
+from utils.cohort_percentiles import get_cohort_composites
+from utils.data_loader import PlayerNotFoundError
+from utils.instrumentation import instrument
+from utils.pool_view import PoolView
+
+
+def cosine_similarity(reference: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+    """
+    Cosine similarity between one reference vector and every candidate row
+
+    Same result as sklearn's cosine_similarity (zero vectors give 0) without
+    importing scikit-learn.
+
+    Args:
+        reference: Vector of shape (n_metrics,)
+        candidates: Matrix of shape (n_candidates, n_metrics)
+
+    Returns:
+        Array of shape (n_candidates,)
+    """
+    reference = np.asarray(reference, dtype=np.float64).ravel()
+    candidates = np.asarray(candidates, dtype=np.float64)
+
+    ref_norm = np.linalg.norm(reference)
+    cand_norms = np.sqrt(np.einsum('ij,ij->i', candidates, candidates))
+    denominator = ref_norm * cand_norms
+
+    dots = candidates @ reference
+    return np.divide(dots, denominator, out=np.zeros_like(dots), where=denominator > 0)
 
 
 class SimilarityScorer:
@@ -12,7 +42,9 @@ class SimilarityScorer:
     Calculate player-to-player similarity using weighted metrics
     """
 
-    def __init__(self, df: pd.DataFrame, stat_columns: List[str], composite_columns: List[str] = None):
+    @instrument('scorer_init')
+    def __init__(self, df: pd.DataFrame, stat_columns: List[str], composite_columns: List[str] = None,
+                 cohort: str = 'global'):
         """
         Initialize scorer with dataset
 
@@ -20,8 +52,23 @@ class SimilarityScorer:
             df: Player dataframe with all statistics
             stat_columns: List of metric columns to use for similarity
             composite_columns: List of composite attribute columns (e.g., COMP_Security)
+            cohort: Percentile cohort the COMP_* columns are computed against
+                (key from config/cohorts.py, default: global)
         """
-        self.df = df.copy()
+        self.df = df
+        self.cohort = cohort
+        overrides = None
+
+        # Swap in cohort-relative composites from the precomputed percentile blocks
+        # (under copy-on-write the overlay frame shares every other column with ``df``)
+        if cohort != 'global':
+            from config.composite_attributes import COMPOSITE_ATTRIBUTES
+            cohort_composites = get_cohort_composites(df, stat_columns, cohort, COMPOSITE_ATTRIBUTES)
+            self.df = df.assign(**{col: cohort_composites[col] for col in cohort_composites.columns})
+            overrides = {col: cohort_composites[col].to_numpy() for col in cohort_composites.columns}
+
+        # Scoring reads index arrays and read-only column views, never a copy of the pool
+        self.pool = PoolView.from_frame(df, overrides=overrides)
         self.stat_columns = stat_columns
         self.composite_columns = composite_columns if composite_columns else []
         self.all_selectable_columns = stat_columns + self.composite_columns
@@ -31,6 +78,28 @@ class SimilarityScorer:
             'Conceded goals per 90'
         ]  # Metrics where lower is better
 
+    def _player_rows(self, player_name: str, season: str = None) -> pd.DataFrame:
+        """
+        Get a player's rows, optionally for one season
+
+        Args:
+            player_name: Player name
+            season: Season label (needs a 'Season' column; None = any season)
+
+        Returns:
+            Matching rows (latest season first when the frame has seasons),
+            with fixed-point percentile and composite columns decoded
+        """
+        rows = np.flatnonzero(self.pool.column('Player') == player_name)
+        if self.pool.has_column('Season'):
+            seasons = self.pool.column('Season')[rows]
+            if season is not None:
+                rows = rows[seasons == season]
+            else:
+                rows = rows[pd.Series(seasons).sort_values(ascending=False, kind='stable').index.to_numpy()]
+        return self.pool.frame(rows)
+
+    @instrument('calculate_similarity')
     def calculate_similarity(
         self,
         reference_player_name: str,
@@ -39,7 +108,10 @@ class SimilarityScorer:
         age_range: Tuple[int, int] = (15, 40),
         league_weights: Dict[str, float] = None,
         same_position_only: bool = True,
-        top_n: int = 30
+        top_n: int = 30,
+        candidate_constraints=None,
+        filter_expression: str = None,
+        reference_season: str = None
     ) -> pd.DataFrame:
         """
         Find most similar players to reference player
@@ -52,38 +124,52 @@ class SimilarityScorer:
             league_weights: Dictionary of {league: multiplier} for weighting leagues
             same_position_only: If True, only compare to players in same position
             top_n: Number of top similar players to return
+            candidate_constraints: Threshold constraints restricting the candidate pool
+                (text like "Age <= 24 and Aerial duels won, % >= 65" or list of tuples)
+            filter_expression: Filter expression restricting the candidate pool
+                (see utils/filter_dsl.py)
+            reference_season: Season of the reference player's profile when the
+                data spans several seasons (default: their latest season)
 
         Returns:
             DataFrame with top N similar players and similarity scores
         """
         # STEP 1: Get reference player
-        ref_player = self.df[self.df['Player'] == reference_player_name]
+        ref_player = self._player_rows(reference_player_name, reference_season)
         if len(ref_player) == 0:
-            raise ValueError(f"Player '{reference_player_name}' not found")
+            season_note = f" in season {reference_season}" if reference_season is not None else ""
+            raise PlayerNotFoundError(f"Player '{reference_player_name}' not found{season_note}")
         ref_player = ref_player.iloc[0]
 
         # STEP 2: Apply filters to candidate pool
-        candidates = self.df.copy()
+        # (every filter is a boolean mask over the pool's rows; nothing is copied)
+        pool = self.pool
+        keep = pool.column('Player') != reference_player_name
+
+        # Threshold constraints (resolved through the sorted column index)
+        if candidate_constraints:
+            keep &= constraint_mask(self.df, candidate_constraints)
 
-        # Exclude reference player from candidates
-        candidates = candidates[candidates['Player'] != reference_player_name]
+        # Filter expression (compiled once, evaluated as a single numpy mask)
+        if filter_expression:
+            keep &= compile_filter(filter_expression).mask(self.df)
 
         # Minutes filter (if Minutes column exists)
-        if 'Minutes' in candidates.columns:
-            candidates = candidates[candidates['Minutes'] >= min_minutes]
+        if pool.has_column('Minutes'):
+            keep &= pool.numeric('Minutes') >= min_minutes
 
         # Age filter
-        if 'Age' in candidates.columns:
+        if pool.has_column('Age'):
             min_age, max_age = age_range
-            candidates = candidates[(candidates['Age'] >= min_age) &
-                                  (candidates['Age'] <= max_age)]
+            ages = pool.numeric('Age')
+            keep &= (ages >= min_age) & (ages <= max_age)
 
         # Same position filter
-        if same_position_only and 'Position' in candidates.columns:
-            ref_position = ref_player['Position']
-            candidates = candidates[candidates['Position'] == ref_position]
+        if same_position_only and pool.has_column('Position'):
+            keep &= pool.column('Position') == ref_player['Position']
 
-        if len(candidates) == 0:
+        candidate_rows = np.flatnonzero(keep)
+        if len(candidate_rows) == 0:
             # Return empty dataframe with expected columns
             return pd.DataFrame(columns=[
                 'Rank', 'Player', 'Team', 'Position', 'Age',
@@ -92,7 +178,7 @@ class SimilarityScorer:
 
         # STEP 3: Filter weights to only valid metrics
         valid_weights = {k: v for k, v in weights.items()
-                        if k in self.all_selectable_columns and k in candidates.columns}
+                        if k in self.all_selectable_columns and pool.has_column(k)}
 
         if not valid_weights:
             raise ValueError("No valid metrics found for similarity calculation")
@@ -104,24 +190,22 @@ class SimilarityScorer:
         # STEP 4: Calculate weighted similarity
         metric_names = list(normalized_weights.keys())
 
-        # Extract and normalize metric values
-        ref_vector = []
-        candidate_vectors = []
+        # Extract and normalize metric values (one candidate column at a time)
+        ref_vector = np.empty(len(metric_names))
+        candidate_matrix = np.empty((len(candidate_rows), len(metric_names)))
 
-        for metric in metric_names:
+        for j, metric in enumerate(metric_names):
             # Get values
             ref_val = ref_player[metric]
-            cand_vals = candidates[metric].values
+            cand_vals = np.nan_to_num(pool.numeric(metric)[candidate_rows])
 
             # Handle NaN
             if pd.isna(ref_val):
                 ref_val = 0
-            cand_vals = np.nan_to_num(cand_vals, 0)
 
             # Normalize to 0-100 scale for consistency
-            all_vals = np.append(cand_vals, ref_val)
-            val_min = all_vals.min()
-            val_max = all_vals.max()
+            val_min = min(cand_vals.min(), ref_val)
+            val_max = max(cand_vals.max(), ref_val)
 
             if val_max == val_min:
                 ref_normalized = 50.0
@@ -137,39 +221,35 @@ class SimilarityScorer:
 
             # Apply weight
             weight = normalized_weights[metric]
-            ref_vector.append(ref_normalized * weight)
-            candidate_vectors.append(cand_normalized * weight)
-
-        # Convert to numpy arrays
-        ref_vector = np.array(ref_vector).reshape(1, -1)
-        candidate_matrix = np.array(candidate_vectors).T
+            ref_vector[j] = ref_normalized * weight
+            candidate_matrix[:, j] = cand_normalized * weight
 
         # Calculate cosine similarity
-        similarities = cosine_similarity(ref_vector, candidate_matrix)[0]
+        similarities = cosine_similarity(ref_vector, candidate_matrix)
 
         # STEP 5: Apply league weights if provided
-        if league_weights and 'League' in candidates.columns:
-            league_multipliers = candidates['League'].map(league_weights).fillna(1.0).values
-            similarities = similarities * league_multipliers
+        if league_weights and pool.has_column('League'):
+            leagues = pd.Series(pool.column('League')[candidate_rows], copy=False)
+            similarities = similarities * leagues.map(league_weights).fillna(1.0).to_numpy()
 
-        # STEP 6: Add similarity scores to candidates
-        candidates = candidates.copy()
-        candidates['Similarity_Score'] = similarities
+        # STEP 6: Sort and keep the top N (NaN scores last)
+        top = np.argsort(-similarities, kind='stable')[:top_n]
+        top_scores = similarities[top]
 
         # Calculate percentile (avoid division by zero)
         max_sim = similarities.max()
         if max_sim > 0:
-            candidates['Similarity_Percentile'] = similarities / max_sim * 100
+            top_percentiles = top_scores / max_sim * 100
         else:
-            candidates['Similarity_Percentile'] = 50.0
-
-        # STEP 7: Sort and return top N
-        result = candidates.sort_values('Similarity_Score', ascending=False).head(top_n)
-        result['Rank'] = range(1, len(result) + 1)
+            top_percentiles = np.full(len(top), 50.0)
 
-        # Select relevant columns
-        display_cols = ['Rank', 'Player', 'Team', 'Position', 'Age',
+        # STEP 7: Materialize only the displayed rows
+        display_cols = ['Rank', 'Player', 'Team', 'Season', 'Position', 'Age',
                        'Similarity_Score', 'Similarity_Percentile'] + metric_names
+        result = pool.frame(candidate_rows[top], [col for col in display_cols if pool.has_column(col)])
+        result['Similarity_Score'] = top_scores
+        result['Similarity_Percentile'] = top_percentiles
+        result['Rank'] = range(1, len(result) + 1)
 
         # Filter to only existing columns
         display_cols = [col for col in display_cols if col in result.columns]
@@ -180,7 +260,9 @@ class SimilarityScorer:
         self,
         reference_player_name: str,
         similar_player_name: str,
-        weights: Dict[str, float]
+        weights: Dict[str, float],
+        reference_season: str = None,
+        similar_season: str = None
     ) -> Dict[str, Dict]:
         """
         Get detailed metric breakdown for why two players are similar
@@ -189,17 +271,19 @@ class SimilarityScorer:
             reference_player_name: Reference player
             similar_player_name: Player to compare to
             weights: Metric weights used
+            reference_season: Season of the reference player's row (default: latest)
+            similar_season: Season of the similar player's row (default: latest)
 
         Returns:
             Dictionary with metric-by-metric comparison
         """
-        ref_player = self.df[self.df['Player'] == reference_player_name].iloc[0]
-        sim_player = self.df[self.df['Player'] == similar_player_name].iloc[0]
+        ref_player = self._player_rows(reference_player_name, reference_season).iloc[0]
+        sim_player = self._player_rows(similar_player_name, similar_season).iloc[0]
 
         contributions = {}
 
         for metric, weight in weights.items():
-            if metric not in self.stat_columns or metric not in self.df.columns:
+            if metric not in self.stat_columns or not self.pool.has_column(metric):
                 continue
 
             ref_val = ref_player[metric]
@@ -215,7 +299,8 @@ class SimilarityScorer:
             diff = abs(ref_val - sim_val)
 
             # Calculate similarity for this metric (1 - normalized difference)
-            max_diff = self.df[metric].max() - self.df[metric].min()
+            metric_values = self.pool.numeric(metric)
+            max_diff = np.nanmax(metric_values) - np.nanmin(metric_values)
             if max_diff > 0:
                 metric_similarity = 1 - (diff / max_diff)
             else:
@@ -240,7 +325,9 @@ class SimilarityScorer:
         reference_player_name: str,
         similar_player_name: str,
         weights: Dict[str, float],
-        composite_attributes: Dict
+        composite_attributes: Dict,
+        reference_season: str = None,
+        similar_season: str = None
     ) -> Dict[str, Dict]:
         """
         Get detailed composite attribute breakdown for similarity comparison
@@ -252,6 +339,8 @@ class SimilarityScorer:
             similar_player_name: Player to compare against
             weights: Metric weights dict (should include COMP_* keys)
             composite_attributes: COMPOSITE_ATTRIBUTES config from config/composite_attributes.py
+            reference_season: Season of the reference player's row (default: latest)
+            similar_season: Season of the similar player's row (default: latest)
 
         Returns:
             Dictionary with composite-by-composite comparison:
@@ -269,13 +358,13 @@ class SimilarityScorer:
             }
         """
         # STEP 1: Get both players from DataFrame
-        ref_player = self.df[self.df['Player'] == reference_player_name]
-        sim_player = self.df[self.df['Player'] == similar_player_name]
+        ref_player = self._player_rows(reference_player_name, reference_season)
+        sim_player = self._player_rows(similar_player_name, similar_season)
 
         if len(ref_player) == 0:
-            raise ValueError(f"Reference player '{reference_player_name}' not found")
+            raise PlayerNotFoundError(f"Reference player '{reference_player_name}' not found")
         if len(sim_player) == 0:
-            raise ValueError(f"Similar player '{similar_player_name}' not found")
+            raise PlayerNotFoundError(f"Similar player '{similar_player_name}' not found")
 
         ref_player = ref_player.iloc[0]
         sim_player = sim_player.iloc[0]
@@ -294,7 +383,7 @@ class SimilarityScorer:
             attr_key = comp_col.replace('COMP_', '')
 
             # Verify column exists in DataFrame
-            if comp_col not in self.df.columns:
+            if not self.pool.has_column(comp_col):
                 continue
 
             # Get values for both players
@@ -312,7 +401,8 @@ class SimilarityScorer:
 
             # Calculate metric similarity (1 - normalized difference)
             # PATTERN: Same as get_metric_contributions() lines 218-222
-            max_diff = self.df[comp_col].max() - self.df[comp_col].min()
+            comp_values = self.pool.numeric(comp_col)
+            max_diff = np.nanmax(comp_values) - np.nanmin(comp_values)
             if max_diff > 0:
                 metric_similarity = 1 - (diff / max_diff)
             else:
@@ -0,0 +1,167 @@
+"""
+Zero-copy access to the rows of a player pool
+
+Scorers used to copy the pool frame (and copy it again per filtering step)
+before reading a handful of its columns. A PoolView instead holds the pool's
+row positions in the dataset's ColumnStore and hands out read-only numpy
+arrays of just the columns a scorer reads: for the global frame these are the
+store's own arrays, for a filtered pool one gathered column each (cached per
+view). Filters become boolean masks over the view, and only the final top-N
+rows are materialized as a DataFrame (PoolView.frame).
+
+Views are built from frames whose rows come from the store unchanged (global
+frames, filter_players results, ScoutingSession pools). Columns a frame has
+on top of the store, and values replaced for a cohort, are passed as overrides.
+"""
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from utils.column_store import ColumnStore, get_column_store
+from utils.quantized_block import decode_frame
+
+
+def _read_only(values: np.ndarray) -> np.ndarray:
+    """Return a read-only view, so callers cannot write through to shared columns"""
+    values = values.view()
+    values.flags.writeable = False
+    return values
+
+
+class PoolView:
+    """
+    Row positions of a pool in a ColumnStore plus read-only column arrays
+    """
+
+    def __init__(self, store: ColumnStore, positions: np.ndarray = None,
+                 overrides: Dict[str, np.ndarray] = None):
+        """
+        Args:
+            store: ColumnStore of the dataset
+            positions: Stored row positions of the pool, in pool order (None = every row)
+            overrides: Column arrays aligned with the pool rows, read instead of
+                (or in addition to) the stored columns
+        """
+        self.store = store
+        self._full = positions is None
+        self.positions = _read_only(np.arange(store.n_rows) if positions is None else np.asarray(positions))
+        self._overrides = {name: _read_only(np.asarray(values)) for name, values in (overrides or {}).items()}
+        self._columns: Dict[str, np.ndarray] = {}
+        self._numeric: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, overrides: Dict[str, np.ndarray] = None) -> 'PoolView':
+        """
+        Get the view of a global or filtered frame
+
+        Args:
+            df: Player DataFrame whose rows come from a registered dataset
+            overrides: Column arrays aligned with the rows of ``df`` (see __init__)
+
+        Returns:
+            PoolView over the rows of ``df``, in frame order
+        """
+        store = get_column_store(df)
+        overrides = dict(overrides or {})
+        # Columns added to the frame after loading are read from the frame itself
+        for name in df.columns:
+            if name not in overrides and not store.has_column(name):
+                overrides[name] = df[name].to_numpy()
+        # Unfiltered frames (the global frame or a shallow copy of it) read the stored arrays directly
+        full = df is store.df or (len(df) == store.n_rows and df.index.equals(store.index))
+        return cls(store, None if full else store.positions(df), overrides)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def has_column(self, name: str) -> bool:
+        """Check whether the pool has a column"""
+        return name in self._overrides or self.store.has_column(name)
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Get a column of the pool rows as a read-only array
+
+        Args:
+            name: Column name
+
+        Returns:
+            Array with one value per pool row
+
+        Raises:
+            KeyError: If the column does not exist
+        """
+        if name in self._overrides:
+            return self._overrides[name]
+        values = self._columns.get(name)
+        if values is None:
+            values = self.store.column(name)
+            if not self._full:
+                values = _read_only(values[self.positions])
+            self._columns[name] = values
+        return values
+
+    def numeric(self, name: str) -> np.ndarray:
+        """
+        Get a column of the pool rows as a read-only float64 array
+
+        Non-numeric values become NaN and fixed-point percentile and composite
+        codes are decoded (see ColumnStore.numeric_column).
+
+        Args:
+            name: Column name
+
+        Returns:
+            Float array with one value per pool row
+
+        Raises:
+            KeyError: If the column does not exist
+        """
+        if name in self._overrides:
+            return self._overrides[name].astype(np.float64, copy=False)
+        values = self._numeric.get(name)
+        if values is None:
+            values = self.store.numeric_column(name)
+            if not self._full:
+                values = _read_only(values[self.positions])
+            self._numeric[name] = values
+        return values
+
+    def subset(self, rows: np.ndarray) -> 'PoolView':
+        """
+        Narrow the view to some of its rows
+
+        Args:
+            rows: Boolean mask or positions within this view
+
+        Returns:
+            New PoolView over the selected rows (same store, no columns copied)
+        """
+        overrides = {name: values[rows] for name, values in self._overrides.items()}
+        return PoolView(self.store, self.positions[rows], overrides)
+
+    def frame(self, rows: np.ndarray = None, columns: List[str] = None) -> pd.DataFrame:
+        """
+        Materialize pool rows as a DataFrame (meant for the few rows that are displayed)
+
+        Args:
+            rows: Positions within this view, in output order (None = every row)
+            columns: Columns to include, in order (None = every stored column
+                followed by the overrides); missing columns are skipped
+
+        Returns:
+            DataFrame with the rows' global index labels and fixed-point
+            columns decoded to floats
+        """
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows)
+        if columns is None:
+            columns = list(self.store.df.columns) + [c for c in self._overrides if not self.store.has_column(c)]
+        columns = [col for col in columns if self.has_column(col)]
+
+        stored = [col for col in columns if col not in self._overrides]
+        df = self.store.df.iloc[self.positions[rows]][stored]
+        for col in columns:
+            if col in self._overrides:
+                df[col] = self._overrides[col][rows]
+        return decode_frame(df[columns])
@@ -0,0 +1,177 @@
+"""
+Preset scoring for the Player Finder
+Weighted, UI-free scoring of players against position presets
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, Tuple
+from utils.filter_dsl import compile_filter
+from utils.instrumentation import instrument
+from utils.pool_view import PoolView
+
+
+def _nan_range(values: np.ndarray) -> Tuple[float, float]:
+    """Minimum and maximum ignoring NaN (NaN for an empty or all-NaN column, like pandas)"""
+    valid = values[~np.isnan(values)]
+    if len(valid) == 0:
+        return np.nan, np.nan
+    return valid.min(), valid.max()
+
+
+class DefenderScorer:
+    """Calculate weighted scores for defender presets"""
+
+    def __init__(self, presets: Dict):
+        """
+        Args:
+            presets: DEFENDER_PRESETS dictionary
+        """
+        self.presets = presets
+        self.negative_metrics = [
+            'Fouls per 90',
+            'Cards per 90',
+            'Conceded goals per 90'
+        ]  # Metrics where lower is better
+
+    @instrument('calculate_preset_score')
+    def calculate_preset_score(
+        self,
+        df: pd.DataFrame,
+        preset_name: str,
+        top_n_limit: int = 30,
+        filter_expression: str = None
+    ) -> Tuple[pd.DataFrame, Dict[str, float]]:
+        """
+        Calculate weighted score for all players using preset
+
+        Args:
+            df: DataFrame with player data
+            preset_name: Key from DEFENDER_PRESETS
+            top_n_limit: Return only top N players
+            filter_expression: Filter expression applied before scoring
+                (see utils/filter_dsl.py)
+
+        Returns:
+            (result_df, normalized_weights)
+        """
+        # Scores are computed over read-only column views; only the top N rows are materialized
+        pool = PoolView.from_frame(df)
+        if filter_expression:
+            pool = pool.subset(compile_filter(filter_expression).mask(df))
+
+        preset = self.presets[preset_name]
+        components = preset['components']
+
+        # Extract weights and validate metrics exist
+        weights = {}
+        for comp in components:
+            metric = comp['stat']
+            if not pool.has_column(metric):
+                raise ValueError(f"Metric '{metric}' not found in dataframe")
+            weights[metric] = comp['weight']
+
+        # Normalize weights to sum to 1.0
+        total_weight = sum(abs(w) for w in weights.values())
+        normalized_weights = {k: v/total_weight for k, v in weights.items()}
+
+        # Calculate normalized scores (0-100 scale)
+        weighted_scores = np.zeros(len(pool))
+
+        for metric, weight in normalized_weights.items():
+            col_values = pool.numeric(metric)
+            col_min, col_max = _nan_range(col_values)
+
+            if col_max == col_min:
+                normalized_values = np.full(len(pool), 50.0)
+            else:
+                # Normalize to 0-100 scale
+                if metric in self.negative_metrics and weight < 0:
+                    # Negative metric with negative weight: invert normalization
+                    normalized_values = 100 - ((col_values - col_min) / (col_max - col_min) * 100)
+                else:
+                    normalized_values = (col_values - col_min) / (col_max - col_min) * 100
+
+            # Add weighted contribution
+            weighted_scores += normalized_values * abs(weight)
+
+        # Sort by score (descending, NaN scores last) and keep the top N
+        score_column = f'{preset_name.replace(" ", "_")}_Score'
+        percentile_column = f'{score_column}_Percentile'
+        top = np.argsort(-weighted_scores, kind='stable')[:top_n_limit]
+
+        # Percentile rank within the whole pool
+        percentiles = pd.Series(weighted_scores, copy=False).rank(pct=True).to_numpy() * 100
+
+        # Select relevant columns
+        display_cols = [
+            'Rank', 'Player', 'Team', 'Season', 'Position', 'Age',
+            score_column, percentile_column
+        ] + list(normalized_weights.keys())
+
+        top_players = pool.frame(top, [col for col in display_cols if pool.has_column(col)])
+        top_players[score_column] = weighted_scores[top]
+        top_players[percentile_column] = percentiles[top]
+        top_players['Rank'] = range(1, len(top_players) + 1)
+
+        # Filter to only include columns that exist
+        display_cols = [col for col in display_cols if col in top_players.columns]
+
+        return top_players[display_cols].reset_index(drop=True), normalized_weights
+
+    def get_metric_contributions(
+        self,
+        df: pd.DataFrame,
+        player_idx: int,
+        preset_name: str
+    ) -> Dict[str, Dict]:
+        """
+        Get individual metric contributions to a player's total score
+
+        Args:
+            df: DataFrame with player data
+            player_idx: Index of player in dataframe
+            preset_name: Key from DEFENDER_PRESETS
+
+        Returns:
+            Dictionary of metric contributions
+        """
+        preset = self.presets[preset_name]
+        components = preset['components']
+
+        # Extract weights
+        weights = {}
+        for comp in components:
+            metric = comp['stat']
+            weights[metric] = comp['weight']
+
+        # Normalize weights
+        total_weight = sum(abs(w) for w in weights.values())
+        normalized_weights = {k: v/total_weight for k, v in weights.items()}
+
+        contributions = {}
+        for metric, weight in normalized_weights.items():
+            if metric in df.columns:
+                col_values = df[metric]
+                col_min = col_values.min()
+                col_max = col_values.max()
+                player_value = df.loc[player_idx, metric]
+
+                if col_max == col_min:
+                    normalized_value = 50.0
+                else:
+                    if metric in self.negative_metrics and weight < 0:
+                        normalized_value = 100 - ((player_value - col_min) / (col_max - col_min) * 100)
+                    else:
+                        normalized_value = (player_value - col_min) / (col_max - col_min) * 100
+
+                    # Clamp to 0-100
+                    normalized_value = max(0, min(100, normalized_value))
+
+                contributions[metric] = {
+                    'raw_value': player_value,
+                    'normalized_score': normalized_value,
+                    'weight': weight,
+                    'weighted_contribution': normalized_value * abs(weight)
+                }
+
+        return contributions
@@ -0,0 +1,172 @@
+"""
+Background loading of the league files with partial datasets per league
+
+The loader thread parses the league files one league at a time (all of a
+league's def/mid/fwd files, named ``<League>.csv``) and publishes a ranked
+snapshot as leagues complete, so the app can serve the leagues that are ready
+while the rest are still parsing. Every partial snapshot re-ranks all loaded
+rows, so snapshots are published when the loaded rows have grown by
+PARTIAL_GROWTH (the first league is published right away). Percentiles of a partial snapshot are ranked
+over the loaded leagues only; the final snapshot is identical to
+prepare_data_global (same row order, dataset version and precomputed cohorts).
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List
+
+import pandas as pd
+
+from utils.column_store import DATASET_VERSION_ATTR, compute_file_version
+
+# A partial snapshot is re-ranked only once the loaded rows grew by this factor,
+# so publishing costs a bounded multiple of one full ranking
+PARTIAL_GROWTH = 1.5
+
+
+class ProgressiveLoader:
+    """
+    Loads a data folder in a background thread and publishes partial snapshots
+    """
+
+    def __init__(self, data_folder: str, stat_categories: Dict):
+        """
+        Args:
+            data_folder: Path to the folder containing the def/mid/fwd subfolders
+            stat_categories: Dictionary of stat categories
+        """
+        from utils.data_loader import get_league_files
+
+        self.data_folder = data_folder
+        self.stat_categories = stat_categories
+        self.csv_files = get_league_files(data_folder)
+
+        # Files grouped by league (file name), so each league becomes complete as early as possible
+        self.files_by_league = OrderedDict()
+        for csv_path in sorted(self.csv_files, key=lambda path: os.path.basename(path).lower()):
+            league = os.path.splitext(os.path.basename(csv_path))[0]
+            self.files_by_league.setdefault(league, []).append(csv_path)
+
+        self.pending_leagues = list(self.files_by_league)
+        self.loaded_leagues = []
+        self.errors = []
+        self.error = None
+        self.complete = False
+        self.generation = 0
+        self.started = None
+        self.finished = None
+        self._snapshot = None
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='league-loader', daemon=True)
+
+    def start(self) -> 'ProgressiveLoader':
+        """Start the loader thread (returns self)"""
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def snapshot(self) -> pd.DataFrame:
+        """Latest published dataset (None until the first league is ready)"""
+        with self._condition:
+            return self._snapshot
+
+    def status(self) -> Dict:
+        """
+        Get the loading progress
+
+        Returns:
+            Dictionary with 'generation', 'complete', 'loaded' (league names
+            found in the data), 'pending' (league files still to parse),
+            'rows', 'errors', 'error' and 'seconds'
+        """
+        with self._condition:
+            end = self.finished if self.finished is not None else time.perf_counter()
+            return {
+                'generation': self.generation,
+                'complete': self.complete,
+                'loaded': list(self.loaded_leagues),
+                'pending': list(self.pending_leagues),
+                'rows': 0 if self._snapshot is None else len(self._snapshot),
+                'errors': list(self.errors),
+                'error': self.error,
+                'seconds': end - self.started if self.started is not None else 0.0
+            }
+
+    def wait(self, generation: int, timeout: float = None) -> bool:
+        """
+        Wait for a snapshot newer than ``generation`` (or the end of loading)
+
+        Args:
+            generation: Generation the caller has already seen
+            timeout: Maximum seconds to wait (None = no limit)
+
+        Returns:
+            True if there is something new, False on timeout
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self.generation > generation or self.complete or self.error is not None,
+                timeout
+            )
+
+    def _publish(self, df: pd.DataFrame, loaded_leagues: List[str], complete: bool = False):
+        with self._condition:
+            self._snapshot = df
+            self.loaded_leagues = loaded_leagues
+            self.generation += 1
+            if complete:
+                self.complete = True
+                self.finished = time.perf_counter()
+            self._condition.notify_all()
+
+    def _run(self):
+        from utils.data_loader import load_league_file
+
+        frames = {}
+        published_rows = 0
+        try:
+            if not self.csv_files:
+                raise ValueError(f"No CSV files found in {self.data_folder}")
+
+            leagues = list(self.files_by_league.items())
+            for i, (league, paths) in enumerate(leagues):
+                for csv_path in paths:
+                    try:
+                        frames[csv_path] = load_league_file(csv_path)
+                    except Exception as e:
+                        with self._condition:
+                            self.errors.append(f"{os.path.basename(csv_path)}: {str(e)}")
+                with self._condition:
+                    self.pending_leagues.remove(league)
+
+                # The last league goes straight to the final snapshot
+                loaded_rows = sum(len(df) for df in frames.values())
+                if loaded_rows > published_rows * PARTIAL_GROWTH and i < len(leagues) - 1:
+                    self._publish(*self._prepare(frames, list(frames), rank_cohorts=False))
+                    published_rows = loaded_rows
+
+            if not frames:
+                raise ValueError(f"Failed to load any CSV files. Errors: {'; '.join(self.errors)}")
+
+            # Same file order as load_all_league_data, so row labels match prepare_data_global
+            ordered = {path: frames[path] for path in self.csv_files if path in frames}
+            self._publish(*self._prepare(ordered, self.csv_files, rank_cohorts=True), complete=True)
+        except Exception as e:
+            with self._condition:
+                self.error = str(e)
+                self.finished = time.perf_counter()
+                self._condition.notify_all()
+
+        if self.errors:
+            print(f"Warning: Some files failed to load:\n" + "\n".join(self.errors))
+
+    def _prepare(self, frames: Dict[str, pd.DataFrame], version_files: List[str], rank_cohorts: bool):
+        """Combine and rank the loaded files, returning (frame, league names)"""
+        from utils.data_loader import prepare_loaded_data
+
+        df = pd.concat(list(frames.values()), ignore_index=True)
+        # Versioned like load_all_league_data: by every file of the folder once all are read
+        df.attrs[DATASET_VERSION_ATTR] = compute_file_version(version_files)
+        df = prepare_loaded_data(df, self.stat_categories, rank_cohorts=rank_cohorts)
+        return df, sorted(df['League'].dropna().unique())
@@ -0,0 +1,195 @@
+"""
+Mergeable quantile sketches for sharded percentile calculation
+
+Exact global percentiles need every row in one place. When preprocessing is
+sharded (by league or season, across processes or machines), each shard
+instead summarizes every stat in a QuantileSketch, the coordinator merges the
+shards' sketches, and every shard ranks its own rows against the merged
+sketches:
+
+    sketches = [build_sketches(shard_df, stat_columns) for shard_df in shards]   # on each shard
+    merged = merge_sketches(sketches)                                              # on the coordinator
+    shard_df = calculate_percentiles(shard_df, stat_columns, sketches=merged)     # on each shard
+
+A sketch keeps every ``step``-th value of a shard's sorted column (the middle
+of each block of ``step`` values) with the block's size as its weight, so it
+holds at most ``max_points`` values. Ranks are estimated like
+``rank(pct=True)``: the average rank of a value is
+``(less + less_or_equal + 1) / 2``, where both counts are weight sums.
+
+Error bound: only the block containing a value can be miscounted, so each
+count is off by at most that shard's ``step`` (= ceil(shard rows / max_points)).
+The merged estimate is off by at most the sum of the shards' steps, tracked in
+``QuantileSketch.max_rank_error``:
+
+    |estimated percentile - exact percentile| <= 100 * max_rank_error / rows
+                                              ~= 100 * (1 / max_points + shards / rows)
+
+With the default 2048 points that is at most about 0.05 percentile points
+plus 100 * shards / rows. Shards with fewer rows than ``max_points`` are kept
+whole and add no error. Compressing a merged sketch (``max_points`` in
+merge_sketches) adds the new step to the bound.
+
+The sketches are deterministic array summaries (a one-pass, batch form of the
+KLL/GK compactors): mergeable in any order, picklable for process pools.
+"""
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+# Values kept per stat and shard (bounds the rank error at rows / SKETCH_POINTS per shard)
+SKETCH_POINTS = 2048
+
+
+class QuantileSketch:
+    """
+    Weighted sample of a column's sorted values with a tracked rank error bound
+    """
+
+    def __init__(self, values: np.ndarray, weights: np.ndarray, max_rank_error: int = 0):
+        """
+        Args:
+            values: Sorted sample values (no NaN)
+            weights: Number of rows each value stands for
+            max_rank_error: Bound on the error of estimated row counts
+        """
+        self.values = values
+        self.weights = weights
+        self.count = int(weights.sum())
+        self.max_rank_error = int(max_rank_error)
+        self._cumulative = np.concatenate([[0], np.cumsum(weights)])
+
+    @classmethod
+    def from_values(cls, values: np.ndarray, max_points: int = SKETCH_POINTS) -> 'QuantileSketch':
+        """
+        Summarize one column of a shard
+
+        Args:
+            values: Column values (NaN values are skipped)
+            max_points: Maximum number of kept values
+
+        Returns:
+            QuantileSketch of the column
+        """
+        values = np.asarray(values, dtype=np.float64)
+        return cls._from_sorted(np.sort(values[~np.isnan(values)]), None, max_points, 0)
+
+    @classmethod
+    def _from_sorted(cls, values: np.ndarray, weights, max_points: int, error: int) -> 'QuantileSketch':
+        """Keep the middle value of every block of ``step`` rows (by cumulative weight)"""
+        if weights is None:
+            weights = np.ones(len(values), dtype=np.int64)
+        count = int(weights.sum())
+        if len(values) <= max_points:
+            return cls(values, weights, error)
+
+        step = -(-count // max_points)
+        cumulative = np.cumsum(weights)
+        # Block b covers rows [b * step, (b + 1) * step); its representative is its middle row
+        block_ends = np.minimum(np.arange(1, -(-count // step) + 1) * step, count)
+        block_starts = np.concatenate([[0], block_ends[:-1]])
+        middles = np.searchsorted(cumulative, (block_starts + block_ends) // 2, side='right')
+        return cls(values[middles], np.diff(np.concatenate([[0], block_ends])), error + step)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def compress(self, max_points: int) -> 'QuantileSketch':
+        """
+        Shrink the sketch to at most ``max_points`` values (adds one step to the error bound)
+
+        Args:
+            max_points: Maximum number of kept values
+
+        Returns:
+            Compressed sketch (self if it is already small enough)
+        """
+        if len(self.values) <= max_points:
+            return self
+        return QuantileSketch._from_sorted(self.values, self.weights, max_points, self.max_rank_error)
+
+    @classmethod
+    def merge(cls, sketches: Iterable['QuantileSketch'], max_points: int = None) -> 'QuantileSketch':
+        """
+        Merge sketches of disjoint shards
+
+        Args:
+            sketches: Sketches of the same column
+            max_points: Compress the merged sketch to this many values (None = keep all)
+
+        Returns:
+            Sketch of the union of the shards
+        """
+        sketches = list(sketches)
+        values = np.concatenate([s.values for s in sketches]) if sketches else np.empty(0)
+        weights = np.concatenate([s.weights for s in sketches]) if sketches else np.empty(0, dtype=np.int64)
+        order = np.argsort(values, kind='stable')
+        merged = cls(values[order], weights[order], sum(s.max_rank_error for s in sketches))
+        return merged.compress(max_points) if max_points else merged
+
+    def percentiles(self, values: np.ndarray) -> np.ndarray:
+        """
+        Estimate percentile ranks (0-100, like ``rank(pct=True) * 100``) against the sketched rows
+
+        Args:
+            values: Values to rank (NaN gets a NaN rank)
+
+        Returns:
+            float64 array of estimated percentile ranks
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if self.count == 0:
+            return np.full(len(values), np.nan)
+        less = self._cumulative[np.searchsorted(self.values, values, side='left')]
+        less_or_equal = self._cumulative[np.searchsorted(self.values, values, side='right')]
+        ranks = (less + less_or_equal + 1) / 2 / self.count * 100
+        ranks[np.isnan(values)] = np.nan
+        return ranks
+
+    def error_bound(self) -> float:
+        """Maximum error of percentiles from this sketch, in percentile points"""
+        return 100.0 * self.max_rank_error / self.count if self.count else 0.0
+
+
+def build_sketches(df: pd.DataFrame, stat_columns: List[str],
+                   max_points: int = SKETCH_POINTS) -> Dict[str, QuantileSketch]:
+    """
+    Sketch every stat column of a shard
+
+    Args:
+        df: Shard's player DataFrame
+        stat_columns: Columns to sketch (missing columns are skipped)
+        max_points: Maximum number of kept values per column
+
+    Returns:
+        Dictionary of {column: QuantileSketch}
+    """
+    present = [col for col in dict.fromkeys(stat_columns) if col in df.columns]
+    values = df[present].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+    # One sort of the whole block; NaN values sort to the end of every column
+    values = np.sort(values, axis=0)
+    n_valid = (~np.isnan(values)).sum(axis=0)
+    return {
+        col: QuantileSketch._from_sorted(values[:n_valid[i], i], None, max_points, 0)
+        for i, col in enumerate(present)
+    }
+
+
+def merge_sketches(shard_sketches: Iterable[Dict[str, QuantileSketch]],
+                   max_points: int = None) -> Dict[str, QuantileSketch]:
+    """
+    Merge the sketches of several shards column by column
+
+    Args:
+        shard_sketches: One build_sketches result per shard
+        max_points: Compress every merged sketch to this many values (None = keep all)
+
+    Returns:
+        Dictionary of {column: merged QuantileSketch}
+    """
+    by_column = {}
+    for sketches in shard_sketches:
+        for col, sketch in sketches.items():
+            by_column.setdefault(col, []).append(sketch)
+    return {col: QuantileSketch.merge(sketches, max_points) for col, sketches in by_column.items()}
@@ -0,0 +1,240 @@
+"""
+Compact fixed-point storage of the percentile and composite blocks
+
+Every ``_percentile`` and ``COMP_*`` column is a float64 on a 0-100 scale, as
+wide as the raw stat it describes. In compact mode (prepare_loaded_data with
+``compact=True``, or ``SCOUTING_COMPACT_PERCENTILES=1``) they are kept as
+uint16 fixed-point codes instead, a quarter of the memory:
+
+    code = round((value + QUANTIZED_OFFSET) * QUANTIZED_SCALE)     (MISSING_CODE for NaN)
+
+That is 0.01 resolution over [-100, 555.34], which covers percentiles and
+composites with negative component weights. A column is quantized exactly when
+it is a percentile or composite column with dtype uint16, so the mode travels
+with the frame through filters, copies and concats.
+
+Floats are decoded lazily where they are needed: column_values and
+block_values for scorers and charts, decode_frame for the few rows that are
+displayed, and quantized_matmul for products over the whole block (the codes
+are cast to float32 one cache-sized chunk at a time, with the scale folded into
+the weights).
+"""
+import os
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+# Fixed-point encoding: 0.01 resolution, offset so negative composites stay representable
+QUANTIZED_SCALE = 100
+QUANTIZED_OFFSET = 100.0
+MISSING_CODE = np.iinfo(np.uint16).max
+
+# Representable range (the largest code is reserved for NaN)
+QUANTIZED_MIN = -QUANTIZED_OFFSET
+QUANTIZED_MAX = (MISSING_CODE - 1) / QUANTIZED_SCALE - QUANTIZED_OFFSET
+
+# Default storage mode of prepare_loaded_data
+COMPACT_STORAGE = os.environ.get('SCOUTING_COMPACT_PERCENTILES', '0') == '1'
+
+# Rows converted per step of quantized_matmul (a float32 chunk of ~100 columns stays in cache)
+MATMUL_CHUNK_ROWS = 2048
+
+# Code -> value tables, so decoding is one gather (NaN for MISSING_CODE)
+_DECODE_TABLES = {}
+
+
+def _decode_table(dtype) -> np.ndarray:
+    dtype = np.dtype(dtype)
+    table = _DECODE_TABLES.get(dtype)
+    if table is None:
+        table = (np.arange(MISSING_CODE + 1, dtype=np.float64) / QUANTIZED_SCALE - QUANTIZED_OFFSET).astype(dtype)
+        table[MISSING_CODE] = np.nan
+        table.flags.writeable = False
+        _DECODE_TABLES[dtype] = table
+    return table
+
+
+def is_block_column(name: str) -> bool:
+    """Check whether a column belongs to the percentile or composite block"""
+    return name.endswith('_percentile') or name.startswith('COMP_')
+
+
+def quantized_columns(df: pd.DataFrame) -> List[str]:
+    """
+    Get the columns of a frame stored as fixed-point codes
+
+    Args:
+        df: Player DataFrame
+
+    Returns:
+        Percentile and composite columns with uint16 dtype, in frame order
+    """
+    return [col for col, dtype in df.dtypes.items() if dtype == np.uint16 and is_block_column(col)]
+
+
+def is_quantized(df: pd.DataFrame, column: str) -> bool:
+    """Check whether one column of a frame is stored as fixed-point codes"""
+    return is_block_column(column) and df[column].dtype == np.uint16
+
+
+def encode(values: np.ndarray) -> np.ndarray:
+    """
+    Encode floats as fixed-point codes
+
+    Args:
+        values: Float array (NaN becomes MISSING_CODE)
+
+    Returns:
+        uint16 array of the same shape
+
+    Raises:
+        ValueError: If a value is outside [QUANTIZED_MIN, QUANTIZED_MAX]
+    """
+    values = np.asarray(values, dtype=np.float64)
+    missing = np.isnan(values)
+    if not missing.all():
+        low, high = np.nanmin(values), np.nanmax(values)
+        if low < QUANTIZED_MIN or high > QUANTIZED_MAX:
+            raise ValueError(f"Values [{low:.2f}, {high:.2f}] are outside the compact range "
+                             f"[{QUANTIZED_MIN:.2f}, {QUANTIZED_MAX:.2f}]")
+    codes = np.rint((np.where(missing, 0.0, values) + QUANTIZED_OFFSET) * QUANTIZED_SCALE).astype(np.uint16)
+    codes[missing] = MISSING_CODE
+    return codes
+
+
+def decode(codes: np.ndarray, dtype=np.float64) -> np.ndarray:
+    """
+    Decode fixed-point codes
+
+    Args:
+        codes: uint16 array
+        dtype: Float dtype of the result
+
+    Returns:
+        Float array of the same shape (NaN for MISSING_CODE)
+    """
+    return _decode_table(dtype)[codes]
+
+
+def column_values(df: pd.DataFrame, column: str, dtype=np.float64) -> np.ndarray:
+    """
+    Get a numeric column as floats, decoding fixed-point codes
+
+    Args:
+        df: Player DataFrame
+        column: Column name
+        dtype: Float dtype of the result
+
+    Returns:
+        Float array (non-numeric values become NaN)
+    """
+    series = df[column]
+    if series.dtype == np.uint16 and is_block_column(column):
+        return decode(series.to_numpy(), dtype)
+    return pd.to_numeric(series, errors='coerce').to_numpy(dtype=dtype, na_value=np.nan)
+
+
+def block_values(df: pd.DataFrame, columns: List[str], dtype=np.float64) -> np.ndarray:
+    """
+    Get several numeric columns as a float matrix, decoding fixed-point codes
+
+    Args:
+        df: Player DataFrame
+        columns: Column names
+        dtype: Float dtype of the result
+
+    Returns:
+        Float array (rows, columns)
+    """
+    values = np.empty((len(df), len(columns)), dtype=dtype)
+    for i, column in enumerate(columns):
+        values[:, i] = column_values(df, column, dtype)
+    return values
+
+
+def encode_frame(df: pd.DataFrame, columns: List[str] = None) -> pd.DataFrame:
+    """
+    Store block columns as fixed-point codes
+
+    Args:
+        df: Player DataFrame
+        columns: Columns to encode (default: every float percentile and composite column)
+
+    Returns:
+        Frame with the columns replaced by uint16 codes (other columns are shared, not copied)
+    """
+    if columns is None:
+        columns = [col for col, dtype in df.dtypes.items() if is_block_column(col) and dtype.kind == 'f']
+    if not columns:
+        return df
+    codes = pd.DataFrame(encode(df[columns].to_numpy(dtype=np.float64)), index=df.index, columns=columns,
+                         copy=False)
+    return _replace_columns(df, codes)
+
+
+def decode_frame(df: pd.DataFrame, columns: List[str] = None) -> pd.DataFrame:
+    """
+    Turn fixed-point columns back into floats (meant for the few rows that are displayed)
+
+    Args:
+        df: Player DataFrame
+        columns: Columns to decode (default: every quantized column)
+
+    Returns:
+        Frame with float64 block columns (``df`` itself if nothing is quantized)
+    """
+    if columns is None:
+        columns = quantized_columns(df)
+    else:
+        columns = [col for col in columns if col in df.columns and is_quantized(df, col)]
+    if not columns:
+        return df
+    floats = pd.DataFrame(decode(df[columns].to_numpy()), index=df.index, columns=columns, copy=False)
+    return _replace_columns(df, floats)
+
+
+def _replace_columns(df: pd.DataFrame, block_df: pd.DataFrame) -> pd.DataFrame:
+    """Swap columns for a block with the same names, keeping column order and attrs"""
+    attrs = dict(df.attrs)
+    order = list(df.columns)
+    combined = pd.concat([df.drop(columns=list(block_df.columns)), block_df], axis=1, copy=False)
+    if list(combined.columns) != order:
+        # Only when the block is not trailing (reordering copies the frame)
+        combined = combined[order]
+    combined.attrs.update(attrs)
+    return combined
+
+
+def quantized_matmul(codes: np.ndarray, weights: np.ndarray, fill_values: np.ndarray = None,
+                     chunk_rows: int = MATMUL_CHUNK_ROWS) -> np.ndarray:
+    """
+    Multiply a block of fixed-point codes by a float matrix
+
+    The scale and offset are folded into the weights, so every chunk of rows is
+    only cast to float32 and multiplied: the product streams the 2-byte codes
+    instead of a float64 block and runs on single-precision BLAS.
+
+    Args:
+        codes: uint16 array (rows, k)
+        weights: Float array (k, m)
+        fill_values: Per column value used for NaN codes (default: NaN codes give NaN)
+
+    Returns:
+        float64 array (rows, m)
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    scaled = (weights / QUANTIZED_SCALE).astype(np.float32)
+    offsets = -QUANTIZED_OFFSET * weights.sum(axis=0)
+    fill_codes = None if fill_values is None else encode(np.asarray(fill_values, dtype=np.float64))
+
+    result = np.empty((len(codes), weights.shape[1]))
+    for start in range(0, len(codes), chunk_rows):
+        chunk = codes[start:start + chunk_rows]
+        if fill_codes is not None:
+            chunk = np.where(chunk == MISSING_CODE, fill_codes, chunk).astype(np.float32)
+        else:
+            chunk = np.where(chunk == MISSING_CODE, np.float32(np.nan), chunk.astype(np.float32))
+        result[start:start + chunk_rows] = chunk @ scaled
+    result += offsets
+    return result
@@ -0,0 +1,387 @@
+"""
+Local HTTP query service for similarity, preset and percentile results
+
+The dataset is loaded once into a ScoutingSession (utils/scouting_api.py) and
+shared by a fixed pool of worker threads, so every request hits the same warm
+caches. Threads instead of processes keep a single copy of the data in memory;
+the heavy work is numpy/pandas code that runs vectorized per request.
+
+Endpoints (JSON in, JSON out; POST a JSON list to batch several queries):
+    GET  /health                     dataset size and version
+    GET  /stats                      per-endpoint latency histograms
+    GET|POST /similar                ?player=...&top_n=30&weights=COMP_Security=2;...
+    GET|POST /finder                 ?preset=...&leagues=Liga 1&top_n=30
+    GET  /player/{id}                ?cohort=league
+    POST /percentile                 {"stats": {...}, "cohort": "global", "league": ..., "position": ...}
+    GET  /trajectory                 ?player=...&columns=COMP_Security|Age (needs --store)
+    GET  /movers                     ?column=...&from_season=2024&to_season=2025&top_n=20&fallers=1
+    POST /batch                      {"queries": [{"type": "similar", ...}, {"type": "preset", ...}]}
+
+Errors are JSON {"error": ...}: 404 for unknown endpoints and players, 400 for
+invalid parameters, 500 for anything else (batch queries report errors per query).
+
+Usage:
+    python -m utils.query_service --data data/2025 --port 8765 --workers 4
+    python -m utils.query_service --store data/store --port 8765
+"""
+import argparse
+import json
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from utils.data_loader import PlayerNotFoundError
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+# Largest accepted request body
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+# Query string parameters parsed as lists and integers
+LIST_PARAMS = ['positions', 'leagues', 'seasons', 'columns']
+INT_PARAMS = ['top_n', 'min_minutes']
+BOOL_PARAMS = ['fallers']
+
+# Endpoint name -> ScoutingSession query type
+ENDPOINT_QUERY_TYPES = {
+    'similar': 'similar',
+    'finder': 'preset',
+    'player': 'profile',
+    'percentile': 'percentile',
+    'trajectory': 'trajectory',
+    'movers': 'movers'
+}
+
+
+class EndpointNotFoundError(Exception):
+    """Raised for an unknown endpoint or resource path (answered with 404)"""
+
+
+class LatencyHistogram:
+    """
+    Thread-safe per-endpoint latency histograms with fixed buckets
+    """
+
+    def __init__(self, buckets_ms: List[float] = None):
+        """
+        Args:
+            buckets_ms: Bucket upper bounds in milliseconds (default: LATENCY_BUCKETS_MS)
+        """
+        self.buckets_ms = list(buckets_ms or LATENCY_BUCKETS_MS)
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, endpoint: str, seconds: float, error: bool = False, items: int = 1):
+        """
+        Record one request
+
+        Args:
+            endpoint: Endpoint name
+            seconds: Wall time of the request
+            error: Whether the request failed
+            items: Number of queries in the request (batches count more than one)
+        """
+        ms = seconds * 1000
+        bucket = int(np.searchsorted(self.buckets_ms, ms, side='left'))
+        with self._lock:
+            entry = self._endpoints.get(endpoint)
+            if entry is None:
+                entry = {'counts': [0] * (len(self.buckets_ms) + 1), 'total_ms': 0.0,
+                         'max_ms': 0.0, 'errors': 0, 'items': 0}
+                self._endpoints[endpoint] = entry
+            entry['counts'][bucket] += 1
+            entry['total_ms'] += ms
+            entry['max_ms'] = max(entry['max_ms'], ms)
+            entry['errors'] += int(error)
+            entry['items'] += items
+
+    def _quantile(self, counts: List[int], q: float) -> float:
+        """Upper bound of the bucket holding quantile q (inf for the open bucket)"""
+        target = q * sum(counts)
+        cumulative = 0
+        for bound, count in zip(self.buckets_ms + [math.inf], counts):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return math.inf
+
+    def snapshot(self) -> Dict:
+        """
+        Summaries of every endpoint
+
+        Returns:
+            Dictionary of {endpoint: {'requests', 'errors', 'items', 'mean_ms', 'max_ms',
+            'p50_ms', 'p95_ms', 'p99_ms', 'buckets'}}; percentiles are bucket upper bounds
+            capped at the slowest request
+        """
+        labels = [f"<={bound}ms" for bound in self.buckets_ms] + [f">{self.buckets_ms[-1]}ms"]
+        with self._lock:
+            entries = {name: dict(entry, counts=list(entry['counts'])) for name, entry in self._endpoints.items()}
+
+        summary = {}
+        for name, entry in entries.items():
+            requests = sum(entry['counts'])
+            quantiles = {f"p{int(q * 100)}_ms": self._quantile(entry['counts'], q) for q in (0.5, 0.95, 0.99)}
+            summary[name] = {
+                'requests': requests,
+                'errors': entry['errors'],
+                'items': entry['items'],
+                'mean_ms': entry['total_ms'] / requests if requests else 0.0,
+                'max_ms': entry['max_ms'],
+                **{k: min(v, entry['max_ms']) for k, v in quantiles.items()},
+                'buckets': dict(zip(labels, entry['counts']))
+            }
+        return summary
+
+
+def to_jsonable(obj):
+    """
+    Convert query results to JSON-serializable values
+
+    DataFrames become lists of records; numpy scalars become Python numbers and
+    NaN becomes None (JSON has no NaN).
+    """
+    if isinstance(obj, pd.DataFrame):
+        return [to_jsonable(record) for record in obj.to_dict(orient='records')]
+    if isinstance(obj, dict):
+        return {str(k): to_jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [to_jsonable(v) for v in obj]
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float) and math.isnan(obj):
+        return None
+    return obj
+
+
+def parse_query_string(query_string: str) -> Dict:
+    """
+    Parse GET parameters into query keyword arguments
+
+    Args:
+        query_string: Raw URL query string
+
+    Returns:
+        Dictionary of keyword arguments (lists for LIST_PARAMS, ints for INT_PARAMS,
+        booleans for BOOL_PARAMS, a weights dictionary for 'weights')
+
+    Raises:
+        ValueError: If a number or the weights cannot be parsed
+    """
+    from utils.scout import parse_weights
+
+    params = {}
+    for key, values in parse_qs(query_string, keep_blank_values=False).items():
+        if key in LIST_PARAMS:
+            params[key] = [v for value in values for v in value.split('|') if v]
+        elif key in INT_PARAMS:
+            params[key] = int(values[-1])
+        elif key in BOOL_PARAMS:
+            params[key] = values[-1].lower() in ('1', 'true', 'yes')
+        elif key == 'weights':
+            params[key] = parse_weights(values[-1])
+        else:
+            params[key] = values[-1]
+    return params
+
+
+def _normalize_params(endpoint: str, params: Dict) -> Dict:
+    """Map endpoint parameters to ScoutingSession keyword arguments"""
+    params = dict(params)
+    if endpoint == 'finder' and 'preset' in params:
+        params['preset_name'] = params.pop('preset')
+    if endpoint == 'player' and 'player_id' in params:
+        params['player_id'] = int(params['player_id'])
+    return params
+
+
+class QueryServer(HTTPServer):
+    """
+    HTTP server that hands accepted connections to a fixed pool of worker threads
+    """
+
+    def __init__(self, address: Tuple[str, int], session, workers: int = 4):
+        """
+        Args:
+            address: (host, port) to bind (port 0 picks a free port)
+            session: ScoutingSession shared by all workers
+            workers: Number of worker threads
+        """
+        super().__init__(address, QueryRequestHandler)
+        self.session = session
+        self.latency = LatencyHistogram()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='query-worker')
+        self.verbose = False
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self._process_request_worker, request, client_address)
+
+    def _process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=True)
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """Routes requests to the shared ScoutingSession"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            raise ValueError(f"Request body larger than {MAX_BODY_BYTES} bytes")
+        if length == 0:
+            return None
+        return json.loads(self.rfile.read(length))
+
+    def _send_json(self, status: int, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, method: str):
+        start = time.perf_counter()
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split('/') if part]
+        endpoint = parts[0] if parts else ''
+        items = 1
+        status = 200
+
+        try:
+            body = self._read_body() if method == 'POST' else None
+            payload, items = self._dispatch(method, endpoint, parts, url.query, body)
+        except (EndpointNotFoundError, PlayerNotFoundError) as e:
+            status, payload = 404, {'error': str(e)}
+        except (ValueError, TypeError) as e:
+            status, payload = 400, {'error': str(e)}
+        except Exception as e:
+            status, payload = 500, {'error': f"{type(e).__name__}: {str(e)}"}
+
+        self._send_json(status, payload)
+        if endpoint in ENDPOINT_QUERY_TYPES or endpoint == 'batch':
+            self.server.latency.record(endpoint, time.perf_counter() - start, error=status >= 400, items=items)
+
+    def _dispatch(self, method: str, endpoint: str, parts: List[str], query_string: str, body):
+        """Run the request and return (payload, number of queries)"""
+        session = self.server.session
+
+        if endpoint == 'health' and method == 'GET':
+            return {
+                'status': 'ok',
+                'players': len(session.df),
+                'dataset_version': session.df.attrs.get('dataset_version')
+            }, 1
+        if endpoint == 'stats' and method == 'GET':
+            return self.server.latency.snapshot(), 1
+
+        if endpoint == 'batch' and method == 'POST':
+            queries = (body or {}).get('queries') if isinstance(body, dict) else body
+            if not isinstance(queries, list):
+                raise ValueError("Batch body must be a list of queries or {\"queries\": [...]}")
+            results = []
+            for _, result, error in session.run_queries(queries):
+                results.append({'error': error} if error is not None else {'result': to_jsonable(result)})
+            return {'results': results}, len(queries)
+
+        if endpoint not in ENDPOINT_QUERY_TYPES:
+            raise EndpointNotFoundError(f"Unknown endpoint '/{endpoint}'")
+
+        query_type = ENDPOINT_QUERY_TYPES[endpoint]
+        params = parse_query_string(query_string)
+        if endpoint == 'player':
+            if len(parts) != 2:
+                raise EndpointNotFoundError("Use /player/{id}")
+            params['player_id'] = parts[1]
+
+        # A JSON list is a batch of queries for this endpoint
+        if isinstance(body, list):
+            queries = [dict(params, **_normalize_params(endpoint, q), type=query_type) for q in body]
+            results = []
+            for _, result, error in session.run_queries(queries):
+                results.append({'error': error} if error is not None else {'result': to_jsonable(result)})
+            return {'results': results}, len(queries)
+
+        if isinstance(body, dict):
+            params.update(body)
+        query = dict(_normalize_params(endpoint, params), type=query_type)
+        return {'result': to_jsonable(session.run_query(query))}, 1
+
+
+def create_server(session, host: str = '127.0.0.1', port: int = 8765, workers: int = 4) -> QueryServer:
+    """
+    Create (but do not start) a query server
+
+    Args:
+        session: ScoutingSession shared by all workers
+        host: Interface to bind (localhost by default)
+        port: Port to bind (0 picks a free port)
+        workers: Number of worker threads
+
+    Returns:
+        QueryServer; call serve_forever() to start it
+    """
+    return QueryServer((host, port), session, workers=workers)
+
+
+def main():
+    from utils.column_store import enable_copy_on_write
+    from utils.scouting_api import ScoutingSession
+
+    enable_copy_on_write()
+    parser = argparse.ArgumentParser(description="Local HTTP query service for scouting results")
+    parser.add_argument('--data', default=os.path.join('data', '2025'), help="Folder with league CSV files")
+    parser.add_argument('--store', help="Season store folder (utils/season_store.py), used instead of --data")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=4, help="Worker threads sharing the dataset")
+    parser.add_argument('--verbose', action='store_true', help="Log every request")
+    args = parser.parse_args()
+
+    session = ScoutingSession.from_store(args.store) if args.store else ScoutingSession(args.data)
+    # Warm the unfiltered similarity scorer so the first request does not pay for it
+    session.get_similarity_scorer()
+
+    server = create_server(session, args.host, args.port, args.workers)
+    server.verbose = args.verbose
+    print(f"Serving {len(session.df)} players on http://{args.host}:{server.server_port} "
+          f"with {args.workers} workers", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+WebGL scatter helpers for large player pools
+Background players are thinned with a stable, density-preserving sample so the
+browser payload stays bounded whatever the pool size
+"""
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.quantized_block import column_values
+
+# Background points drawn before downsampling kicks in
+MAX_BACKGROUND_POINTS = 3000
+
+# Grid resolution (per axis) used to preserve the point density
+DENSITY_BINS = 40
+
+
+def _stable_priority(index: pd.Index) -> np.ndarray:
+    """Pseudo-random but reproducible priority of every row (same row, same priority)"""
+    return pd.util.hash_array(index.to_numpy()).astype(np.uint64)
+
+
+def density_sample(x: np.ndarray, y: np.ndarray, index: pd.Index,
+                   max_points: int = MAX_BACKGROUND_POINTS, bins: int = DENSITY_BINS) -> np.ndarray:
+    """
+    Pick a density-preserving subset of scatter points
+
+    Points are binned on a ``bins`` x ``bins`` grid; every non-empty cell keeps a
+    share of its points proportional to its size (at least one, so sparse
+    outliers stay visible). Within a cell the rows with the lowest hash of their
+    index label are kept, so the sample is stable across reruns and filters.
+
+    Args:
+        x: X values
+        y: Y values
+        index: Row labels of the points (used for stable selection)
+        max_points: Target number of points
+        bins: Grid resolution per axis
+
+    Returns:
+        Sorted positions of the kept points (all positions if there are at most ``max_points``)
+    """
+    valid = np.flatnonzero(~(np.isnan(x) | np.isnan(y)))
+    if len(valid) <= max_points:
+        return valid
+
+    xv = x[valid]
+    yv = y[valid]
+
+    def _bin(values: np.ndarray) -> np.ndarray:
+        low, high = values.min(), values.max()
+        if high <= low:
+            return np.zeros(len(values), dtype=np.int64)
+        return np.minimum(((values - low) / (high - low) * bins).astype(np.int64), bins - 1)
+
+    cells = _bin(xv) * bins + _bin(yv)
+    counts = np.bincount(cells, minlength=bins * bins)
+    quotas = np.ceil(counts * (max_points / len(valid))).astype(np.int64)
+
+    # Order by cell, then by stable priority; keep the first `quota` rows of each cell
+    priority = _stable_priority(index[valid])
+    order = np.lexsort((priority, cells))
+    sorted_cells = cells[order]
+    cell_start = np.searchsorted(sorted_cells, sorted_cells, side='left')
+    rank_in_cell = np.arange(len(order)) - cell_start
+    keep = order[rank_in_cell < quotas[sorted_cells]]
+
+    return np.sort(valid[keep])
+
+
+def get_background_points(background_df: pd.DataFrame, x_col: str, y_col: str,
+                          max_points: int = MAX_BACKGROUND_POINTS) -> Tuple[pd.DataFrame, int]:
+    """
+    Get the background players to draw
+
+    Args:
+        background_df: Players drawn as the grey background layer
+        x_col: X-axis column
+        y_col: Y-axis column
+        max_points: Target number of points
+
+    Returns:
+        (sampled DataFrame with Player, x and y columns, total number of plottable players)
+    """
+    x = column_values(background_df, x_col)
+    y = column_values(background_df, y_col)
+    total = int(np.count_nonzero(~(np.isnan(x) | np.isnan(y))))
+
+    keep = density_sample(x, y, background_df.index, max_points=max_points)
+    sampled = pd.DataFrame({
+        'Player': background_df['Player'].to_numpy()[keep],
+        'x': x[keep],
+        'y': y[keep]
+    })
+    return sampled, total
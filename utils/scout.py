@@ -0,0 +1,233 @@
+"""
+Command line interface for headless scouting queries
+
+Every invocation loads the dataset once; batch files run all their queries in
+the same process against the warm caches (see utils/scouting_api.py).
+
+Usage:
+    python -m utils.scout similar --player "Rizky Ridho" --weights "COMP_Security=2;COMP_Aerial=1" --top 30 --format parquet --out similar.parquet
+    python -m utils.scout preset --preset "Ball-Playing CB" --leagues "Liga 1" --format csv
+    python -m utils.scout batch --queries queries.jsonl --format parquet --out results.parquet
+
+A batch file holds one JSON query per line, e.g.
+    {"type": "similar", "player": "Rizky Ridho", "top_n": 10, "leagues": ["Liga 1"]}
+    {"type": "preset", "preset_name": "Ball-Playing CB", "expression": "Age < 25"}
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+import pandas as pd
+
+# Supported output formats
+OUTPUT_FORMATS = ['csv', 'json', 'parquet']
+
+
+def parse_weights(text: str) -> Dict[str, float]:
+    """
+    Parse similarity weights from a JSON object or "metric=weight;metric=weight"
+
+    Semicolons separate entries because metric names may contain commas
+    (e.g. "Aerial duels won, %").
+
+    Args:
+        text: Weights text
+
+    Returns:
+        Dictionary of {metric: weight}
+
+    Raises:
+        ValueError: If an entry cannot be parsed
+    """
+    text = text.strip()
+    if text.startswith('{'):
+        return {str(k): float(v) for k, v in json.loads(text).items()}
+
+    weights = {}
+    for entry in filter(None, (part.strip() for part in text.split(';'))):
+        metric, sep, value = entry.rpartition('=')
+        if not sep or not metric.strip():
+            raise ValueError(f"Invalid weight '{entry}' (expected metric=weight)")
+        weights[metric.strip()] = float(value)
+    return weights
+
+
+def read_queries(path: str) -> List[Dict]:
+    """
+    Read batch queries from a JSON lines file (or a JSON array)
+
+    Args:
+        path: Query file path
+
+    Returns:
+        List of query dictionaries (each gets an 'id' if it has none)
+    """
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+
+    if text.lstrip().startswith('['):
+        queries = json.loads(text)
+    else:
+        queries = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    for i, query in enumerate(queries):
+        query.setdefault('id', i)
+    return queries
+
+
+def write_results(df: pd.DataFrame, fmt: str, out: str = None):
+    """
+    Write a result DataFrame to a file or stdout
+
+    Args:
+        df: Result DataFrame
+        fmt: One of OUTPUT_FORMATS
+        out: Output path (default: stdout, not available for parquet)
+
+    Raises:
+        ValueError: If parquet output has no path or pyarrow is missing
+    """
+    if fmt == 'parquet':
+        if not out:
+            raise ValueError("Parquet output needs --out")
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ValueError("Parquet output requires pyarrow (pip install pyarrow)")
+        df.to_parquet(out, index=False)
+    elif fmt == 'json':
+        df.to_json(out or sys.stdout, orient='records', indent=None if out is None else 2)
+        if out is None:
+            sys.stdout.write('\n')
+    else:
+        df.to_csv(out or sys.stdout, index=False)
+
+
+def _add_pool_arguments(parser: argparse.ArgumentParser):
+    """Arguments shared by all query subcommands"""
+    parser.add_argument('--positions', nargs='*', help="Positions to include (default: all)")
+    parser.add_argument('--leagues', nargs='*', help="Leagues to include (default: all)")
+    parser.add_argument('--seasons', nargs='*', help="Seasons to include (needs --store, default: all)")
+    parser.add_argument('--expression', help="Filter expression, e.g. 'Age < 25 and \"Minutes played\" >= 900'")
+    parser.add_argument('--top', type=int, default=30, help="Number of players to return")
+    parser.add_argument('--format', default='csv', choices=OUTPUT_FORMATS)
+    parser.add_argument('--out', help="Output file (default: stdout)")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Argument parser with the similar, preset and batch subcommands"""
+    from config.cohorts import COHORTS, DEFAULT_COHORT
+
+    parser = argparse.ArgumentParser(description="Headless scouting queries")
+    parser.add_argument('--data', default=os.path.join('data', '2025'), help="Folder with league CSV files")
+    parser.add_argument('--store', help="Season store folder (utils/season_store.py), used instead of --data")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    similar = subparsers.add_parser('similar', help="Players most similar to a reference player")
+    similar.add_argument('--player', required=True, help="Reference player name")
+    similar.add_argument('--reference-season', help="Season of the reference profile (default: latest)")
+    similar.add_argument('--weights', help="JSON object or 'metric=weight;...' (default: all composites)")
+    similar.add_argument('--cohort', default=DEFAULT_COHORT, choices=list(COHORTS))
+    similar.add_argument('--min-minutes', type=int, default=0)
+    similar.add_argument('--min-age', type=int, default=15)
+    similar.add_argument('--max-age', type=int, default=45)
+    similar.add_argument('--same-position', action='store_true', help="Only compare to the same position")
+    similar.add_argument('--constraints', help="Candidate constraints, e.g. 'Age <= 24 and Aerial duels won, % >= 65'")
+    _add_pool_arguments(similar)
+
+    preset = subparsers.add_parser('preset', help="Top players for a position preset")
+    preset.add_argument('--preset', required=True, help="Defender or forward preset name")
+    _add_pool_arguments(preset)
+
+    batch = subparsers.add_parser('batch', help="Run many queries from a file in one process")
+    batch.add_argument('--queries', required=True, help="JSON lines file with one query per line")
+    batch.add_argument('--format', default='csv', choices=OUTPUT_FORMATS)
+    batch.add_argument('--out', help="Output file (default: stdout)")
+
+    return parser
+
+
+def run_batch(session, queries: List[Dict]) -> pd.DataFrame:
+    """
+    Run batch queries and stack the results with their query id
+
+    Args:
+        session: ScoutingSession
+        queries: Query dictionaries from read_queries
+
+    Returns:
+        DataFrame with a 'query_id' column followed by the result columns
+    """
+    frames = []
+    failed = 0
+    start = time.perf_counter()
+    for query, result, error in session.run_queries(queries):
+        if error is not None:
+            failed += 1
+            print(f"Query {query['id']} failed: {error}", file=sys.stderr)
+            continue
+        if not isinstance(result, pd.DataFrame):
+            failed += 1
+            print(f"Query {query['id']} skipped: '{query.get('type')}' results are not tabular "
+                  f"(use utils/query_service.py)", file=sys.stderr)
+            continue
+        frames.append(result.assign(query_id=query['id']))
+
+    elapsed = time.perf_counter() - start
+    print(f"Ran {len(queries)} queries ({failed} failed) in {elapsed:.2f}s "
+          f"({len(queries) / elapsed if elapsed > 0 else 0.0:.1f} queries/sec)", file=sys.stderr)
+
+    if not frames:
+        return pd.DataFrame(columns=['query_id'])
+    results = pd.concat(frames, ignore_index=True)
+    return results[['query_id'] + [col for col in results.columns if col != 'query_id']]
+
+
+def main(argv: List[str] = None):
+    from utils.column_store import enable_copy_on_write
+    from utils.scouting_api import ScoutingSession
+
+    enable_copy_on_write()
+    args = build_parser().parse_args(argv)
+
+    try:
+        if args.store:
+            # Only the partitions of the requested seasons and leagues are read
+            session = ScoutingSession.from_store(args.store, seasons=getattr(args, 'seasons', None),
+                                                 leagues=getattr(args, 'leagues', None))
+        else:
+            session = ScoutingSession(args.data)
+
+        if args.command == 'similar':
+            result = session.similar(
+                args.player,
+                weights=parse_weights(args.weights) if args.weights else None,
+                top_n=args.top,
+                positions=args.positions,
+                leagues=args.leagues,
+                expression=args.expression,
+                cohort=args.cohort,
+                min_minutes=args.min_minutes,
+                age_range=(args.min_age, args.max_age),
+                same_position_only=args.same_position,
+                constraints=args.constraints,
+                seasons=args.seasons,
+                reference_season=args.reference_season
+            )
+        elif args.command == 'preset':
+            result = session.preset(args.preset, top_n=args.top, positions=args.positions,
+                                    leagues=args.leagues, expression=args.expression, seasons=args.seasons)
+        else:
+            result = run_batch(session, read_queries(args.queries))
+
+        write_results(result, args.format, args.out)
+    except ValueError as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,442 @@
+"""
+Headless scouting API
+Loading, filtering, preset scoring and similarity queries without Streamlit.
+
+A ScoutingSession loads the dataset once and keeps the per-process caches warm
+(column store, cohort percentiles, sorted indexes, filtered frames and
+scorers), so thousands of queries can run in one process:
+
+    session = ScoutingSession('data/2025')
+    session.similar('Rizky Ridho', weights={'COMP_Security': 1.0}, top_n=30)
+    session.preset('Ball-Playing CB', leagues=['Liga 1'])
+
+Several seasons are served from the season store (see utils/season_store.py):
+
+    session = ScoutingSession.from_store('data/store', seasons=['2024', '2025'])
+    session.similar('Rizky Ridho', reference_season='2024', candidate_expression='Season == "2025"')
+    session.movers('Progressive passes per 90_percentile', from_season='2024', to_season='2025')
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import pandas as pd
+
+from config.composite_attributes import COMPOSITE_ATTRIBUTES
+from config.stat_categories import PLAYER_INFO_COLUMNS, STAT_CATEGORIES
+from utils.data_loader import (
+    PlayerNotFoundError, append_players, filter_players, get_all_stat_columns, get_hypothetical_player_profile, get_player_profile,
+    prepare_data_global
+)
+from utils.player_similarity import SimilarityScorer
+from utils.preset_scoring import DefenderScorer
+from utils.trajectories import get_trajectory_index
+
+# Query types understood by ScoutingSession.run_query
+QUERY_TYPES = ['similar', 'preset', 'profile', 'percentile', 'trajectory', 'movers']
+
+# Filtered frames kept per session (keyed by positions, leagues, seasons and expression)
+MAX_CACHED_FILTERS = 64
+
+# Similarity scorers kept per session (keyed by filter and cohort); each holds its pool's columns
+MAX_CACHED_SCORERS = 64
+
+
+def get_all_presets() -> Dict:
+    """Defender and forward presets merged into one dictionary"""
+    from config.defender_presets import DEFENDER_PRESETS
+    from config.forward_presets import FORWARD_PRESETS
+
+    presets = {}
+    presets.update(DEFENDER_PRESETS)
+    presets.update(FORWARD_PRESETS)
+    return presets
+
+
+def get_default_similarity_weights() -> Dict[str, float]:
+    """Default similarity weights (every composite attribute at 0.2, as on the similarity page)"""
+    return {f"COMP_{attr}": 0.2 for attr in COMPOSITE_ATTRIBUTES.keys()}
+
+
+def _as_key(values) -> Tuple:
+    """Hashable cache key for an optional list of filter values"""
+    if not values:
+        return ()
+    if isinstance(values, str):
+        values = [values]
+    return tuple(sorted(values))
+
+
+def _filter_key(positions, leagues, expression, seasons) -> Tuple:
+    """Cache key of a filtered pool"""
+    return _as_key(positions), _as_key(leagues), expression or '', _as_key(seasons)
+
+
+class ScoutingSession:
+    """
+    Dataset plus warm caches for headless scoring and similarity queries
+    """
+
+    def __init__(self, data_folder: str = None, stat_categories: Dict = None, df: pd.DataFrame = None):
+        """
+        Load (or adopt) a prepared dataset
+
+        Args:
+            data_folder: Folder with league CSV files (ignored when df is given)
+            stat_categories: Dictionary of stat categories (default: STAT_CATEGORIES)
+            df: Already prepared DataFrame from prepare_data_global
+
+        Raises:
+            ValueError: If neither data_folder nor df is given
+        """
+        self.stat_categories = stat_categories or STAT_CATEGORIES
+        if df is None:
+            if data_folder is None:
+                raise ValueError("Either data_folder or df is required")
+            df = prepare_data_global(data_folder, self.stat_categories)
+
+        self.df = df
+        self.stat_columns = get_all_stat_columns(self.stat_categories)
+        self.composite_columns = [f"COMP_{attr}" for attr in COMPOSITE_ATTRIBUTES.keys()]
+        self.presets = get_all_presets()
+
+        # Caches are shared by every thread serving queries (see utils/query_service.py)
+        self._lock = threading.Lock()
+        self._filtered = OrderedDict()
+        self._similarity_scorers = OrderedDict()
+        self._preset_scorer = DefenderScorer(self.presets)
+
+    @classmethod
+    def from_store(cls, store_root: str, seasons: List[str] = None, leagues: List[str] = None,
+                   stat_categories: Dict = None) -> 'ScoutingSession':
+        """
+        Load a session from the season store, reading only the needed partitions
+
+        Args:
+            store_root: Folder written by utils/season_store.py
+            seasons: Seasons to load (None or empty = all)
+            leagues: Leagues to load (None or empty = all)
+            stat_categories: Dictionary of stat categories (default: STAT_CATEGORIES)
+
+        Returns:
+            ScoutingSession over the selected seasons and leagues
+
+        Raises:
+            ValueError: If the folder is not a season store
+        """
+        from utils.season_store import PartitionedStore
+
+        df = PartitionedStore(store_root).read(seasons=seasons, leagues=leagues)
+        session = cls(stat_categories=stat_categories, df=df)
+        # Trajectories are aligned at load time, so movers queries are array slices
+        if df['Season'].nunique() > 1:
+            get_trajectory_index(df)
+        return session
+
+    def append_players(self, new_players: pd.DataFrame) -> pd.DataFrame:
+        """
+        Append players (e.g. late-window signings) and update percentiles incrementally
+
+        Args:
+            new_players: Raw rows with the league CSV columns
+
+        Returns:
+            The updated dataset
+
+        Raises:
+            ValueError: If required columns are missing
+        """
+        df = append_players(self.df, new_players, self.stat_categories)
+        with self._lock:
+            self.df = df
+            # Filtered frames and scorers were built from the previous rows
+            self._filtered.clear()
+            self._similarity_scorers.clear()
+        return df
+
+    def filter(self, positions: List[str] = None, leagues: List[str] = None,
+               expression: str = None, seasons: List[str] = None) -> pd.DataFrame:
+        """
+        Filter the dataset (cached, so repeated filters cost a dictionary lookup)
+
+        Args:
+            positions: Positions to include (None or empty = all)
+            leagues: Leagues to include (None or empty = all)
+            expression: Filter expression (see utils/filter_dsl.py)
+            seasons: Seasons to include (None or empty = all)
+
+        Returns:
+            Filtered DataFrame (global row labels are kept)
+
+        Raises:
+            ValueError: If the filter expression is invalid, or seasons are given
+                for a dataset without seasons
+        """
+        key = _filter_key(positions, leagues, expression, seasons)
+        if key == ((), (), '', ()):
+            return self.df
+
+        with self._lock:
+            if key in self._filtered:
+                self._filtered.move_to_end(key)
+                return self._filtered[key]
+
+        filtered = filter_players(self.df, positions=list(key[0]), leagues=list(key[1]),
+                                  expression=expression, seasons=list(key[3]))
+        with self._lock:
+            self._filtered[key] = filtered
+            if len(self._filtered) > MAX_CACHED_FILTERS:
+                evicted, _ = self._filtered.popitem(last=False)
+                # Scorers of an evicted pool would keep its rows alive
+                for scorer_key in [k for k in self._similarity_scorers if k[0] == evicted]:
+                    del self._similarity_scorers[scorer_key]
+        return filtered
+
+    def get_similarity_scorer(self, positions: List[str] = None, leagues: List[str] = None,
+                              expression: str = None, cohort: str = 'global',
+                              seasons: List[str] = None) -> SimilarityScorer:
+        """
+        Get the (cached) similarity scorer of a filtered pool
+
+        Args:
+            positions: Positions to include (None or empty = all)
+            leagues: Leagues to include (None or empty = all)
+            expression: Filter expression (see utils/filter_dsl.py)
+            cohort: Percentile cohort key from config/cohorts.py
+            seasons: Seasons to include (None or empty = all)
+
+        Returns:
+            SimilarityScorer over the filtered pool
+        """
+        key = (_filter_key(positions, leagues, expression, seasons), cohort)
+        with self._lock:
+            scorer = self._similarity_scorers.get(key)
+            if scorer is not None:
+                self._similarity_scorers.move_to_end(key)
+                return scorer
+
+        pool = self.filter(positions, leagues, expression, seasons)
+        scorer = SimilarityScorer(pool, self.stat_columns, self.composite_columns, cohort=cohort)
+        with self._lock:
+            scorer = self._similarity_scorers.setdefault(key, scorer)
+            self._similarity_scorers.move_to_end(key)
+            if len(self._similarity_scorers) > MAX_CACHED_SCORERS:
+                self._similarity_scorers.popitem(last=False)
+        return scorer
+
+    def similar(self, player: str, weights: Dict[str, float] = None, top_n: int = 30,
+                positions: List[str] = None, leagues: List[str] = None, expression: str = None,
+                cohort: str = 'global', min_minutes: int = 0, age_range: Tuple[int, int] = (15, 45),
+                league_weights: Dict[str, float] = None, same_position_only: bool = False,
+                constraints=None, candidate_expression: str = None, seasons: List[str] = None,
+                reference_season: str = None) -> pd.DataFrame:
+        """
+        Find the players most similar to a reference player
+
+        Args:
+            player: Reference player name (must be in the filtered pool)
+            weights: Dictionary of {metric: weight} (default: all composites at 0.2)
+            top_n: Number of similar players to return
+            positions: Positions of the pool
+            leagues: Leagues of the pool
+            expression: Filter expression of the pool
+            cohort: Percentile cohort key from config/cohorts.py
+            min_minutes: Minimum minutes played of candidates
+            age_range: (min_age, max_age) of candidates
+            league_weights: Dictionary of {league: multiplier}
+            same_position_only: Only compare to players in the same position
+            constraints: Threshold constraints on candidates (see utils/constraint_search.py)
+            candidate_expression: Filter expression restricting candidates only
+            seasons: Seasons of the pool (the reference season must be among them)
+            reference_season: Season of the reference player's profile (default: latest)
+
+        Returns:
+            DataFrame with the top N similar players and similarity scores
+
+        Raises:
+            ValueError: If the player is not found or no weight is valid
+        """
+        scorer = self.get_similarity_scorer(positions, leagues, expression, cohort, seasons)
+        return scorer.calculate_similarity(
+            reference_player_name=player,
+            weights=weights or get_default_similarity_weights(),
+            min_minutes=min_minutes,
+            age_range=tuple(age_range),
+            league_weights=league_weights,
+            same_position_only=same_position_only,
+            top_n=top_n,
+            candidate_constraints=constraints,
+            filter_expression=candidate_expression,
+            reference_season=reference_season
+        )
+
+    def preset(self, preset_name: str, top_n: int = 30, positions: List[str] = None,
+               leagues: List[str] = None, expression: str = None, seasons: List[str] = None) -> pd.DataFrame:
+        """
+        Score players against a position preset
+
+        Args:
+            preset_name: Key of a defender or forward preset
+            top_n: Number of top players to return
+            positions: Positions to include
+            leagues: Leagues to include
+            expression: Filter expression (see utils/filter_dsl.py)
+            seasons: Seasons to include (None or empty = all)
+
+        Returns:
+            DataFrame with the top N players by weighted score
+
+        Raises:
+            ValueError: If the preset does not exist
+        """
+        if preset_name not in self.presets:
+            raise ValueError(f"Unknown preset '{preset_name}' (expected one of {list(self.presets)})")
+
+        pool = self.filter(positions, leagues, expression, seasons)
+        top_players, _ = self._preset_scorer.calculate_preset_score(pool, preset_name, top_n_limit=top_n)
+        return top_players
+
+    def profile(self, player_id: int, cohort: str = 'global') -> Dict:
+        """
+        Get a player's info, stat percentiles and composite scores by row id
+
+        Args:
+            player_id: Row label of the player (the 'id' of get_player_info)
+            cohort: Percentile cohort key from config/cohorts.py
+
+        Returns:
+            Dictionary with 'info', 'stats' and 'composite_attributes' (see get_player_profile)
+
+        Raises:
+            PlayerNotFoundError: If no player has this id
+        """
+        if player_id not in self.df.index:
+            raise PlayerNotFoundError(f"Player id {player_id} not found")
+
+        # One-row frame so players sharing a name resolve to the right row
+        player_df = self.df.loc[[player_id]]
+        return get_player_profile(
+            player_df, player_df[PLAYER_INFO_COLUMNS['name']].iloc[0], self.stat_columns,
+            PLAYER_INFO_COLUMNS, COMPOSITE_ATTRIBUTES, cohort=cohort
+        )
+
+    def percentile(self, stats: Dict[str, float], cohort: str = 'global', league: str = None,
+                   position: str = None) -> Dict:
+        """
+        Rank a stat line that is not in the dataset against the full pool
+
+        Args:
+            stats: Dictionary of {stat_column: raw value}
+            cohort: Percentile cohort key from config/cohorts.py
+            league: League of the player (needed by league cohorts)
+            position: Position of the player (needed by position group cohorts)
+
+        Returns:
+            Dictionary with 'stats' ({stat_column: {'value', 'percentile'}}) and
+            'composite_attributes' ({attribute: {'score', ...}})
+
+        Raises:
+            ValueError: If a stat is unknown or the cohort group is empty
+        """
+        return get_hypothetical_player_profile(self.df, stats, self.stat_columns, COMPOSITE_ATTRIBUTES,
+                                               cohort=cohort, league=league, position=position)
+
+    def trajectory(self, player: str, columns: List[str] = None, country: str = None) -> pd.DataFrame:
+        """
+        Get a player's values across seasons
+
+        Args:
+            player: Player name
+            columns: Columns to return (default: composites and stat percentiles)
+            country: Birth country, needed only when several players share the name
+
+        Returns:
+            DataFrame with a 'Season' column and one column per requested column
+
+        Raises:
+            ValueError: If the dataset has no seasons, or the player or a column is unknown
+        """
+        index = get_trajectory_index(self.df)
+        if isinstance(columns, str):
+            columns = [columns]
+        if not columns:
+            default_columns = self.composite_columns + [f"{col}_percentile" for col in self.stat_columns]
+            columns = [col for col in default_columns if col in index.columns]
+        return index.trajectory(player, columns, country=country).reset_index()
+
+    def movers(self, column: str, from_season: str = None, to_season: str = None, top_n: int = 20,
+               fallers: bool = False, positions: List[str] = None, leagues: List[str] = None,
+               expression: str = None) -> pd.DataFrame:
+        """
+        Find the players whose value changed most between two seasons
+
+        Args:
+            column: Stat, percentile or COMP_* column
+            from_season: Earlier season (default: the season before to_season)
+            to_season: Later season (default: the latest)
+            top_n: Number of players to return
+            fallers: Return the biggest drops instead of the biggest rises
+            positions: Positions of the pool in the later season
+            leagues: Leagues of the pool in the later season
+            expression: Filter expression of the pool in the later season
+
+        Returns:
+            DataFrame with rank, player info, both seasons' values and the delta
+
+        Raises:
+            ValueError: If the dataset has no seasons, or a season or the column is unknown
+        """
+        index = get_trajectory_index(self.df)
+        slots = None
+        if positions or leagues or expression:
+            to_season = str(to_season) if to_season is not None else index.seasons[-1]
+            slots = index.slots_for(self.filter(positions, leagues, expression, [to_season]))
+        return index.top_movers(column, from_season, to_season, top_n=top_n, fallers=fallers, slots=slots)
+
+    def run_query(self, query: Dict) -> pd.DataFrame:
+        """
+        Run one query dictionary, e.g. {"type": "similar", "player": "...", "top_n": 10}
+
+        Args:
+            query: Dictionary with a 'type' (one of QUERY_TYPES) plus the keyword
+                arguments of the matching method
+
+        Returns:
+            Result DataFrame (a dictionary for profile and percentile queries)
+
+        Raises:
+            ValueError: If the query type is unknown
+        """
+        params = dict(query)
+        query_type = params.pop('type', 'similar')
+        params.pop('id', None)
+
+        if query_type == 'similar':
+            return self.similar(**params)
+        if query_type == 'preset':
+            return self.preset(**params)
+        if query_type == 'profile':
+            return self.profile(**params)
+        if query_type == 'percentile':
+            return self.percentile(**params)
+        if query_type == 'trajectory':
+            return self.trajectory(**params)
+        if query_type == 'movers':
+            return self.movers(**params)
+        raise ValueError(f"Unknown query type '{query_type}' (expected one of {QUERY_TYPES})")
+
+    def run_queries(self, queries: Iterable[Dict]) -> Iterator[Tuple[Dict, pd.DataFrame, str]]:
+        """
+        Run many queries against the warm caches
+
+        Args:
+            queries: Iterable of query dictionaries (see run_query)
+
+        Yields:
+            (query, result DataFrame or None, error message or None) for every query
+        """
+        for query in queries:
+            try:
+                yield query, self.run_query(query), None
+            except (ValueError, KeyError, TypeError) as e:
+                yield query, None, str(e)
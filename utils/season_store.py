@@ -0,0 +1,386 @@
+"""
+Season x league partitioned column store
+
+``python -m utils.season_store`` reads every season folder under a data root
+(``data/2025``, ``data/2024``, ... each with def/mid/fwd league CSVs), ranks
+each season on its own (percentiles and composites are season-global, across
+all of that season's leagues) and writes one partition per season and league:
+
+    <store>/manifest.json     seasons, columns, partitions with row counts and statistics
+    <store>/<season>/pNNNN/cNNN.npy   one file per column (string columns as unicode arrays,
+                                      with a cNNN.na.npy mask when values are missing)
+
+PartitionedStore.read() loads only the partitions matching the requested
+seasons and leagues, skips partitions whose statistics (numeric min/max,
+distinct labels) rule out the filter expression, and reads only the requested
+columns. Because percentiles are stored with the rows, a subset of leagues keeps
+its season-global ranks. Seasons whose CSVs did not change are kept on rebuild.
+
+Usage:
+    python -m utils.season_store --data data --out data/store
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.column_store import DATASET_VERSION_ATTR, compute_file_version, register_dataset
+from utils.quantized_block import COMPACT_STORAGE, column_values, encode, is_block_column, is_quantized
+
+# Column holding the season label of every row
+SEASON_COLUMN = 'Season'
+
+# Bumped whenever the store layout changes; older stores are rebuilt
+STORE_FORMAT = 1
+
+MANIFEST_FILE = 'manifest.json'
+
+# Columns every read includes, whatever columns were requested
+KEY_COLUMNS = ['Player', SEASON_COLUMN, 'League', 'Position', 'Team', 'Age']
+
+# Label columns with at most this many distinct values per partition keep them as statistics
+MAX_LABEL_VALUES = 64
+
+# Frames assembled by PartitionedStore.read kept in memory
+MAX_CACHED_READS = 8
+
+
+def discover_seasons(data_root: str) -> Dict[str, str]:
+    """
+    Find the season folders of a data root
+
+    Args:
+        data_root: Folder whose subfolders (named by season) hold def/mid/fwd league CSVs
+
+    Returns:
+        Dictionary of {season: folder}, oldest season first
+    """
+    from utils.data_loader import get_league_files
+
+    if not os.path.isdir(data_root):
+        return {}
+    seasons = {}
+    for name in sorted(os.listdir(data_root)):
+        folder = os.path.join(data_root, name)
+        if os.path.isdir(folder) and get_league_files(folder):
+            seasons[name] = folder
+    return seasons
+
+
+def _column_statistics(values: np.ndarray) -> Optional[Dict]:
+    """Pruning statistics of one partition column (None if not useful)"""
+    if values.dtype.kind in 'fiu':
+        if values.dtype.kind == 'f' and np.isnan(values).all():
+            return {'min': None, 'max': None}
+        return {'min': float(np.nanmin(values)), 'max': float(np.nanmax(values))}
+    labels = pd.unique(pd.Series(values, copy=False).dropna().astype(str))
+    if len(labels) <= MAX_LABEL_VALUES:
+        return {'values': sorted(labels)}
+    return None
+
+
+def _write_partition(df: pd.DataFrame, partition_dir: str, columns: List[str]) -> Dict:
+    """Write one partition's columns and return its statistics"""
+    os.makedirs(partition_dir)
+    stats = {}
+    for i, col in enumerate(columns):
+        series = df[col]
+        if pd.api.types.is_float_dtype(series.dtype) or is_quantized(df, col):
+            # Fixed-point columns are written as floats, so statistics and filters see real values
+            values = column_values(df, col, np.float32)
+        elif pd.api.types.is_integer_dtype(series.dtype):
+            values = series.to_numpy()
+        else:
+            missing = series.isna().to_numpy()
+            values = series.astype(str).to_numpy(dtype=str)
+            if missing.any():
+                values[missing] = ''
+                np.save(os.path.join(partition_dir, f"c{i:03d}.na.npy"), missing)
+        np.save(os.path.join(partition_dir, f"c{i:03d}.npy"), values, allow_pickle=False)
+
+        column_stats = _column_statistics(values if values.dtype.kind != 'U' else series.to_numpy())
+        if column_stats is not None:
+            stats[col] = column_stats
+    return stats
+
+
+def build_store(data_root: str, store_root: str, stat_categories: Dict, verbose: bool = True) -> Dict:
+    """
+    Build (or refresh) the partitioned store from the season folders
+
+    Args:
+        data_root: Folder of season folders
+        store_root: Output folder of the store
+        stat_categories: Dictionary of stat categories
+        verbose: Print one line per season
+
+    Returns:
+        The written manifest
+
+    Raises:
+        ValueError: If there are no season folders or seasons disagree on columns
+    """
+    from utils.data_loader import get_league_files, load_all_league_data, prepare_loaded_data
+
+    seasons = discover_seasons(data_root)
+    if not seasons:
+        raise ValueError(f"No season folders with league CSV files found in {data_root}")
+
+    previous = read_store_manifest(store_root) or {'seasons': {}, 'partitions': [], 'columns': None}
+    os.makedirs(store_root, exist_ok=True)
+
+    columns = None
+    partitions = []
+    season_entries = {}
+    for season, folder in seasons.items():
+        version = compute_file_version(get_league_files(folder))
+        old_entry = previous['seasons'].get(season)
+        if old_entry is not None and old_entry['version'] == version and previous['columns'] is not None:
+            # Unchanged season: keep its partitions
+            columns = columns or previous['columns']
+            season_entries[season] = old_entry
+            partitions.extend(p for p in previous['partitions'] if p['season'] == season)
+            if verbose:
+                print(f"{season}: unchanged")
+            continue
+
+        start = time.perf_counter()
+        df = prepare_loaded_data(load_all_league_data(folder), stat_categories, rank_cohorts=False)
+        df[SEASON_COLUMN] = season
+        if columns is None:
+            columns = list(df.columns)
+        elif set(df.columns) != set(columns):
+            raise ValueError(f"Season {season} has different columns than the other seasons: "
+                             f"{sorted(set(df.columns) ^ set(columns))}")
+
+        season_dir = os.path.join(store_root, season)
+        staging = f"{season_dir}.building"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        season_partitions = []
+        for i, (league, league_df) in enumerate(df.groupby('League', sort=True)):
+            name = f"p{i:04d}"
+            stats = _write_partition(league_df, os.path.join(staging, name), columns)
+            season_partitions.append({'season': season, 'league': league, 'path': f"{season}/{name}",
+                                      'rows': len(league_df), 'stats': stats})
+
+        shutil.rmtree(season_dir, ignore_errors=True)
+        os.rename(staging, season_dir)
+        partitions.extend(season_partitions)
+        season_entries[season] = {'version': version, 'rows': len(df), 'leagues': len(season_partitions)}
+        if verbose:
+            print(f"{season}: {len(df)} players in {len(season_partitions)} league partitions "
+                  f"({time.perf_counter() - start:.1f}s)")
+
+    # Seasons whose folder is gone are dropped
+    for season in set(previous['seasons']) - set(seasons):
+        shutil.rmtree(os.path.join(store_root, season), ignore_errors=True)
+
+    manifest = {
+        'format': STORE_FORMAT,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'source': os.path.abspath(data_root),
+        'columns': columns,
+        'seasons': season_entries,
+        'partitions': partitions
+    }
+    manifest['version'] = hashlib.sha1(
+        json.dumps([manifest['columns'], manifest['seasons']], sort_keys=True).encode('utf-8')
+    ).hexdigest()[:16]
+
+    tmp_path = os.path.join(store_root, f".{MANIFEST_FILE}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, os.path.join(store_root, MANIFEST_FILE))
+    return manifest
+
+
+def read_store_manifest(store_root: str) -> Optional[Dict]:
+    """
+    Read a store's manifest
+
+    Args:
+        store_root: Store folder
+
+    Returns:
+        Manifest dictionary, or None if the folder is not a store of the current format
+    """
+    try:
+        with open(os.path.join(store_root, MANIFEST_FILE), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('format') == STORE_FORMAT else None
+
+
+class PartitionedStore:
+    """
+    Reader of a season x league partitioned store
+    """
+
+    def __init__(self, store_root: str):
+        """
+        Args:
+            store_root: Folder written by build_store
+
+        Raises:
+            ValueError: If the folder is not a store of the current format
+        """
+        manifest = read_store_manifest(store_root)
+        if manifest is None:
+            raise ValueError(f"Not a format {STORE_FORMAT} season store: {store_root}")
+        self.store_root = store_root
+        self.manifest = manifest
+        self.version = manifest['version']
+        self.columns = manifest['columns']
+        self.partitions = manifest['partitions']
+        self._column_files = {col: f"c{i:03d}" for i, col in enumerate(self.columns)}
+        self._lock = threading.Lock()
+        self._reads = OrderedDict()
+
+    @property
+    def seasons(self) -> List[str]:
+        """Seasons in the store, oldest first"""
+        return sorted(self.manifest['seasons'])
+
+    def leagues(self, seasons: List[str] = None) -> List[str]:
+        """
+        Leagues with data in the given seasons
+
+        Args:
+            seasons: Seasons to look at (None or empty = all)
+
+        Returns:
+            Sorted league names
+        """
+        return sorted({p['league'] for p in self.partitions if not seasons or p['season'] in seasons})
+
+    def select_partitions(self, seasons: List[str] = None, leagues: List[str] = None,
+                          expression: str = None) -> List[Dict]:
+        """
+        Partitions that can hold rows matching the filters
+
+        Args:
+            seasons: Seasons to include (None or empty = all)
+            leagues: Leagues to include (None or empty = all)
+            expression: Filter expression (see utils/filter_dsl.py); partitions
+                whose statistics rule it out are skipped
+
+        Returns:
+            Manifest entries of the selected partitions
+
+        Raises:
+            ValueError: If the filter expression is invalid
+        """
+        from utils.filter_dsl import compile_filter
+
+        compiled = compile_filter(expression) if expression and expression.strip() else None
+        selected = []
+        for partition in self.partitions:
+            if seasons and partition['season'] not in seasons:
+                continue
+            if leagues and partition['league'] not in leagues:
+                continue
+            if compiled is not None and not compiled.may_match(partition['stats']):
+                continue
+            selected.append(partition)
+        return selected
+
+    def _read_column(self, partition: Dict, column: str) -> np.ndarray:
+        path = os.path.join(self.store_root, partition['path'], self._column_files[column])
+        values = np.load(f"{path}.npy", allow_pickle=False)
+        if values.dtype.kind == 'U':
+            values = values.astype(object)
+            if os.path.exists(f"{path}.na.npy"):
+                values[np.load(f"{path}.na.npy")] = np.nan
+        return values
+
+    def _read_partitions(self, partitions: List[Dict], columns: List[str]) -> pd.DataFrame:
+        """Concatenate columns of several partitions into one frame (cached)"""
+        key = (tuple(p['path'] for p in partitions), tuple(columns))
+        with self._lock:
+            if key in self._reads:
+                self._reads.move_to_end(key)
+                return self._reads[key]
+
+        data = {}
+        for col in columns:
+            parts = [self._read_column(p, col) for p in partitions]
+            data[col] = np.concatenate(parts) if parts else np.empty(0, dtype=np.float32)
+            if COMPACT_STORAGE and is_block_column(col):
+                data[col] = encode(data[col])
+        df = pd.DataFrame(data, copy=False)
+
+        # Reads of the same partitions and columns share caches (column store, cohorts, ...)
+        digest = hashlib.sha1(repr((self.version,) + key).encode('utf-8')).hexdigest()[:16]
+        df.attrs[DATASET_VERSION_ATTR] = f"store-{digest}"
+        register_dataset(df)
+
+        with self._lock:
+            self._reads[key] = df
+            while len(self._reads) > MAX_CACHED_READS:
+                self._reads.popitem(last=False)
+        return df
+
+    def read(self, seasons: List[str] = None, leagues: List[str] = None, columns: List[str] = None,
+             expression: str = None) -> pd.DataFrame:
+        """
+        Load the rows and columns a query needs
+
+        Args:
+            seasons: Seasons to include (None or empty = all)
+            leagues: Leagues to include (None or empty = all)
+            columns: Columns to read on top of KEY_COLUMNS and the expression's
+                columns (None = all)
+            expression: Filter expression applied to the rows (and used to skip partitions)
+
+        Returns:
+            DataFrame in store column order, partitions ordered by season and league
+
+        Raises:
+            ValueError: If a column is unknown or the filter expression is invalid
+        """
+        from utils.filter_dsl import apply_filter_expression, compile_filter
+
+        if columns is None:
+            selected_columns = list(self.columns)
+        else:
+            wanted = set(KEY_COLUMNS) | set(columns)
+            if expression and expression.strip():
+                wanted |= set(compile_filter(expression).columns)
+            unknown = sorted(wanted - set(self.columns) - set(KEY_COLUMNS))
+            if unknown:
+                raise ValueError(f"Column(s) not in the store: {unknown}")
+            selected_columns = [col for col in self.columns if col in wanted]
+
+        partitions = self.select_partitions(seasons, leagues, expression)
+        partitions = sorted(partitions, key=lambda p: (p['season'], p['league']))
+        df = self._read_partitions(partitions, selected_columns)
+        return apply_filter_expression(df, expression)
+
+
+def main():
+    from config.stat_categories import STAT_CATEGORIES
+
+    parser = argparse.ArgumentParser(description="Build the season x league partitioned store")
+    parser.add_argument('--data', default='data', help="Folder of season folders (data/2025, data/2024, ...)")
+    parser.add_argument('--out', default=os.path.join('data', 'store'), help="Store folder")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    manifest = build_store(args.data, args.out, STAT_CATEGORIES)
+    rows = sum(entry['rows'] for entry in manifest['seasons'].values())
+    print(f"Wrote {args.out}: {len(manifest['seasons'])} seasons, {len(manifest['partitions'])} partitions, "
+          f"{rows} players in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
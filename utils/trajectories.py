@@ -0,0 +1,295 @@
+"""
+Season-over-season player trajectories
+
+A TrajectoryIndex aligns every player with every season in one array, built
+once per multi-season dataset (see utils/season_store.py):
+
+    values[column, player, season]    float32, NaN where the player has no row that season
+
+so a player's trajectory is ``values[:, p, :]``, the deltas of one stat between
+two seasons are ``values[c, :, t] - values[c, :, f]`` and "top movers" are one
+partial sort of that vector, instead of per-player merges across season frames.
+
+Players are matched across seasons by name and birth country (the CSVs carry no
+player id). A player with several rows in one season (e.g. a mid-season transfer
+between leagues) is represented by the row with the most minutes played.
+"""
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from utils.column_store import get_column_store
+from utils.data_loader import PlayerNotFoundError
+from utils.quantized_block import block_values
+
+# Columns identifying a player across seasons (the ones present in the frame are used)
+PLAYER_KEY_COLUMNS = ['Player', 'Birth country']
+
+# Player info shown next to trajectories and movers (taken from the latest season)
+PLAYER_INFO = ['Player', 'Team', 'League', 'Position', 'Age']
+
+_KEY_SEPARATOR = '\x1f'
+
+
+def _player_keys(df: pd.DataFrame) -> pd.Series:
+    """One string key per row from PLAYER_KEY_COLUMNS"""
+    columns = [col for col in PLAYER_KEY_COLUMNS if col in df.columns]
+    keys = df[columns[0]].astype(str)
+    for col in columns[1:]:
+        keys = keys + _KEY_SEPARATOR + df[col].fillna('').astype(str)
+    return keys
+
+
+class TrajectoryIndex:
+    """
+    Player x season aligned values of every numeric column
+    """
+
+    def __init__(self, keys: np.ndarray, seasons: List[str], columns: List[str], values: np.ndarray,
+                 rows: np.ndarray, players: pd.DataFrame):
+        """
+        Args:
+            keys: Sorted player keys (one per player slot)
+            seasons: Season labels, oldest first
+            columns: Column names of the first axis of ``values``
+            values: float32 array of shape (columns, players, seasons)
+            rows: int64 array of shape (players, seasons) with the source row
+                position of each player-season (-1 if absent)
+            players: Player info of the latest season, one row per player slot
+        """
+        self.keys = keys
+        self.seasons = list(seasons)
+        self.columns = list(columns)
+        self.values = values
+        self.rows = rows
+        self.players = players
+        self._column_slots = {col: i for i, col in enumerate(self.columns)}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns: List[str] = None) -> 'TrajectoryIndex':
+        """
+        Build the index of a multi-season frame
+
+        Args:
+            df: Frame with a 'Season' column (e.g. PartitionedStore.read())
+            columns: Numeric columns to align (default: every numeric column)
+
+        Returns:
+            TrajectoryIndex over the frame
+
+        Raises:
+            ValueError: If the frame has no 'Season' column
+        """
+        if 'Season' not in df.columns:
+            raise ValueError("Trajectories need a 'Season' column (load the data from the season store)")
+        if columns is None:
+            columns = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col].dtype)]
+
+        player_codes, keys = pd.factorize(_player_keys(df), sort=True)
+        season_codes, seasons = pd.factorize(df['Season'].astype(str), sort=True)
+        n_players, n_seasons = len(keys), len(seasons)
+
+        # One row per player-season: the first in descending minutes order
+        if 'Minutes played' in df.columns:
+            minutes = pd.to_numeric(df['Minutes played'], errors='coerce').fillna(-1).to_numpy()
+            order = np.argsort(-minutes, kind='stable')
+        else:
+            order = np.arange(len(df))
+        cells = player_codes[order].astype(np.int64) * n_seasons + season_codes[order]
+        cells, first = np.unique(cells, return_index=True)
+        chosen = order[first]
+
+        rows = np.full(n_players * n_seasons, -1, dtype=np.int64)
+        rows[cells] = chosen
+        rows = rows.reshape(n_players, n_seasons)
+
+        values = np.full((len(columns), n_players * n_seasons), np.nan, dtype=np.float32)
+        values[:, cells] = block_values(df, columns, np.float32)[chosen].T
+        values = values.reshape(len(columns), n_players, n_seasons)
+
+        # Player info from each player's latest season
+        present = rows >= 0
+        latest_season = n_seasons - 1 - np.argmax(present[:, ::-1], axis=1)
+        latest_rows = rows[np.arange(n_players), latest_season]
+        info = [col for col in PLAYER_INFO + PLAYER_KEY_COLUMNS if col in df.columns]
+        players = df[list(dict.fromkeys(info))].iloc[latest_rows].reset_index(drop=True)
+        players['Seasons'] = present.sum(axis=1)
+
+        return cls(np.asarray(keys, dtype=str), list(seasons), columns, values, rows, players)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def column_slot(self, column: str) -> int:
+        """
+        Get the first-axis position of a column
+
+        Raises:
+            ValueError: If the column is not indexed
+        """
+        if column not in self._column_slots:
+            raise ValueError(f"Column '{column}' has no trajectories")
+        return self._column_slots[column]
+
+    def season_slot(self, season: str) -> int:
+        """
+        Get the last-axis position of a season
+
+        Raises:
+            ValueError: If the season is not indexed
+        """
+        if str(season) not in self.seasons:
+            raise ValueError(f"Unknown season '{season}' (expected one of {self.seasons})")
+        return self.seasons.index(str(season))
+
+    def player_slot(self, player: str, country: str = None) -> int:
+        """
+        Get the slot of a player
+
+        Args:
+            player: Player name
+            country: Birth country, needed only when several players share the name
+
+        Returns:
+            Player slot
+
+        Raises:
+            ValueError: If the player is not found or the name is ambiguous
+        """
+        matches = np.flatnonzero(self.players['Player'].to_numpy() == player)
+        if country is not None and 'Birth country' in self.players.columns:
+            matches = matches[self.players['Birth country'].to_numpy()[matches] == country]
+        if len(matches) == 0:
+            raise PlayerNotFoundError(f"Player '{player}' not found")
+        if len(matches) > 1:
+            countries = self.players['Birth country'].iloc[matches].tolist() \
+                if 'Birth country' in self.players.columns else []
+            raise ValueError(f"Several players are named '{player}'; pass a birth country ({countries})")
+        return int(matches[0])
+
+    def slots_for(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Get the slots of the players appearing in a frame (any season)
+
+        Args:
+            df: Player frame with the PLAYER_KEY_COLUMNS
+
+        Returns:
+            Sorted distinct player slots
+        """
+        keys = pd.unique(_player_keys(df).to_numpy()).astype(str)
+        slots = np.searchsorted(self.keys, keys)
+        found = slots < len(self.keys)
+        found[found] = self.keys[slots[found]] == keys[found]
+        return np.unique(slots[found])
+
+    def trajectory(self, player: str, columns: List[str] = None, country: str = None) -> pd.DataFrame:
+        """
+        Get one player's values across seasons
+
+        Args:
+            player: Player name
+            columns: Columns to return (default: every indexed column)
+            country: Birth country, needed only when several players share the name
+
+        Returns:
+            DataFrame indexed by season (seasons without a row are omitted)
+
+        Raises:
+            ValueError: If the player or a column is unknown
+        """
+        slot = self.player_slot(player, country)
+        columns = columns or self.columns
+        slots = [self.column_slot(col) for col in columns]
+        present = self.rows[slot] >= 0
+        trajectory = pd.DataFrame(self.values[slots, slot, :].T, index=pd.Index(self.seasons, name='Season'),
+                                  columns=columns)
+        return trajectory[present]
+
+    def deltas(self, column: str, from_season: str, to_season: str) -> np.ndarray:
+        """
+        Get every player's change in a column between two seasons
+
+        Args:
+            column: Indexed column
+            from_season: Earlier season
+            to_season: Later season
+
+        Returns:
+            float32 array with one delta per player slot (NaN if either season is missing)
+        """
+        values = self.values[self.column_slot(column)]
+        return values[:, self.season_slot(to_season)] - values[:, self.season_slot(from_season)]
+
+    def top_movers(self, column: str, from_season: str = None, to_season: str = None, top_n: int = 20,
+                   fallers: bool = False, slots: np.ndarray = None) -> pd.DataFrame:
+        """
+        Get the players whose value changed most between two seasons
+
+        Args:
+            column: Indexed column (e.g. 'Progressive passes per 90_percentile')
+            from_season: Earlier season (default: the second latest)
+            to_season: Later season (default: the latest)
+            top_n: Number of players to return
+            fallers: Return the biggest drops instead of the biggest rises
+            slots: Player slots to consider (default: every player), see slots_for
+
+        Returns:
+            DataFrame with rank, latest player info, both seasons' values and the delta
+
+        Raises:
+            ValueError: If there is no earlier season or a season/column is unknown
+        """
+        to_season = str(to_season) if to_season is not None else self.seasons[-1]
+        if from_season is None:
+            if self.season_slot(to_season) == 0:
+                raise ValueError(f"No season before {to_season} to compare with")
+            from_season = self.seasons[self.season_slot(to_season) - 1]
+        from_season = str(from_season)
+
+        deltas = self.deltas(column, from_season, to_season)
+        candidates = np.flatnonzero(~np.isnan(deltas)) if slots is None else \
+            np.asarray(slots)[~np.isnan(deltas[slots])]
+        scores = -deltas[candidates] if not fallers else deltas[candidates]
+
+        # Partial sort: only the top N are ordered
+        if len(candidates) > top_n:
+            keep = np.argpartition(scores, top_n - 1)[:top_n]
+            candidates, scores = candidates[keep], scores[keep]
+        top = candidates[np.argsort(scores, kind='stable')]
+
+        values = self.values[self.column_slot(column)]
+        result = self.players.iloc[top].reset_index(drop=True)
+        result.insert(0, 'Rank', np.arange(1, len(top) + 1))
+        result[from_season] = values[top, self.season_slot(from_season)]
+        result[to_season] = values[top, self.season_slot(to_season)]
+        result['Delta'] = deltas[top]
+        return result
+
+    def summary(self) -> Dict:
+        """Sizes of the index (players, seasons, columns and array megabytes)"""
+        return {
+            'players': len(self.keys),
+            'seasons': list(self.seasons),
+            'columns': len(self.columns),
+            'mb': (self.values.nbytes + self.rows.nbytes) / 1e6
+        }
+
+
+def get_trajectory_index(df: pd.DataFrame) -> TrajectoryIndex:
+    """
+    Get the trajectory index of a multi-season frame (built once per dataset version)
+
+    Args:
+        df: Frame with a 'Season' column; filtered frames share the index of the
+            frame they were cut from
+
+    Returns:
+        TrajectoryIndex over the stored frame
+
+    Raises:
+        ValueError: If the frame has no 'Season' column
+    """
+    store = get_column_store(df)
+    return store.artifact('trajectory_index', lambda s: TrajectoryIndex.from_frame(s.df))